@@ -0,0 +1,105 @@
+# -*- coding: utf-8 -*-
+"""抓取吞吐基准：对本地合成 skills.sh 执行 sitemap + 详情抓取
+
+用法：
+    python benchmarks/bench_crawl.py --skills 200 --latency 0.02 --error-rate 0.01
+    python benchmarks/bench_crawl.py --pipeline --fetch-workers 16 --parse-workers 4
+
+不访问真实网络；缓存目录使用临时目录。
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tools.cache as cache  # noqa: E402
+import tools.enricher as enricher  # noqa: E402
+import tools.fetcher as fetcher  # noqa: E402
+from tools.parser import parse_sitemap, parse_skill_details  # noqa: E402
+from tools.standin_server import SyntheticSite, start_server  # noqa: E402
+
+
+def run(args) -> dict:
+    cache.CACHE_DIR = tempfile.mkdtemp()
+    server = start_server(
+        SyntheticSite(args.skills, body_kb=args.body_kb, seed=args.seed),
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    os.environ[fetcher.ORIGIN_ENV] = server.origin
+    try:
+        start = time.perf_counter()
+        xml, err = fetcher.fetch_sitemap(force=True)
+        if err:
+            raise SystemExit(f"sitemap failed: {err}")
+        urls = parse_sitemap(xml)[: args.limit or None]
+
+        ok = failed = client_bytes = 0
+        if args.pipeline:
+            cache.save_l0(enricher.build_index_records(urls, []))
+            stats = enricher.enrich_index(
+                fetch_workers=args.fetch_workers, parse_workers=args.parse_workers
+            )
+            ok, failed = stats["enriched"], stats["failed"]
+        else:
+            for url in urls:
+                raw, err = fetcher.fetch_details(
+                    url, force=True, stream=args.stream, head_only=args.head_only
+                )
+                if err:
+                    failed += 1
+                    continue
+                client_bytes += len(raw["raw"].encode("utf-8"))
+                parse_skill_details(raw["raw"])
+                ok += 1
+        elapsed = time.perf_counter() - start
+    finally:
+        server.shutdown()
+        server.server_close()
+
+    return {
+        "pages": len(urls),
+        "ok": ok,
+        "failed": failed,
+        "seconds": round(elapsed, 3),
+        "pages_per_sec": round(len(urls) / elapsed, 1) if elapsed else 0,
+        "client_bytes": client_bytes,
+        "server_requests": server.stats["requests"],
+        "server_bytes": server.stats["bytes"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crawl throughput benchmark")
+    parser.add_argument("--skills", type=int, default=200)
+    parser.add_argument("--limit", type=int, default=0, help="Detail pages to fetch")
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--jitter", type=float, default=0.0)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--body-kb", type=int, default=64)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--stream", action="store_true", help="Streaming fetch")
+    parser.add_argument(
+        "--head-only", action="store_true", help="Stop once <head> has the fields"
+    )
+    parser.add_argument(
+        "--pipeline",
+        action="store_true",
+        help="Run the enrichment pipeline (threads fetch, processes parse)",
+    )
+    parser.add_argument("--fetch-workers", type=int, default=None)
+    parser.add_argument("--parse-workers", type=int, default=None)
+    args = parser.parse_args()
+
+    for key, value in run(args).items():
+        print(f"{key:>16}: {value}")
+
+
+if __name__ == "__main__":
+    main()
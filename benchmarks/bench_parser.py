@@ -0,0 +1,101 @@
+# -*- coding: utf-8 -*-
+"""详情页解析微基准：逐字段正则全文扫描 vs 单遍 head 扫描；整体 vs 选择性 JSON 解码
+
+用法：
+    python benchmarks/bench_parser.py --sizes 0 64 256 --props-kb 0 256 --repeat 200
+"""
+
+import argparse
+import json
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from tools.parser import (  # noqa: E402
+    extract_from_next_data,
+    find_next_data,
+    parse_skill_details,
+    select_next_data,
+)
+from tools.standin_server import render_skill_page  # noqa: E402
+
+SKILL_ID = "obra/superpowers/using-git-worktrees"
+
+
+# === 旧实现（每个字段一次全文正则，meta 模式每次现编译） ===
+
+
+def _legacy_meta(html, prop):
+    pattern = rf'<meta[^>]*(?:property|name)="{prop}"[^>]*content="([^"]*)"'
+    match = re.search(pattern, html)
+    return match.group(1) if match else None
+
+
+def legacy_parse(raw):
+    match = re.search(r'<script[^>]*id="__NEXT_DATA__"[^>]*>([^<]+)</script>', raw)
+    if match:
+        try:
+            data = json.loads(match.group(1))
+            page_props = data.get("props", {}).get("pageProps", {})
+            for key in ("skill", "data", "result", "skillInfo"):
+                if key in page_props:
+                    return page_props[key]
+        except json.JSONDecodeError:
+            pass
+    title = _legacy_meta(raw, "og:title")
+    if not title:
+        m = re.search(r"<title>([^<]+)</title>", raw)
+        title = m.group(1).strip() if m else None
+    desc = _legacy_meta(raw, "og:description") or _legacy_meta(raw, "description")
+    keywords = _legacy_meta(raw, "keywords")
+    tags = [t.strip() for t in keywords.split(",") if t.strip()] if keywords else []
+    return {"title": title, "description": desc, "author": None, "tags": tags}
+
+
+def _without_next_data(html):
+    return re.sub(r'<script id="__NEXT_DATA__".*?</script>', "", html, flags=re.S)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Detail page parser benchmark")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[0, 64, 256])
+    parser.add_argument("--props-kb", type=int, nargs="+", default=[0, 64, 256])
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'page':>22} {'KB':>6} {'legacy us':>10} {'new us':>10} {'speedup':>8}")
+    for body_kb in args.sizes:
+        with_nd = render_skill_page(SKILL_ID, body_kb)
+        pages = [("__NEXT_DATA__", with_nd), ("meta only", _without_next_data(with_nd))]
+        for label, html in pages:
+            assert legacy_parse(html) == parse_skill_details(html)
+            old = timeit.timeit(lambda: legacy_parse(html), number=args.repeat)
+            new = timeit.timeit(lambda: parse_skill_details(html), number=args.repeat)
+            print(
+                f"{label:>22} {len(html) // 1024:>6} "
+                f"{old / args.repeat * 1e6:>10.1f} {new / args.repeat * 1e6:>10.1f} "
+                f"{old / new:>7.1f}x"
+            )
+
+    print(
+        f"\n{'pageProps KB':>22} {'full json us':>13} {'selective us':>13} {'speedup':>8}"
+    )
+    for props_kb in args.props_kb:
+        html = render_skill_page(SKILL_ID, props_kb=props_kb)
+        text = find_next_data(html)
+        assert extract_from_next_data(json.loads(text)) == select_next_data(text)
+        old = timeit.timeit(
+            lambda: extract_from_next_data(json.loads(text)), number=args.repeat
+        )
+        new = timeit.timeit(lambda: select_next_data(text), number=args.repeat)
+        print(
+            f"{len(text) // 1024:>22} {old / args.repeat * 1e6:>13.1f} "
+            f"{new / args.repeat * 1e6:>13.1f} {old / new:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+"""搜索基准：在合成 l0 上执行 smart_search 同款多查询检索
+
+用法：
+    python benchmarks/bench_search.py --skills 20000 --repeat 20
+
+缓存目录使用临时目录。
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import tools.cache as cache  # noqa: E402
+from tools.parser import build_l0_record  # noqa: E402
+from tools.semantic import is_available  # noqa: E402
+from tools.standin_server import skill_data, synthetic_skill_ids  # noqa: E402
+
+QUERIES = ["react", "video", "frontend", "player", "design"]
+
+
+def build_index(count: int):
+    cache.CACHE_DIR = tempfile.mkdtemp()
+    records = []
+    for skill_id in synthetic_skill_ids(count):
+        detail = skill_data(skill_id)
+        records.append(build_l0_record(detail["url"], detail))
+    cache.save_l0(records)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search benchmark")
+    parser.add_argument("--skills", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    build_index(args.skills)
+
+    def per_query():
+        results = []
+        for query in QUERIES:
+            results.extend(cache.search_l0(query, top_k=5))
+        return results
+
+    def fused():
+        return cache.search_l0_multi(QUERIES)
+
+    def semantic():
+        return cache.search_l0_semantic(" ".join(QUERIES))
+
+    cases = [("search_l0 x5", per_query), ("search_l0_multi", fused)]
+    if is_available():
+        cases.append(("search_l0_semantic", semantic))
+    for label, fn in cases:
+        elapsed = timeit.timeit(fn, number=args.repeat) / args.repeat
+        print(f"{label:>18}: {elapsed * 1000:8.2f} ms  ({len(fn())} results)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,36 @@
+# -*- coding: utf-8 -*-
+"""shared fixtures"""
+
+import pytest
+
+import tools.cache as cache
+import tools.fetcher as fetcher
+from tools.standin_server import start_server
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """每个测试使用独立的缓存目录（离线、负缓存、熔断、命中记录互不影响）"""
+    monkeypatch.setattr(cache, "CACHE_DIR", str(tmp_path))
+    return tmp_path
+
+
+@pytest.fixture
+def standin(monkeypatch):
+    """
+    启动替身服务器并把 skills.sh 地址指向它，测试结束时关闭
+
+    用法：server = standin(SyntheticSite(...), latency=...)
+    """
+    servers = []
+
+    def start(site, **options):
+        server = start_server(site, **options)
+        monkeypatch.setenv(fetcher.ORIGIN_ENV, server.origin)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.shutdown()
+        server.server_close()
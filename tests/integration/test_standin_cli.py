@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+"""离线集成测试：CLI 对接本地 skills.sh 替身服务器
+
+无需网络，始终执行：通过 SKILLS_SH_ORIGIN 把请求指向进程内的合成站点，
+缓存目录通过 HOME/USERPROFILE 指向临时目录。
+"""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+
+from tools.standin_server import SyntheticSite, start_server
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+class TestStandinCLI(unittest.TestCase):
+    """update --index / show 全链路"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.site = SyntheticSite(20)
+        cls.server = start_server(cls.site)
+        cls.home = tempfile.mkdtemp()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def run_cli(self, args, stdin=None):
+        env = dict(os.environ)
+        env.update(
+            {
+                "HOME": self.home,
+                "USERPROFILE": self.home,
+                "SKILLS_SH_ORIGIN": self.server.origin,
+            }
+        )
+        env.pop("SKILLS_SH_OFFLINE", None)
+        result = subprocess.run(
+            [sys.executable, "tools/skills.py"] + args,
+            input=stdin,
+            capture_output=True,
+            text=True,
+            cwd=REPO_ROOT,
+            env=env,
+            encoding="utf-8",
+            errors="replace",
+        )
+        return result.stdout, result.stderr, result.returncode
+
+    def test_update_index_then_show(self):
+        """测试从替身服务器刷新索引并获取详情"""
+        stdout, stderr, rc = self.run_cli(["update", "--index"])
+        self.assertEqual(rc, 0, stderr)
+        self.assertIn("20", stdout)
+
+        skill_id = self.site.skill_ids[0]
+        stdout, stderr, rc = self.run_cli(["show", skill_id])
+        self.assertEqual(rc, 0, stderr)
+        self.assertTrue(stdout.startswith("##"), stdout[:200])
+        self.assertIn(skill_id, stdout)
+        self.assertIn("Skill for", stdout)
+
+    def test_search_with_facet_filters(self):
+        """测试 search --owner/--repo 只返回过滤范围内的 skill"""
+        stdout, stderr, rc = self.run_cli(["update", "--index"])
+        self.assertEqual(rc, 0, stderr)
+
+        stdout, stderr, rc = self.run_cli(
+            ["search", "owner", "--top-k", "50", "--owner", "OWNER1"]
+        )
+        self.assertEqual(rc, 0, stderr)
+        owner1 = [i for i in self.site.skill_ids if i.startswith("owner1/")]
+        for skill_id in self.site.skill_ids:
+            self.assertEqual(skill_id in stdout, skill_id in owner1, skill_id)
+
+        stdout, stderr, rc = self.run_cli(
+            ["search", "owner", "--repo", "owner0/repo1", "--top-k", "50"]
+        )
+        self.assertEqual(rc, 0, stderr)
+        self.assertEqual(stdout.count("npx skills add owner0/repo1/"), 5)
+        self.assertNotIn("owner0/repo0/", stdout)
+
+    def test_complete_prefix(self):
+        """测试 complete 按 id 前缀列出索引中的 skill"""
+        stdout, stderr, rc = self.run_cli(["update", "--index"])
+        self.assertEqual(rc, 0, stderr)
+
+        stdout, stderr, rc = self.run_cli(["complete", "owner0/repo1/"])
+        self.assertEqual(rc, 0, stderr)
+        expected = sorted(
+            i for i in self.site.skill_ids if i.startswith("owner0/repo1/")
+        )
+        self.assertEqual(
+            [line[3:-1] for line in stdout.splitlines() if line.startswith("- `")],
+            expected,
+        )
+
+    def test_show_partial_id_lists_from_index(self):
+        """测试 show owner / owner/repo 由本地索引列出，不发起网络请求"""
+        stdout, stderr, rc = self.run_cli(["update", "--index"])
+        self.assertEqual(rc, 0, stderr)
+        requests = self.server.stats["requests"]
+
+        stdout, stderr, rc = self.run_cli(["show", "owner0"])
+        self.assertEqual(rc, 0, stderr)
+        owner0 = [i for i in self.site.skill_ids if i.startswith("owner0/")]
+        self.assertIn("3 repos, 15 skills", stdout)
+        for skill_id in owner0:
+            self.assertIn(f"`{skill_id}`", stdout)
+
+        stdout, stderr, rc = self.run_cli(["show", "owner1/repo3"])
+        self.assertEqual(rc, 0, stderr)
+        self.assertIn("### owner1/repo3 (5)", stdout)
+        self.assertNotIn("owner1/repo4/", stdout)
+        self.assertEqual(self.server.stats["requests"], requests)
+
+    def test_search_batch_from_stdin(self):
+        """测试 search --batch - 每条查询输出一行 NDJSON"""
+        stdout, stderr, rc = self.run_cli(["update", "--index"])
+        self.assertEqual(rc, 0, stderr)
+
+        queries = ["repo1", "owner2/repo6", "no-such-thing"]
+        stdout, stderr, rc = self.run_cli(
+            ["search", "--batch", "-", "--top-k", "10"], stdin="\n".join(queries)
+        )
+        self.assertEqual(rc, 0, stderr)
+        lines = [json.loads(line) for line in stdout.splitlines()]
+        self.assertEqual([line["query"] for line in lines], queries)
+        self.assertEqual(
+            sorted(r["id"] for r in lines[1]["results"]),
+            [i for i in self.site.skill_ids if i.startswith("owner2/repo6/")],
+        )
+        self.assertEqual(lines[2]["results"], [])
+
+    def test_show_many_ids_in_order(self):
+        """测试 show 多个 ID：缓存命中直接输出，未命中并发抓取，按请求顺序输出"""
+        stdout, stderr, rc = self.run_cli(["update", "--index"])
+        self.assertEqual(rc, 0, stderr)
+        ids = self.site.skill_ids[10:17]
+        stdout, stderr, rc = self.run_cli(["show", ids[0]])
+        self.assertEqual(rc, 0, stderr)
+
+        requests = self.server.stats["requests"]
+        self.server.latency = 0.4
+        try:
+            started = time.time()
+            stdout, stderr, rc = self.run_cli(
+                ["show"] + ids[:4] + ["--from-file", "-"], stdin="\n".join(ids[4:])
+            )
+            elapsed = time.time() - started
+        finally:
+            self.server.latency = 0.0
+        self.assertEqual(rc, 0, stderr)
+
+        headers = [line for line in stdout.splitlines() if line.startswith("## ")]
+        self.assertEqual(len(headers), len(ids))
+        for header, skill_id in zip(headers, ids):
+            self.assertTrue(header.endswith(skill_id), header)
+        # 6 个未命中：串行至少 2.4 秒
+        self.assertEqual(self.server.stats["requests"] - requests, 6)
+        self.assertLess(elapsed, 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+# -*- coding: utf-8 -*-
+"""tests for batch_search"""
+
+import threading
+
+import tools.batch_search as batch_search
+import tools.cache as cache
+from tools.batch_search import read_queries, run_batch
+from tools.smart_search import smart_results
+
+RECORDS = [
+    {
+        "id": f"acme/{repo}/{slug}",
+        "owner": "acme",
+        "repo": repo,
+        "slug": slug,
+        "url": f"https://skills.sh/acme/{repo}/{slug}",
+        "description": desc,
+    }
+    for repo, slug, desc in [
+        ("web", "react-video-player", "React video player component"),
+        ("web", "css-grid", "CSS grid layouts"),
+        ("ops", "docker-deploy", "Deploy containers with docker"),
+        ("ops", "grid-monitor", "Monitor the power grid"),
+    ]
+]
+
+
+def test_batch_matches_single_search():
+    """测试批量检索与逐条 search_l0 结果一致（含重复查询与过滤）"""
+    cache.save_l0([dict(r) for r in RECORDS])
+    queries = ["grid", "docker", "GRID", "nothing", "acme"]
+    for candidates in (None, cache.get_facet_candidates(repo="ops")):
+        batch = cache.search_l0_batch(queries, top_k=2, candidates=candidates)
+        assert batch == [cache.search_l0(q, 2, candidates) for q in queries]
+
+
+def test_run_batch_routes_queries(tmp_path):
+    cache.save_l0([dict(r) for r in RECORDS])
+    path = tmp_path / "queries.txt"
+    path.write_text("grid\n\n有没有 react 视频播放的技能\n", encoding="utf-8")
+    queries = list(read_queries(str(path)))
+    assert queries == ["grid", "有没有 react 视频播放的技能"]
+
+    lines = list(run_batch(queries, 3, {"owner": "acme"}))
+    assert [line["mode"] for line in lines] == ["keyword", "smart"]
+    assert [r["id"] for r in lines[0]["results"]] == [
+        "acme/web/css-grid",
+        "acme/ops/grid-monitor",
+    ]
+    expected = smart_results(queries[1], 3)[0][:3]
+    assert [r["id"] for r in lines[1]["results"]] == [r["id"] for r in expected]
+
+
+def test_run_batch_streams_before_input_ends():
+    """测试每条查询到达即输出，不等待输入结束；同一块的查询共用一次扫描"""
+    cache.save_l0([dict(r) for r in RECORDS])
+    answered = threading.Event()
+
+    def producer():
+        yield "grid"
+        assert answered.wait(5), "first result was not yielded before more input"
+        yield "docker"
+
+    lines = []
+    for line in run_batch(producer(), 2):
+        lines.append(line)
+        answered.set()
+    assert [line["query"] for line in lines] == ["grid", "docker"]
+    assert [r["id"] for r in lines[1]["results"]] == ["acme/ops/docker-deploy"]
+
+
+def test_smart_queries_share_the_chunk_scan(monkeypatch):
+    """测试一块中的 smart 查询与 keyword 查询只扫描一次索引"""
+    cache.save_l0([dict(r) for r in RECORDS])
+    queries = ["grid", "有没有 react 视频播放的技能", "有没有 docker 部署的技能"]
+    expected = [smart_results(q, 3)[0][:3] for q in queries[1:]]
+    scans = []
+    scan = cache.scan_l0_terms
+    monkeypatch.setattr(
+        batch_search,
+        "scan_l0_terms",
+        lambda *a, **k: scans.append(a) or scan(*a, **k),
+    )
+    monkeypatch.setattr(cache, "scan_l0_terms", batch_search.scan_l0_terms)
+    lines = list(batch_search._answer_chunk(queries, 3, None))
+    assert len(scans) == 1
+    assert [line["mode"] for line in lines] == ["keyword", "smart", "smart"]
+    for line, recs in zip(lines[1:], expected):
+        assert [r["id"] for r in line["results"]] == [r["id"] for r in recs]
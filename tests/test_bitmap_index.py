@@ -0,0 +1,93 @@
+# -*- coding: utf-8 -*-
+"""tests for bitmap_index"""
+
+import tools.cache as cache
+from tools.bitmap_index import (
+    build_bitmap_index,
+    classify_domains,
+    decode,
+    encode,
+    to_bitmap,
+    to_indices,
+)
+
+
+def _rec(slug, description="", owner="acme", repo="repo", tags=()):
+    return {
+        "id": f"{owner}/{repo}/{slug}",
+        "owner": owner,
+        "repo": repo,
+        "slug": slug,
+        "url": f"https://skills.sh/{owner}/{repo}/{slug}",
+        "description": description,
+        "tags": list(tags),
+    }
+
+
+RECORDS = [
+    _rec("video-player", "Play video in the browser", tags=["Media", "web"]),
+    _rec("email-sender", "Send email", repo="mail", tags=["web"]),
+    _rec("llm-agent", "AI agent toolkit", owner="other", tags=["ai"]),
+    _rec("react-video", "React video component", tags=["web", "media"]),
+]
+
+
+def test_roundtrip():
+    rows = [0, 3, 9, 64, 1000]
+    bitmap = to_bitmap(rows)
+    assert to_indices(bitmap) == rows
+    # 稀疏集合存行号，稠密集合存 base64
+    assert encode(bitmap) == rows and decode(encode(bitmap)) == bitmap
+    dense = to_bitmap(range(0, 1000, 2))
+    assert isinstance(encode(dense), str) and decode(encode(dense)) == dense
+    assert to_bitmap([]) == 0 and to_indices(0) == []
+
+
+def test_classify_whole_words():
+    """测试领域词整词匹配（email 不属于 ai）"""
+    records = [cache.add_index_columns(dict(r)) for r in RECORDS]
+    assert classify_domains(records[0]) == ["video"]
+    assert classify_domains(records[1]) == []
+    assert classify_domains(records[2]) == ["ai"]
+    assert classify_domains(records[3]) == ["frontend", "video"]
+
+
+def test_build_skips_invalid():
+    records = [cache.add_index_columns(dict(r)) for r in RECORDS]
+    records[0]["valid"] = False
+    index = build_bitmap_index(records, "v1")
+    assert to_indices(decode(index["domains"]["video"])) == [3]
+
+
+def test_search_restricted_to_candidates():
+    cache.save_l0([dict(r) for r in RECORDS])
+    video = cache.get_domain_candidates("video")
+    assert to_indices(video) == [0, 3]
+    assert cache.get_domain_candidates("general") is None
+
+    inside = cache.search_l0_multi(["video", "agent"], candidates=video)
+    assert [r["slug"] for r in inside] == ["video-player", "react-video"]
+    outside = cache.search_l0_multi(["video", "agent"], candidates=~video)
+    assert [r["slug"] for r in outside] == ["llm-agent"]
+
+
+def test_facet_candidates():
+    """测试 owner/repo/tag 过滤取交集（位图索引与扫描回退结果一致）"""
+    cache.save_l0([dict(r) for r in RECORDS])
+    assert cache.get_facet_candidates() is None
+    expected = [
+        ({"owner": "ACME"}, [0, 1, 3]),
+        ({"repo": "acme/repo"}, [0, 3]),
+        ({"tags": ["web", "media"]}, [0, 3]),
+        ({"owner": "acme", "tags": ["ai"]}, []),
+        ({"repo": "missing"}, []),
+    ]
+    for filters, rows in expected:
+        assert to_indices(cache.get_facet_candidates(**filters)) == rows
+
+    cache.save_l0([dict(r) for r in RECORDS], derived=False)
+    for filters, rows in expected:
+        assert to_indices(cache.get_facet_candidates(**filters)) == rows
+
+    hits = cache.search_l0("video", candidates=cache.get_facet_candidates(tags=["web"]))
+    assert [r["slug"] for r in hits] == ["video-player", "react-video"]
@@ -48,6 +48,7 @@ def test_search_l0():
                 "owner": "owner",
                 "repo": "repo",
                 "description": "first skill",
+                "url": "https://skills.sh/owner/repo/skill1",
             },
             {
                 "id": "owner/repo/skill2",
@@ -55,6 +56,7 @@ def test_search_l0():
                 "owner": "owner",
                 "repo": "repo",
                 "description": "second skill",
+                "url": "https://skills.sh/owner/repo/skill2",
             },
         ]
     )
@@ -72,6 +74,7 @@ def test_search_l0_partial_match():
                 "owner": "a",
                 "repo": "b",
                 "description": "test description",
+                "url": "https://skills.sh/a/b/c",
             },
         ]
     )
@@ -79,6 +82,64 @@ def test_search_l0_partial_match():
     assert len(results) == 1
 
 
+def test_invalid_records_are_not_searchable():
+    """测试索引时校验为无效的记录不进入任何检索（含位图过期时的过滤回退）"""
+    cache.save_l0(
+        [
+            {
+                "id": "a/b/ok",
+                "slug": "ok",
+                "owner": "a",
+                "url": "https://skills.sh/a/b/ok",
+            },
+            {"id": "a/b/no-url", "slug": "no-url", "owner": "a"},
+        ]
+    )
+    assert [r["id"] for r in cache.search_l0("a/b", top_k=5)] == ["a/b/ok"]
+    assert [r["id"] for r in cache.search_l0_batch(["a/b"])[0]] == ["a/b/ok"]
+    assert [r["id"] for r in cache.search_l0_multi(["a/b"])] == ["a/b/ok"]
+
+    cache.get_bitmaps_path().unlink()
+    assert cache.get_facet_candidates(owner="a") == 0b01
+
+
+def test_search_l0_multi_fuses_rankings():
+    records = [
+        ("a/b/video", "video", "video player"),
+        ("a/b/react", "react", "react video"),
+        ("a/b/other", "other", "unrelated"),
+        ("facebook/react", "", "react video player"),
+    ]
+    cache.save_l0(
+        [
+            {
+                "id": skill_id,
+                "slug": slug,
+                "description": desc,
+                "url": f"https://skills.sh/{skill_id}",
+            }
+            for skill_id, slug, desc in records
+        ]
+    )
+    results = cache.search_l0_multi(["video", "react", "player", "video"])
+    assert [r["slug"] for r in results] == ["video", "react"]
+    assert len(cache.search_l0_multi(["video", "react"], top_k=1)) == 1
+    assert cache.search_l0_multi(["", " "]) == []
+
+
+def test_l0_search_columns():
+    cache.save_l0([{"id": "A/B/Skill", "slug": "Skill", "description": "Desc"}])
+    rec = cache.load_l0()[0]
+    assert rec["slug_lc"] == "skill" and rec["id_lc"] == "a/b/skill"
+    assert rec["search_text"] == "a/b/skill skill   desc"
+    assert rec["valid"] is False
+    assert rec["validation_reason"] == "Missing ID or URL"
+
+    with open(cache.get_l0_path(), "w", encoding="utf-8") as f:
+        f.write(json.dumps({"id": "x/y/z", "slug": "Z"}) + "\n")
+    assert cache.load_l0()[0]["slug_lc"] == "z"
+
+
 def test_save_and_load_l1():
     data = {
         "schema_version": 1,
@@ -131,3 +192,22 @@ def test_get_l0_by_id():
 
     rec = cache.get_l0_by_id("nonexistent")
     assert rec is None
+
+
+def test_save_l0_recomputes_only_changed_records(monkeypatch):
+    """测试分批提交只为改动过的记录重算预计算列"""
+    records = [
+        {"id": f"a/b/s{i}", "slug": f"s{i}", "url": f"https://skills.sh/a/b/s{i}"}
+        for i in range(4)
+    ]
+    cache.save_l0(records, derived=False, changed=set())
+    calls = []
+    original = cache.add_index_columns
+    monkeypatch.setattr(
+        cache, "add_index_columns", lambda rec: calls.append(rec["id"]) or original(rec)
+    )
+    records[2] = {**records[2], "description": "updated"}
+    cache.save_l0(records, derived=False, changed={2})
+    assert calls == ["a/b/s2"]
+    assert cache.load_l0()[2]["description"] == "updated"
+    assert "updated" in cache.load_l0()[2]["search_text"]
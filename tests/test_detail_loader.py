@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""tests for detail_loader / coalesce"""
+
+import threading
+import time
+
+import tools.cache as cache
+import tools.coalesce as coalesce
+import tools.detail_loader as detail_loader
+from tools.id_resolver import SkillID
+
+PAGE = (
+    "<html><head><title>T</title>"
+    '<meta property="og:description" content="Coalesced description">'
+    "</head><body></body></html>"
+)
+
+
+def _slow_fetch(calls):
+    def fake_fetch_details(url, **kwargs):
+        calls.append(url)
+        time.sleep(0.2)
+        return {"raw": PAGE}, None
+
+    return fake_fetch_details
+
+
+def test_concurrent_requests_fetch_once(monkeypatch):
+    """测试并发请求同一 skill 只抓取一次"""
+    calls = []
+    monkeypatch.setattr(detail_loader, "fetch_details", _slow_fetch(calls))
+    skill_id = SkillID.parse("owner/repo/coalesced")
+    results = []
+
+    def worker():
+        results.append(detail_loader.get_skill_detail(skill_id))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    assert len(calls) == 1
+    assert len(results) == 8
+    assert all(err is None for _, err in results)
+    assert all(d["description"] == "Coalesced description" for d, _ in results)
+    assert cache.load_l1("owner/repo/coalesced")["id"] == "owner/repo/coalesced"
+
+
+def test_cached_detail_skips_fetch(monkeypatch):
+    """测试 l1 命中时不抓取"""
+    calls = []
+    monkeypatch.setattr(detail_loader, "fetch_details", _slow_fetch(calls))
+    cache.save_l1("owner/repo/cached", {"id": "owner/repo/cached"})
+    data, err = detail_loader.get_skill_detail(SkillID.parse("owner/repo/cached"))
+    assert err is None
+    assert data["id"] == "owner/repo/cached"
+    assert calls == []
+
+
+def test_fetch_error_is_returned(monkeypatch):
+    """测试抓取失败时返回错误且不写 l1"""
+    monkeypatch.setattr(
+        detail_loader, "fetch_details", lambda url, **kwargs: (None, "HTTP 404")
+    )
+    data, err = detail_loader.get_skill_detail(SkillID.parse("owner/repo/missing"))
+    assert data is None
+    assert err == "HTTP 404"
+    assert cache.load_l1("owner/repo/missing") is None
+
+
+def test_file_lock_waiter_sees_waited():
+    """测试跨进程锁：等待方得到 waited=True"""
+    holding = threading.Event()
+    release = threading.Event()
+
+    def holder():
+        with coalesce.file_lock("lock/key") as waited:
+            assert waited is False
+            holding.set()
+            release.wait(2)
+
+    t = threading.Thread(target=holder)
+    t.start()
+    holding.wait(2)
+    threading.Timer(0.1, release.set).start()
+    with coalesce.file_lock("lock/key") as waited:
+        assert waited is True
+    t.join()
+    assert not coalesce.get_lock_path("lock/key").exists()
+
+
+def test_unchanged_page_skips_parse(monkeypatch):
+    """测试强制刷新时页面哈希未变则跳过解析与重写"""
+    calls = []
+    monkeypatch.setattr(
+        detail_loader, "fetch_details", lambda url, **kwargs: ({"raw": PAGE}, None)
+    )
+    skill_id = SkillID.parse("owner/repo/unchanged")
+    first, _ = detail_loader.get_skill_detail(skill_id, force=True)
+    assert first["content_sha256"]
+
+    monkeypatch.setattr(
+        detail_loader, "parse_skill_details", lambda raw: calls.append(raw) or {}
+    )
+    second, err = detail_loader.get_skill_detail(skill_id, force=True)
+    assert err is None
+    assert second == first
+    assert calls == []
+
+
+def test_old_schema_is_reparsed_even_if_page_unchanged(monkeypatch):
+    """测试旧 schema 的 l1 即使页面哈希相同也重新解析"""
+    monkeypatch.setattr(
+        detail_loader, "fetch_details", lambda url, **kwargs: ({"raw": PAGE}, None)
+    )
+    skill_id = SkillID.parse("owner/repo/old-schema")
+    cache_key = skill_id.to_cache_key()
+    cache.save_l1(
+        cache_key,
+        {
+            "schema_version": detail_loader.L1_SCHEMA_VERSION - 1,
+            "id": cache_key,
+            "content_sha256": detail_loader.content_hash(PAGE),
+            "raw_html": PAGE,
+        },
+    )
+    data, err = detail_loader.get_skill_detail(skill_id, force=True)
+    assert err is None
+    assert data["schema_version"] == detail_loader.L1_SCHEMA_VERSION
+    assert data["description"] == "Coalesced description"
+    assert "raw_html" not in cache.load_l1(cache_key)
@@ -0,0 +1,200 @@
+# -*- coding: utf-8 -*-
+"""tests for enricher"""
+
+import time
+
+import tools.cache as cache
+import tools.enricher as enricher
+import tools.page_archive as page_archive
+from tools.standin_server import SyntheticSite, render_sitemap
+from tools.page_archive import content_hash
+from tools.parser import parse_sitemap, parse_skill_details
+from tools.reparser import reparse_archive
+
+
+def test_build_index_records_keeps_enrichment():
+    """测试刷新索引时保留已补全字段"""
+    urls = parse_sitemap(render_sitemap(["a/b/c", "a/b/d"]))
+    previous = [
+        {"id": "a/b/c", "description": "kept", "tags": ["x"], "content_sha256": "h"}
+    ]
+    records = enricher.build_index_records(urls, previous)
+    assert [r["id"] for r in records] == ["a/b/c", "a/b/d"]
+    assert records[0]["slug"] == "c"
+    assert records[0]["description"] == "kept"
+    assert records[0]["content_sha256"] == "h"
+    assert records[1]["description"] == ""
+
+
+def test_enrich_index_from_standin(standin):
+    """测试从替身服务器补全 l0 描述"""
+    site = SyntheticSite(6, body_kb=32, repo_pages=False)
+    standin(site)
+    urls = parse_sitemap(render_sitemap(site.skill_ids))
+    cache.save_l0(enricher.build_index_records(urls, []))
+
+    stats = enricher.enrich_index(limit=4)
+    assert stats == {
+        "total": 6,
+        "enriched": 4,
+        "unchanged": 0,
+        "failed": 0,
+        "pending": 0,
+        "requests": 5,
+    }
+    records = cache.load_l0()
+    assert all(r["description"] for r in records[:4])
+    assert not records[4]["description"]
+
+    stats = enricher.enrich_index()
+    assert stats["enriched"] == 2
+
+    before = cache.get_l0_path().stat().st_mtime_ns
+    stats = enricher.enrich_index(force=True)
+    assert stats["unchanged"] == 6 and stats["enriched"] == 0
+    assert cache.get_l0_path().stat().st_mtime_ns == before
+
+
+def test_enrich_pipeline_parses_in_processes(standin, monkeypatch):
+    """测试并发抓取 + 多进程批量解析与串行结果一致"""
+    site = SyntheticSite(12, body_kb=8, repo_pages=False)
+    standin(site)
+    monkeypatch.setattr(enricher, "PARSE_BATCH_SIZE", 3)
+    urls = parse_sitemap(render_sitemap(site.skill_ids))
+    cache.save_l0(enricher.build_index_records(urls, []))
+    stats = enricher.enrich_index(fetch_workers=4, parse_workers=2)
+    assert stats["enriched"] == 12 and stats["failed"] == 0
+    records = cache.load_l0()
+    assert [r["id"] for r in records] == site.skill_ids
+    for rec in records:
+        raw, err, _ = enricher.fetch_page(rec)
+        assert rec["description"] == parse_skill_details(raw)["description"]
+        assert rec["content_sha256"] == content_hash(raw)
+
+
+def test_enrich_fans_out_repo_pages(standin):
+    """测试同 repo 的 skill 由一次 repo 页面抓取补全"""
+    site = SyntheticSite(11)
+    server = standin(site)
+    urls = parse_sitemap(render_sitemap(site.skill_ids))
+    records = enricher.build_index_records(urls, [])
+    tasks = enricher.plan_enrichment(records, list(range(len(records))))
+    assert [t[0] for t in tasks] == ["repo", "repo", "skill"]
+
+    cache.save_l0(records)
+    stats = enricher.enrich_index(fetch_workers=2)
+    assert stats["enriched"] == 11 and stats["requests"] == 3
+    assert server.stats["requests"] == 3
+    assert all(r["description"] for r in cache.load_l0())
+
+    stats = enricher.enrich_index(force=True, fetch_workers=2)
+    assert stats["unchanged"] == 11 and stats["enriched"] == 0
+
+
+def test_prioritize_hits_then_installs():
+    """测试补全顺序：本地命中 > 安装量 > 原序"""
+    records = [
+        {"id": "a/a/a"},
+        {"id": "b/b/b", "installs": 50},
+        {"id": "c/c/c"},
+        {"id": "d/d/d", "installs": 900},
+    ]
+    cache.record_hits(["c/c/c", "c/c/c", "a/a/a"])
+    assert enricher.prioritize(records, [0, 1, 2, 3]) == [2, 0, 3, 1]
+
+
+def test_enrich_commits_in_batches(standin, monkeypatch):
+    """测试补全过程中分批提交 l0（派生索引只在最后一次提交时重建）"""
+    site = SyntheticSite(4, repo_pages=False)
+    standin(site)
+    monkeypatch.setattr(enricher, "ENRICH_COMMIT_EVERY", 1)
+    saves = []
+    monkeypatch.setattr(
+        enricher,
+        "save_l0",
+        lambda records, derived=True, changed=None: saves.append(derived),
+    )
+    urls = parse_sitemap(render_sitemap(site.skill_ids))
+    cache.save_l0(enricher.build_index_records(urls, []))
+    stats = enricher.enrich_index(fetch_workers=1, parse_workers=1)
+    assert stats["enriched"] == 4
+    assert len(saves) >= 2
+    assert saves[-1] is True and not any(saves[:-1])
+
+
+def test_repo_pages_without_metadata_fall_back_in_priority_order(monkeypatch):
+    """测试 repo 页面无元数据时不再规划 repo 抓取，剩余 skill 任务按优先级排序"""
+    site = SyntheticSite(21)
+    urls = parse_sitemap(render_sitemap(site.skill_ids))
+    cache.save_l0(enricher.build_index_records(urls, []))
+    ids = site.skill_ids
+    cache.record_hits([ids[5]] * 3 + [ids[20]] * 2 + [ids[0]])
+
+    repos, pages = [], []
+
+    def fetch_repo(owner, repo):
+        repos.append(f"{owner}/{repo}")
+        return None, None
+
+    def fetch_page(rec):
+        pages.append(rec["id"])
+        time.sleep(0.02)
+        return None, "HTTP 404: Not Found", ""
+
+    monkeypatch.setattr(enricher, "fetch_repo", fetch_repo)
+    monkeypatch.setattr(enricher, "fetch_page", fetch_page)
+    stats = enricher.enrich_index(fetch_workers=1, parse_workers=1)
+    # 两个 repo 任务已同时在途，其余 repo 任务展开为逐个抓取
+    assert len(repos) == 2
+    assert pages[:3] == [ids[5], ids[20], ids[0]]
+    assert sorted(pages) == sorted(ids)
+    assert stats["requests"] == 2 + 21
+
+
+def test_repo_tasks_precede_skill_tasks():
+    """测试 repo 任务排在 skill 任务之前（即使 skill 的优先级更高）"""
+    site = SyntheticSite(11)
+    urls = parse_sitemap(render_sitemap(site.skill_ids))
+    records = enricher.build_index_records(urls, [])
+    cache.record_hits([site.skill_ids[10]])
+    todo = enricher.prioritize(records, list(range(len(records))))
+    assert todo[0] == 10
+    tasks = enricher.plan_enrichment(records, todo)
+    assert [t[0] for t in tasks] == ["repo", "repo", "skill"]
+
+
+def test_failed_repo_fetch_keeps_fan_out_for_other_repos(monkeypatch):
+    """测试 repo 页面抓取失败只把该 repo 的成员改为逐个抓取，其余 repo 仍走 repo 页面"""
+    site = SyntheticSite(11)
+    urls = parse_sitemap(render_sitemap(site.skill_ids))
+    cache.save_l0(enricher.build_index_records(urls, []))
+    repos, pages = [], []
+
+    def fetch_repo(owner, repo):
+        repos.append(f"{owner}/{repo}")
+        return {}, "HTTP 500: injected error"
+
+    def fetch_page(rec):
+        pages.append(rec["id"])
+        return None, "HTTP 404: Not Found", ""
+
+    monkeypatch.setattr(enricher, "fetch_repo", fetch_repo)
+    monkeypatch.setattr(enricher, "fetch_page", fetch_page)
+    enricher.enrich_index(fetch_workers=1, parse_workers=1)
+    assert repos == ["owner0/repo0", "owner0/repo1"]
+    assert sorted(pages) == sorted(site.skill_ids)
+
+
+def test_repo_pages_are_archived_for_reparse(standin, monkeypatch):
+    """测试 repo 页面进入页面存档，离线重建时展开到其下的 skill"""
+    site = SyntheticSite(11)
+    standin(site)
+    monkeypatch.setenv(page_archive.ARCHIVE_ENV, "1")
+    urls = parse_sitemap(render_sitemap(site.skill_ids))
+    cache.save_l0(enricher.build_index_records(urls, []))
+    enricher.enrich_index(fetch_workers=2)
+
+    cache.save_l0(enricher.build_index_records(urls, []))
+    stats = reparse_archive(workers=1)
+    assert stats["pages"] == 3 and stats["l0"] == 11
+    assert all(rec["description"] for rec in cache.load_l0())
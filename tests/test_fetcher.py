@@ -1,7 +1,15 @@
 # -*- coding: utf-8 -*-
 """tests for fetcher"""
 
+import socket
+import threading
+import time
+import urllib.error
+
+import tools.cache as cache
+import tools.connectivity as connectivity
 import tools.fetcher as fetcher
+from tools.standin_server import SyntheticSite
 
 
 def test_fetch_url_timeout():
@@ -43,3 +51,163 @@ def test_retry_config():
     assert fetcher.REQUEST_TIMEOUT == 10
     assert fetcher.MAX_RETRIES == 1
     assert len(fetcher.BACKOFF) == 2
+
+
+def test_negative_cache_short_circuits(standin):
+    """测试 4xx 页面进入负缓存，再次请求直接返回"""
+    server = standin(SyntheticSite(1))
+    url = "https://skills.sh/acme/missing/page"
+    content, err = fetcher.fetch_url(url, max_retries=0)
+    assert "HTTP 404" in err
+    requests = server.stats["requests"]
+
+    content, err = fetcher.fetch_url(url, max_retries=0)
+    assert content is None
+    assert "近期失败" in err
+    assert server.stats["requests"] == requests
+
+
+def test_network_failure_not_negative_cached():
+    """测试网络级失败不进入负缓存，恢复在线后立即重试"""
+    url = "http://localhost:99999/negative"
+    content, err = fetcher.fetch_url(url, timeout=1, max_retries=0)
+    assert err is not None
+    assert fetcher.negative_cache.get(url) is None
+
+    connectivity.tracker.mark_online()
+    content, err = fetcher.fetch_url(url, timeout=1, max_retries=0)
+    assert "近期失败" not in err
+
+
+def test_negative_cache_expired():
+    """测试负缓存过期后不再命中"""
+    url = "http://localhost:99999/expired"
+    nc = fetcher.NegativeCache(ttl=-1)
+    nc.add(url, "HTTP 404: Not Found")
+    assert nc.get(url) is None
+
+
+def test_circuit_breaker_opens_after_threshold():
+    """测试连续失败达到阈值后熔断"""
+    cb = fetcher.CircuitBreaker(threshold=2, cooldown=60)
+    assert cb.remaining("skills.sh") == 0
+    cb.record_failure("skills.sh")
+    assert cb.remaining("skills.sh") == 0
+    cb.record_failure("skills.sh")
+    assert cb.remaining("skills.sh") > 0
+    assert cb.remaining("other.host") == 0
+    cb.record_success("skills.sh")
+    assert cb.remaining("skills.sh") == 0
+
+
+def test_circuit_breaker_state_is_shared_across_instances():
+    """测试熔断状态持久化，新进程（新实例）同样拒绝请求"""
+    first = fetcher.CircuitBreaker(threshold=2, cooldown=60, filename="cb-test.json")
+    first.record_failure("skills.sh")
+    first.record_failure("skills.sh")
+    second = fetcher.CircuitBreaker(threshold=2, cooldown=60, filename="cb-test.json")
+    assert second.remaining("skills.sh") > 0
+    second.reset()
+    assert first.remaining("skills.sh") == 0
+
+
+def test_circuit_breaker_half_open():
+    """测试冷却结束后半开放行，再失败立即熔断"""
+    cb = fetcher.CircuitBreaker(threshold=3, cooldown=0)
+    for _ in range(3):
+        cb.record_failure("skills.sh")
+    assert cb.remaining("skills.sh") == 0
+    cb.cooldown = 60
+    cb.record_failure("skills.sh")
+    assert cb.remaining("skills.sh") > 0
+
+
+def test_circuit_breaker_half_open_admits_one_probe():
+    """测试半开只放行一次试探，试探返回前其他调用方仍被拒绝"""
+    cb = fetcher.CircuitBreaker(threshold=1, cooldown=0)
+    cb.record_failure("skills.sh")
+    cb.cooldown = 60
+    state = cache.load_json_state(cb._path())
+    state["skills.sh"]["opened_at"] -= 120
+    cache.save_json_atomic(cb._path(), state)
+
+    assert cb.remaining("skills.sh") == 0
+    assert cb.remaining("skills.sh") > 0
+    cb.record_success("skills.sh")
+    assert cb.remaining("skills.sh") == 0
+
+
+def test_circuit_breaker_concurrent_failures_are_not_lost():
+    """测试并发记录失败时读-改-写不丢失计数"""
+    cb = fetcher.CircuitBreaker(threshold=1000, cooldown=60)
+    threads = [
+        threading.Thread(target=cb.record_failure, args=("skills.sh",))
+        for _ in range(16)
+    ]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert cache.load_json_state(cb._path())["skills.sh"]["failures"] == 16
+
+
+def test_network_failure_enters_offline_mode():
+    """测试连续网络级失败后进入离线模式，后续请求立即返回"""
+    content, err = fetcher.fetch_url(
+        "http://localhost:99999/offline", timeout=1, max_retries=0
+    )
+    assert err is not None
+    assert not connectivity.is_offline()
+    content, err = fetcher.fetch_url(
+        "http://localhost:99999/offline2", timeout=1, max_retries=0
+    )
+    assert connectivity.is_offline()
+
+    start = time.time()
+    content, err = fetcher.fetch_url("http://localhost:99999/other", timeout=1)
+    assert content is None
+    assert fetcher.MESSAGES["offline_mode"] in err
+    assert time.time() - start < 0.5
+
+
+def test_offline_env_forces_offline(monkeypatch):
+    """测试环境变量强制离线"""
+    connectivity.tracker.mark_online()
+    assert connectivity.is_offline() is False
+    monkeypatch.setenv(connectivity.OFFLINE_ENV, "1")
+    assert connectivity.is_offline() is True
+    assert connectivity.tracker.reason() == f"{connectivity.OFFLINE_ENV}=1"
+
+
+def test_read_timeout_counts_against_host_not_connectivity(standin):
+    """测试单个 URL 读取超时只计入该 host 的熔断，不进入离线模式"""
+    standin(SyntheticSite(1), latency=1.0)
+    content, err = fetcher.fetch_url(
+        "https://skills.sh/sitemap.xml", timeout=0.2, max_retries=0
+    )
+    assert "超时" in err
+    assert not connectivity.is_offline()
+
+
+def test_single_refused_connection_stays_online(standin):
+    """测试单次拒绝连接不进入离线，其间的成功请求清零计数"""
+    standin(SyntheticSite(1))
+    fetcher.fetch_url("http://localhost:99999/refused", timeout=1, max_retries=0)
+    assert not connectivity.is_offline()
+    content, err = fetcher.fetch_url("https://skills.sh/sitemap.xml", max_retries=0)
+    assert err is None
+    fetcher.fetch_url("http://localhost:99999/refused", timeout=1, max_retries=0)
+    assert not connectivity.is_offline()
+
+
+def test_connect_timeout_is_a_connectivity_failure(monkeypatch):
+    """测试连接超时（URLError 包装的 socket.timeout）按网络级失败处理"""
+
+    def blackhole(req, timeout):
+        raise urllib.error.URLError(socket.timeout("timed out"))
+
+    monkeypatch.setattr(fetcher.urllib.request, "urlopen", blackhole)
+    for n in range(2):
+        content, err = fetcher.fetch_url(f"https://example.com/{n}", max_retries=0)
+        assert "timed out" in err
+    assert connectivity.is_offline()
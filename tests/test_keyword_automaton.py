@@ -0,0 +1,37 @@
+# -*- coding: utf-8 -*-
+"""tests for keyword_automaton and the detectors built on it"""
+
+import random
+
+from tools.intent_analyzer import _detect_domain_fallback, _extract_terms_fallback
+from tools.keyword_automaton import AhoCorasick, scan
+from tools.skill_detector import is_skill_query
+
+
+def test_automaton_matches_naive_search():
+    """测试自动机结果与逐模式子串查找一致（含重叠模式）"""
+    patterns = ["he", "she", "his", "hers", "a", "ab", "bab", "aa"]
+    automaton = AhoCorasick(patterns)
+    rng = random.Random(0)
+    for _ in range(500):
+        text = "".join(rng.choice("abhesrx") for _ in range(rng.randint(0, 15)))
+        naive = sorted(
+            (i, p) for p in patterns for i in range(len(text)) if text.startswith(p, i)
+        )
+        assert sorted(automaton.finditer(text)) == naive
+
+
+def test_ordered_pairs():
+    """测试 A.*B 形式的先后顺序判断"""
+    assert scan("可以用吗").has_ordered("可以", "吗")
+    assert not scan("吗可以").has_ordered("可以", "吗")
+
+
+def test_detectors_share_scan():
+    """测试触发词、询问词、领域关键词由同一次扫描得出"""
+    query = "有没有 React video 相关的 skill"
+    assert is_skill_query(query)[0]
+    assert not is_skill_query("react video player")[0]
+    assert is_skill_query("需要一个 Skill")[0]
+    assert _detect_domain_fallback(query) == "frontend"
+    assert _extract_terms_fallback(query) == ["video", "video-player", "streaming"]
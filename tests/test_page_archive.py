@@ -0,0 +1,104 @@
+# -*- coding: utf-8 -*-
+"""tests for page_archive / reparser"""
+
+import tempfile
+
+import tools.cache as cache
+import tools.detail_loader as detail_loader
+import tools.page_archive as page_archive
+from tools.id_resolver import SkillID
+from tools.parser import build_l0_record
+from tools.reparser import reparse_archive
+from tools.standin_server import render_skill_page
+
+
+def test_archive_is_content_addressed():
+    """测试相同内容只存一份，截断页面不覆盖完整页面引用"""
+    archive = page_archive.PageArchive(tempfile.mkdtemp())
+    page = render_skill_page("a/b/c")
+    digest = archive.save("a/b/c", "https://skills.sh/a/b/c", page)
+    assert archive.save("a/b/d", "https://skills.sh/a/b/d", page) == digest
+    assert len(list(archive.root.glob("objects/*/*.html.gz"))) == 1
+    assert archive.get(digest) == page
+
+    archive.save("a/b/c", "https://skills.sh/a/b/c", page[:200], complete=False)
+    assert archive.load_ref("a/b/c")["sha256"] == digest
+
+
+def test_fetch_archives_page_when_enabled(monkeypatch):
+    """测试启用存档后详情抓取会写入存档"""
+    page = render_skill_page("owner/repo/archived")
+    monkeypatch.setenv(page_archive.ARCHIVE_ENV, "1")
+    monkeypatch.setattr(
+        detail_loader, "fetch_details", lambda url, **kwargs: ({"raw": page}, None)
+    )
+    detail_loader.get_skill_detail(SkillID.parse("owner/repo/archived"), force=True)
+    ref = page_archive.PageArchive().load_ref("owner/repo/archived")
+    assert ref["complete"] and ref["sha256"] == page_archive.content_hash(page)
+
+
+def test_reparse_rebuilds_l1_and_l0():
+    """测试离线从存档并行重建 l1 与 l0"""
+    archive = page_archive.PageArchive(tempfile.mkdtemp())
+    ids = [f"owner/repo/skill-{i}" for i in range(4)]
+    for skill_id in ids:
+        archive.save(
+            skill_id, f"https://skills.sh/{skill_id}", render_skill_page(skill_id)
+        )
+    head = render_skill_page("owner/repo/head-only").split("</head>")[0]
+    archive.save(
+        "owner/repo/head-only",
+        "https://skills.sh/owner/repo/head-only",
+        head,
+        complete=False,
+    )
+    cache.save_l0(
+        [
+            build_l0_record(f"https://skills.sh/{i}")
+            for i in ids + ["owner/repo/head-only"]
+        ]
+    )
+
+    stats = reparse_archive(workers=2, archive=archive)
+    assert stats == {"pages": 5, "l1": 4, "l0": 5, "failed": 0}
+    assert cache.load_l1("owner/repo/skill-1")["title"] == "Skill 1"
+    assert cache.load_l1("owner/repo/head-only") is None
+    assert all(rec["description"] for rec in cache.load_l0())
+
+
+def test_reparse_skips_corrupt_archive_entries():
+    """测试截断或损坏的存档对象计为失败，其余页面照常重建"""
+    archive = page_archive.PageArchive(tempfile.mkdtemp())
+    ids = ["owner/repo/ok", "owner/repo/truncated", "owner/repo/garbled"]
+    digests = [
+        archive.save(i, f"https://skills.sh/{i}", render_skill_page(i)) for i in ids
+    ]
+    truncated = archive.object_path(digests[1])
+    truncated.write_bytes(truncated.read_bytes()[:40])
+    garbled = archive.object_path(digests[2])
+    data = bytearray(garbled.read_bytes())
+    data[20:40] = b"\xff" * 20
+    garbled.write_bytes(bytes(data))
+    cache.save_l0([build_l0_record(f"https://skills.sh/{i}") for i in ids])
+
+    stats = reparse_archive(workers=1, archive=archive)
+    assert stats == {"pages": 3, "l1": 1, "l0": 1, "failed": 2}
+
+
+def test_archive_write_failure_does_not_fail_fetch(monkeypatch, capsys):
+    """测试存档写入失败只提示，不影响详情抓取"""
+    page = render_skill_page("owner/repo/unwritable")
+    monkeypatch.setenv(page_archive.ARCHIVE_ENV, "1")
+    monkeypatch.setattr(
+        detail_loader, "fetch_details", lambda url, **kwargs: ({"raw": page}, None)
+    )
+
+    def disk_full(*args, **kwargs):
+        raise OSError(28, "No space left on device")
+
+    monkeypatch.setattr(page_archive.PageArchive, "save", disk_full)
+    data, err = detail_loader.get_skill_detail(
+        SkillID.parse("owner/repo/unwritable"), force=True
+    )
+    assert err is None and data["description"]
+    assert "页面存档失败" in capsys.readouterr().err
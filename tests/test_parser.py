@@ -1,8 +1,10 @@
 # -*- coding: utf-8 -*-
 """parser.py fixture 加固测试"""
 
+import json
 import os
 import unittest
+from unittest import mock
 
 try:
     from tools.parser import (
@@ -12,6 +14,12 @@ try:
         parse_skill_details,
         extract_meta_content,
         extract_title,
+        extract_head_fields,
+        find_next_data,
+        IncrementalExtractor,
+        select_next_data,
+        project_detail,
+        parse_repo_skills,
     )
 except ImportError:
     from parser import (
@@ -21,6 +29,12 @@ except ImportError:
         parse_skill_details,
         extract_meta_content,
         extract_title,
+        extract_head_fields,
+        find_next_data,
+        IncrementalExtractor,
+        select_next_data,
+        project_detail,
+        parse_repo_skills,
     )
 
 FIXTURES_DIR = os.path.join(os.path.dirname(__file__), "fixtures")
@@ -218,5 +232,180 @@ class TestExtractMetaContent(unittest.TestCase):
         self.assertEqual(result, "", "空 content 应返回空字符串")
 
 
+class TestHeadBoundedExtraction(unittest.TestCase):
+    """单遍 head 提取测试"""
+
+    def test_head_fields_single_pass(self):
+        """测试一次扫描提取全部 meta 与 title"""
+        with open(
+            os.path.join(FIXTURES_DIR, "skill_without_next_data.html"),
+            "r",
+            encoding="utf-8",
+        ) as f:
+            html = f.read()
+
+        fields = extract_head_fields(html)
+        self.assertEqual(fields["title"], "Fallback Skill Title")
+        self.assertEqual(fields["meta"]["og:title"], "Fallback OG Title")
+        self.assertEqual(fields["meta"]["keywords"], "fallback, test, example")
+        self.assertIn("description", fields["meta"])
+
+    def test_head_scan_stops_at_head_end(self):
+        """测试 </head> 之后的 meta 不被扫描"""
+        html = (
+            '<head><meta name="description" content="in head"></head>'
+            '<body><meta name="keywords" content="in body"></body>'
+        )
+        fields = extract_head_fields(html)
+        self.assertEqual(fields["meta"], {"description": "in head"})
+
+    def test_find_next_data_after_large_body(self):
+        """测试大正文之后的 __NEXT_DATA__ 仍能定位"""
+        html = (
+            "<head><title>T</title></head><body>"
+            + "<p>filler</p>" * 20000
+            + '<script id="__NEXT_DATA__" type="application/json">'
+            + '{"props":{"pageProps":{"skill":{"id":"a/b/c"}}}}</script></body>'
+        )
+        self.assertIn('"a/b/c"', find_next_data(html))
+        self.assertEqual(parse_skill_details(html), {"id": "a/b/c"})
+
+    def test_find_next_data_missing(self):
+        """测试缺失 __NEXT_DATA__ 时返回 None"""
+        self.assertIsNone(find_next_data("<head></head><body>x</body>"))
+
+
+class TestIncrementalExtractor(unittest.TestCase):
+    """流式增量提取测试"""
+
+    def _load(self, name):
+        with open(os.path.join(FIXTURES_DIR, name), "r", encoding="utf-8") as f:
+            return f.read()
+
+    def _feed(self, extractor, html, size=7):
+        for i in range(0, len(html), size):
+            if extractor.feed(html[i : i + size]):
+                return i + size
+        return len(html)
+
+    def test_stops_after_next_data(self):
+        """测试 __NEXT_DATA__ 结束后即完成，结果与整页解析一致"""
+        html = self._load("skill_with_next_data.html")
+        extractor = IncrementalExtractor()
+        consumed = self._feed(extractor, html)
+        self.assertTrue(extractor.done)
+        self.assertLess(consumed, len(html))
+        self.assertEqual(parse_skill_details(extractor.text), parse_skill_details(html))
+
+    def test_head_only_stops_at_head(self):
+        """测试 head_only 模式读到 </head> 即完成"""
+        html = self._load("skill_with_next_data.html")
+        extractor = IncrementalExtractor(head_only=True)
+        consumed = self._feed(extractor, html)
+        self.assertTrue(extractor.done)
+        self.assertLess(consumed, html.index("<body>") + 7)
+        self.assertIn("og:meta", parse_skill_details(extractor.text)["description"])
+
+    def test_head_only_without_description_reads_next_data(self):
+        """测试 head 无描述时继续读取 __NEXT_DATA__"""
+        html = self._load("skill_missing_fields.html")
+        extractor = IncrementalExtractor(head_only=True)
+        self._feed(extractor, html)
+        self.assertEqual(
+            parse_skill_details(extractor.text), {"id": "owner/repo/minimal"}
+        )
+
+
+class TestSelectNextData(unittest.TestCase):
+    """__NEXT_DATA__ 选择性解码测试"""
+
+    def test_select_skill_subtree(self):
+        """测试只解码 pageProps.skill，忽略嵌套的同名键"""
+        text = json.dumps(
+            {
+                "props": {
+                    "pageProps": {
+                        "layout": {"skill": "nested", "s": 'a\\"}{'},
+                        "data": [1, 2],
+                        "skill": {"title": "T"},
+                    }
+                },
+                "page": "/x",
+            }
+        )
+        self.assertEqual(select_next_data(text), {"title": "T"})
+
+    def test_select_priority_and_fallback_keys(self):
+        """测试按 skill/data/result/skillInfo 优先级选择"""
+        text = '{"props":{"pageProps":{"skillInfo":{"a":1},"result":{"b":2}}}}'
+        self.assertEqual(select_next_data(text), {"b": 2})
+
+    def test_select_size_cap(self):
+        """测试子树超过上限时放弃解码"""
+        text = json.dumps({"props": {"pageProps": {"skill": {"d": "x" * 200}}}})
+        self.assertIsNone(select_next_data(text, max_bytes=100))
+        self.assertIsNotNone(select_next_data(text, max_bytes=1000))
+
+    def test_select_size_cap_bounds_decoding(self):
+        """测试超大子树只解码到上限为止"""
+        import tools.parser as parser_module
+
+        text = json.dumps({"props": {"pageProps": {"skill": {"d": "x" * 100000}}}})
+        decoder = parser_module._decoder
+        with mock.patch.object(
+            decoder, "raw_decode", wraps=decoder.raw_decode
+        ) as raw_decode:
+            self.assertIsNone(select_next_data(text, max_bytes=100))
+        self.assertTrue(all(len(c.args[0]) <= 101 for c in raw_decode.call_args_list))
+
+    def test_project_detail_keeps_display_fields(self):
+        """测试 l1 只保留展示字段"""
+        detail = {
+            "title": "T",
+            "description": "D",
+            "author": {"name": "alice", "avatar": "x"},
+            "tags": ["a", {"name": "b"}],
+            "updatedAt": "2026-01-01",
+            "readme": "<large>",
+        }
+        self.assertEqual(
+            project_detail(detail),
+            {
+                "title": "T",
+                "description": "D",
+                "author": "alice",
+                "tags": ["a", "b"],
+                "updated_at": "2026-01-01",
+            },
+        )
+
+    def test_parse_repo_skills(self):
+        """测试 repo 页面列表只取带描述的条目"""
+        text = json.dumps(
+            {
+                "props": {
+                    "pageProps": {
+                        "skills": [
+                            {"id": "o/r/a", "description": "A"},
+                            {"slug": "b", "description": "B"},
+                            {"slug": "c"},
+                        ]
+                    }
+                }
+            }
+        )
+        html = f'<script id="__NEXT_DATA__" type="application/json">{text}</script>'
+        self.assertEqual(sorted(parse_repo_skills(html, "o", "r")), ["o/r/a", "o/r/b"])
+
+    def test_parse_repo_skills_without_metadata(self):
+        """测试 repo 页面没有 skills 列表时返回 None（区别于空列表）"""
+        text = json.dumps({"props": {"pageProps": {"repo": {"name": "r"}}}})
+        html = f'<script id="__NEXT_DATA__" type="application/json">{text}</script>'
+        self.assertIsNone(parse_repo_skills(html, "o", "r"))
+        text = json.dumps({"props": {"pageProps": {"skills": []}}})
+        html = f'<script id="__NEXT_DATA__" type="application/json">{text}</script>'
+        self.assertEqual(parse_repo_skills(html, "o", "r"), {})
+
+
 if __name__ == "__main__":
     unittest.main()
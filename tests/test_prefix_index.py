@@ -0,0 +1,79 @@
+# -*- coding: utf-8 -*-
+"""tests for prefix_index"""
+
+import json
+
+import tools.cache as cache
+from tools.prefix_index import build_prefix_index, complete, list_tree
+
+
+def _rec(skill_id, valid=True):
+    owner, repo, slug = skill_id.split("/")
+    return {"id": skill_id, "slug": slug, "valid": valid}
+
+
+RECORDS = [
+    _rec("obra/superpowers/using-git-worktrees"),
+    _rec("obra/superpowers/using-superpowers"),
+    _rec("Obra/Other/brainstorming"),
+    _rec("acme/tools/using-git-hooks"),
+    _rec("acme/tools/broken", valid=False),
+]
+
+
+def test_id_prefix_then_slug_prefix():
+    index = build_prefix_index(RECORDS, "v1")
+    assert complete(index, "obra/superpowers/using-", 10) == [
+        "obra/superpowers/using-git-worktrees",
+        "obra/superpowers/using-superpowers",
+    ]
+    # id 前缀不区分大小写
+    assert complete(index, "OBRA/o", 10) == ["Obra/Other/brainstorming"]
+    # slug 前缀：按 slug 排序
+    assert complete(index, "using-git", 10) == [
+        "acme/tools/using-git-hooks",
+        "obra/superpowers/using-git-worktrees",
+    ]
+    assert complete(index, "obra", 2) == [
+        "Obra/Other/brainstorming",
+        "obra/superpowers/using-git-worktrees",
+    ]
+    assert complete(index, "broken", 10) == []
+    assert complete(index, "zzz", 10) == []
+
+
+def test_complete_prefix_with_and_without_stored_index():
+    cache.save_l0([dict(r, url=f"https://skills.sh/{r['id']}") for r in RECORDS[:4]])
+    assert cache.get_prefix_path().exists()
+    assert cache.complete_prefix("acme/", 5) == ["acme/tools/using-git-hooks"]
+
+    cache.save_l0(
+        [dict(r, url=f"https://skills.sh/{r['id']}") for r in RECORDS[:2]],
+        derived=False,
+    )
+    assert cache.complete_prefix("using-", 5) == [
+        "obra/superpowers/using-git-worktrees",
+        "obra/superpowers/using-superpowers",
+    ]
+
+
+def test_lowercase_keys_are_stored_at_build_time():
+    index = build_prefix_index(RECORDS, "v1")
+    assert index["id_keys"] == [i.lower() for i in index["ids"]]
+    assert index["id_keys"] == sorted(index["id_keys"])
+    stored = json.loads(json.dumps(index))
+    assert complete(stored, "obra/o", 10) == ["Obra/Other/brainstorming"]
+
+
+def test_list_tree_groups_by_repo():
+    index = build_prefix_index(RECORDS, "v1")
+    assert list_tree(index, "OBRA") == {
+        "Obra/Other": ["Obra/Other/brainstorming"],
+        "obra/superpowers": [
+            "obra/superpowers/using-git-worktrees",
+            "obra/superpowers/using-superpowers",
+        ],
+    }
+    assert list(list_tree(index, "obra", "superpowers")) == ["obra/superpowers"]
+    assert list_tree(index, "obra", "missing") == {}
+    assert list_tree(index, "nobody") == {}
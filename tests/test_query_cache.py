@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+"""tests for query_cache"""
+
+import os
+import time
+
+import tools.cache as cache
+import tools.smart_search as smart_search
+from tools.query_cache import QueryCache, normalize_query
+
+
+def test_normalize_query():
+    assert normalize_query("  React   Video ") == "react video"
+
+
+def test_key_tracks_index_version():
+    """测试 l0 变化后 key 随之变化（旧结果自动失效）"""
+    qc = QueryCache()
+    cache.save_l0([{"id": "a/b/c"}])
+    key = qc.key("React video", 5)
+    assert key == qc.key("react  video", 5)
+    assert key != qc.key("react video", 3)
+    qc.put(key, "output")
+    assert qc.get(key) == "output"
+
+    cache.save_l0([{"id": "a/b/c"}, {"id": "a/b/d"}])
+    assert qc.key("react video", 5) != key
+
+
+def test_lru_eviction():
+    """测试超出容量时淘汰最久未使用的条目"""
+    qc = QueryCache(capacity=2)
+    qc.put("k1", "1")
+    qc.put("k2", "2")
+    old = time.time() - 60
+    os.utime(qc._path("k1"), (old, old))
+    os.utime(qc._path("k2"), (old - 10, old - 10))
+    assert qc.get("k2") == "2"
+    qc.put("k3", "3")
+    assert qc.get("k1") is None
+    assert qc.get("k2") == "2" and qc.get("k3") == "3"
+
+
+def test_smart_search_uses_cache(monkeypatch):
+    """测试重复查询直接返回缓存结果，标题使用本次查询的原文"""
+    cache.save_l0([{"id": "a/b/react", "slug": "react", "description": "react"}])
+    calls = []
+    monkeypatch.setattr(
+        smart_search,
+        "_format_results",
+        lambda q, k, c: calls.append(q) or (f"out:{q.lower()}", ["a/b/react"]),
+    )
+    first = smart_search.smart_search("find react skill")
+    second = smart_search.smart_search("Find  React skill")
+    assert first.endswith("out:find react skill")
+    assert second.endswith("out:find react skill")
+    assert '"Find  React skill"' in second.splitlines()[0]
+    assert len(calls) == 1
+    assert cache.load_hits() == {"a/b/react": 2}
+
+
+def test_no_results_body_is_shared_by_query_variants():
+    """测试无结果时的建议也只取决于规范化查询，各变体得到同样的正文"""
+    cache.save_l0(
+        [{"id": "a/b/react", "slug": "react", "url": "https://skills.sh/a/b/react"}]
+    )
+    first = smart_search.smart_search("Zyx  Qwv")
+    second = smart_search.smart_search("zyx qwv")
+    assert first.split("\n", 1)[1] == second.split("\n", 1)[1]
+    assert "Suggestion" in second and "Zyx" not in second.split("\n", 1)[1]
@@ -0,0 +1,82 @@
+# -*- coding: utf-8 -*-
+"""tests for semantic"""
+
+import subprocess
+import sys
+
+import pytest
+
+import tools.cache as cache
+import tools.smart_search as smart_search
+from tools.semantic import feature_id, tokenize
+
+pytest.importorskip("numpy")
+
+
+RECORDS = [
+    {
+        "id": "acme/live/stream-viewer",
+        "slug": "stream-viewer",
+        "url": "https://skills.sh/acme/live/stream-viewer",
+        "description": "Watch live streams in the browser",
+    },
+    {
+        "id": "acme/docs/pdf-export",
+        "slug": "pdf-export",
+        "url": "https://skills.sh/acme/docs/pdf-export",
+        "description": "Export documents to PDF",
+    },
+    {
+        "id": "acme/docs/broken",
+        "slug": "broken",
+        "url": "",
+        "description": "Live streams without a page",
+    },
+]
+
+
+def test_numpy_is_imported_lazily():
+    """测试只导入缓存层（词法检索）时不导入 NumPy"""
+    code = "import sys, tools.cache; print('numpy' in sys.modules)"
+    out = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    assert out.stdout.strip() == "False"
+
+
+def test_tokenize_word_and_char_ngrams():
+    tokens = tokenize("Live-Stream")
+    assert tokens[:3] == ["live", "stream", "live stream"]
+    assert "<liv" in tokens and "eam>" in tokens
+
+
+def test_feature_id_is_stable():
+    """测试特征哈希与进程无关（不使用内置 hash）"""
+    assert feature_id("video") == feature_id("video")
+    assert feature_id("video") != feature_id("media")
+
+
+def test_search_ranks_by_similarity():
+    cache.save_l0([dict(rec) for rec in RECORDS])
+    assert cache.get_semantic_path().exists()
+    hits = cache.search_l0_semantic("export docs as pdf", top_k=5)
+    assert [rec["id"] for rec in hits] == ["acme/docs/pdf-export"]
+
+
+def test_stale_index_is_ignored():
+    """测试 l0 更新后旧语义索引不再被使用"""
+    cache.save_l0([dict(rec) for rec in RECORDS])
+    path = cache.get_semantic_path()
+    stale = path.read_bytes()
+    cache.save_l0([dict(RECORDS[1])])
+    path.write_bytes(stale)
+    assert cache.search_l0_semantic("live streams", top_k=5) == []
+
+
+def test_smart_search_falls_back_to_semantic():
+    """测试词法召回不足时语义结果补位（streaming 不是 stream 的子串）"""
+    cache.save_l0([dict(rec) for rec in RECORDS])
+    assert cache.search_l0_multi(["streaming", "broadcasts"]) == []
+    output = smart_search.smart_search("streaming broadcasts", 5)
+    assert "acme/live/stream-viewer" in output
+    assert "acme/docs/broken" not in output
@@ -0,0 +1,29 @@
+# -*- coding: utf-8 -*-
+"""tests for skills (CLI helpers)"""
+
+import argparse
+
+import tools.skills as skills
+
+
+def test_read_ids_skips_indented_comments(tmp_path):
+    """测试缩进的 # 注释与空行被忽略"""
+    path = tmp_path / "ids.txt"
+    path.write_text("a/b/c\n  # comment\n\n\t#tab comment\n  d/e/f  \n", "utf-8")
+    assert skills.read_ids(str(path)) == ["a/b/c", "d/e/f"]
+
+
+def test_show_reports_fetch_exception_per_id(monkeypatch, capsys):
+    """测试单个 ID 抓取抛出异常时只输出该 ID 的错误，其余照常输出"""
+
+    def get_skill_detail(skill_id):
+        if skill_id.skill == "boom":
+            raise RuntimeError("parser crashed")
+        return {"id": skill_id.to_cache_key(), "description": "ok"}, None
+
+    monkeypatch.setattr(skills, "get_skill_detail", get_skill_detail)
+    monkeypatch.setattr(skills, "format_show_result", lambda data: f"## {data['id']}")
+    skills.cmd_show(argparse.Namespace(ids=["a/b/boom", "a/b/fine"], from_file=None))
+    out = capsys.readouterr().out
+    assert "parser crashed" in out
+    assert "## a/b/fine" in out
@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+"""tests for smart_search"""
+
+import tools.cache as cache
+import tools.smart_search as smart_search_module
+from tools.parser import build_l0_record
+from tools.smart_search import smart_search
+
+
+def test_smart_search_end_to_end():
+    """测试完整的智能搜索流程（扩展 → 检索 → 校验 → 排序）"""
+    records = []
+    for skill_id, desc in [
+        ("acme/web/react-video-player", "React video player component"),
+        ("acme/web/css-grid", "CSS grid layouts"),
+        ("acme/ops/docker-deploy", "Deploy containers"),
+    ]:
+        detail = {"title": skill_id, "description": desc}
+        records.append(build_l0_record(f"https://skills.sh/{skill_id}", detail))
+    cache.save_l0(records)
+
+    output = smart_search("find a react video player skill", top_k=2)
+    assert "acme/web/react-video-player" in output
+    assert "docker-deploy" not in output
+
+
+def test_domain_candidates_widen_when_short(monkeypatch):
+    """测试先在领域候选内打分，不足 top_k 时再扩大到其余记录"""
+    records = []
+    for skill_id, desc in [
+        ("acme/media/video-transcode", "Transcode video files"),
+        ("acme/misc/player-stats", "Stats for any player"),
+    ]:
+        detail = {"title": skill_id, "description": desc}
+        records.append(build_l0_record(f"https://skills.sh/{skill_id}", detail))
+    cache.save_l0(records)
+
+    calls = []
+    search = smart_search_module.search_l0_multi
+    monkeypatch.setattr(
+        smart_search_module,
+        "search_l0_multi",
+        lambda queries, candidates=None, scanned=None: calls.append(candidates)
+        or search(queries, candidates=candidates, scanned=scanned),
+    )
+    output = smart_search_module.smart_search("video player", 5)
+    assert calls[0] == cache.get_domain_candidates("video") == 1
+    assert calls[1] == ~1
+    assert output.index("video-transcode") < output.index("player-stats")
+
+
+def test_result_count_reports_shown_results():
+    """测试结果数为实际显示的条数，而不是融合前的全部命中"""
+    records = [
+        build_l0_record(
+            f"https://skills.sh/acme/web/react-tool-{i}",
+            {"title": f"react tool {i}", "description": "React helper"},
+        )
+        for i in range(6)
+    ]
+    cache.save_l0(records)
+
+    output = smart_search("find a react skill", top_k=2)
+    assert output.count("npx skills add") == 2
+    assert "Found 2 related skills" in output
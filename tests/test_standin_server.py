@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""tests for fixture recording and the local stand-in server"""
+
+import tempfile
+
+import tools.fetcher as fetcher
+from tools.fixture_archive import RECORD_ENV, FixtureArchive
+from tools.parser import parse_sitemap, parse_skill_details
+from tools.standin_server import ReplaySite, SyntheticSite
+
+
+def test_synthetic_sitemap_and_details(standin):
+    """测试通过 SKILLS_SH_ORIGIN 从合成站点抓取 sitemap 与详情"""
+    standin(SyntheticSite(12, body_kb=4))
+    xml, err = fetcher.fetch_sitemap()
+    assert err is None
+    urls = parse_sitemap(xml)
+    assert len(urls) == 12
+    assert urls[0].startswith("https://skills.sh/")
+
+    raw, err = fetcher.fetch_details(urls[0])
+    assert err is None
+    detail = parse_skill_details(raw["raw"])
+    assert urls[0].endswith(detail["id"])
+    assert detail["description"]
+
+
+def test_error_injection(standin):
+    """测试错误注入返回 HTTP 500"""
+    server = standin(SyntheticSite(3), error_rate=1.0)
+    content, err = fetcher.fetch_url(
+        "https://skills.sh/sitemap.xml", max_retries=0, force=True
+    )
+    assert content is None
+    assert "HTTP 500" in err
+    assert server.stats["errors"] == 1
+
+
+def test_record_then_replay(standin, monkeypatch):
+    """测试录制响应后由回放服务器原样返回"""
+    archive_dir = tempfile.mkdtemp()
+    standin(SyntheticSite(5))
+    monkeypatch.setenv(RECORD_ENV, archive_dir)
+    xml, err = fetcher.fetch_sitemap()
+    url = parse_sitemap(xml)[0]
+    recorded, err = fetcher.fetch_details(url)
+    assert err is None
+
+    archive = FixtureArchive(archive_dir)
+    assert len(archive) == 2
+    assert archive.load(url)["status"] == 200
+
+    monkeypatch.delenv(RECORD_ENV)
+    standin(ReplaySite(archive))
+    replayed, err = fetcher.fetch_details(url, force=True)
+    assert err is None
+    assert replayed["raw"] == recorded["raw"]
+    content, err = fetcher.fetch_url(
+        "https://skills.sh/not/recorded/page", max_retries=0
+    )
+    assert "HTTP 404" in err
+
+
+def test_streaming_fetch_reads_less(standin):
+    """测试流式抓取提前断开，只读取需要的部分"""
+    server = standin(SyntheticSite(2, body_kb=256))
+    url = "https://skills.sh/" + server.site.skill_ids[0]
+    full, err = fetcher.fetch_details(url, force=True)
+    assert err is None
+    head, err = fetcher.fetch_details(url, force=True, stream=True, head_only=True)
+    assert err is None
+    assert len(head["raw"]) < len(full["raw"]) // 10
+    assert parse_skill_details(head["raw"])["description"]
+
+    streamed, err = fetcher.fetch_details(url, force=True, stream=True)
+    assert parse_skill_details(streamed["raw"]) == parse_skill_details(full["raw"])
+
+
+def test_recording_keeps_full_streamed_page(standin, monkeypatch, tmp_path):
+    """测试录制时流式抓取不提前断开，存档为完整页面"""
+    server = standin(SyntheticSite(1, body_kb=64))
+    monkeypatch.setenv(RECORD_ENV, str(tmp_path / "fixtures"))
+    url = "https://skills.sh/" + server.site.skill_ids[0]
+    raw, err = fetcher.fetch_details(url, stream=True, head_only=True)
+    assert err is None
+
+    _, full = server.site.get(server.site.skill_ids[0])
+    assert FixtureArchive(tmp_path / "fixtures").load(url)["body"] == full
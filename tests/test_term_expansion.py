@@ -0,0 +1,56 @@
+# -*- coding: utf-8 -*-
+"""tests for term_expansion"""
+
+import tools.cache as cache
+from tools.query_expander import expand_search_terms
+from tools.term_expansion import build_expansion_table, slug_tokens
+
+
+def _rec(slug):
+    return {
+        "id": f"acme/repo/{slug}",
+        "slug": slug,
+        "url": f"https://skills.sh/acme/repo/{slug}",
+        "description": "",
+    }
+
+
+RECORDS = [
+    _rec("video-player"),
+    _rec("video-player-hls"),
+    _rec("video-transcode"),
+    _rec("react-hooks"),
+    _rec("react-hooks-testing"),
+    _rec("react-player"),
+]
+
+
+def test_slug_tokens():
+    assert slug_tokens("ci-cd-v2-2024") == ["cd", "ci", "v2"]
+
+
+def test_pmi_table():
+    """测试只保留共现足够且 PMI 为正的词对"""
+    records = [cache.add_index_columns(dict(r)) for r in RECORDS]
+    table = build_expansion_table(records, "v1")
+    assert table["related"]["hooks"] == ["react"]
+    assert table["related"]["video"] == ["player"]
+    assert "hls" not in table["related"]
+    # 领域词只保留能在索引中检索到的
+    assert table["domains"]["video"] == ["video", "video-player", "transcode"]
+
+
+def test_table_is_stored_with_index():
+    cache.save_l0([dict(r) for r in RECORDS])
+    table = cache.get_expansion_table()
+    assert table["version"] == cache.l0_version()
+    cache.save_l0([dict(r) for r in RECORDS[:2]], derived=False)
+    assert cache.get_expansion_table() is None
+
+
+def test_expand_with_table_proposes_indexed_terms_only():
+    cache.save_l0([dict(r) for r in RECORDS])
+    expanded = expand_search_terms(["hooks"], "frontend", cache.get_expansion_table())
+    assert expanded["extended_terms"] == ["hooks", "react"]
+    static = expand_search_terms(["hooks"], "frontend")
+    assert "frontend-design" in static["extended_terms"]
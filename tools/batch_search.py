@@ -0,0 +1,134 @@
+# -*- coding: utf-8 -*-
+"""Batch search: many queries against one loaded index, one NDJSON line each"""
+
+import queue
+import sys
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+try:
+    from .cache import get_facet_candidates, scan_l0_terms, search_l0_batch
+    from .constants import BATCH_CHUNK_SIZE
+    from .skill_detector import is_skill_query
+    from .smart_search import smart_queries, smart_results
+except ImportError:
+    from cache import get_facet_candidates, scan_l0_terms, search_l0_batch
+    from constants import BATCH_CHUNK_SIZE
+    from skill_detector import is_skill_query
+    from smart_search import smart_queries, smart_results
+
+
+def read_queries(path: str) -> Iterator[str]:
+    """One query per non-blank line, read lazily; `-` reads stdin"""
+    if path == "-":
+        yield from _stripped(sys.stdin)
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            yield from _stripped(f)
+
+
+def _stripped(lines: Iterable[str]) -> Iterator[str]:
+    for line in lines:
+        line = line.strip()
+        if line:
+            yield line
+
+
+def _chunks(queries: Iterable[str], size: int) -> Iterator[List[str]]:
+    """
+    Group queries into chunks without waiting for more input
+
+    A reader thread pulls from `queries`; each chunk is the next query plus
+    whatever has already arrived (at most `size`). A file fills whole chunks,
+    while an interactive or slow producer gets an answer for every line as
+    soon as it is written.
+    """
+    pending: "queue.Queue[Any]" = queue.Queue()
+    end = object()
+
+    def pump():
+        try:
+            for item in queries:
+                pending.put(item)
+        except BaseException as e:  # re-raised in the consumer
+            pending.put(e)
+        pending.put(end)
+
+    threading.Thread(target=pump, daemon=True).start()
+    item = pending.get()
+    while item is not end:
+        chunk: List[str] = []
+        while True:
+            if isinstance(item, BaseException):
+                raise item
+            chunk.append(item)
+            if len(chunk) >= size:
+                item = pending.get()
+                break
+            try:
+                item = pending.get_nowait()
+            except queue.Empty:
+                item = None
+                break
+            if item is end:
+                break
+        yield chunk
+        if item is None:
+            item = pending.get()
+
+
+def _summary(rec: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "id": rec.get("id", ""),
+        "slug": rec.get("slug", ""),
+        "description": rec.get("description", ""),
+        "url": rec.get("url", ""),
+    }
+
+
+def run_batch(
+    queries: Iterable[str], top_k: int, filters: Optional[Dict] = None
+) -> Iterator[Dict[str, Any]]:
+    """
+    Answer every query, in input order, as the input arrives
+
+    Each query is routed like `search`: skill queries go through the smart
+    pipeline, everything else is a keyword search. Queries are taken in
+    chunks of what has already arrived (see _chunks); each chunk is scored
+    in a single pass over the index, covering the keyword queries and every
+    expanded term of the smart queries. The index and its derived files are
+    loaded once and shared by every query. Hits are not recorded, so
+    evaluation runs do not skew enrichment priority.
+
+    Yields:
+        {"query", "mode": "smart" | "keyword", "results": [...]}
+    """
+    candidates = get_facet_candidates(**filters) if filters else None
+    for chunk in _chunks(queries, BATCH_CHUNK_SIZE):
+        yield from _answer_chunk(chunk, top_k, candidates)
+
+
+def _answer_chunk(
+    chunk: List[str], top_k: int, candidates: Optional[int]
+) -> Iterator[Dict[str, Any]]:
+    smart = [is_skill_query(q)[0] for q in chunk]
+    keyword = [q for q, is_smart in zip(chunk, smart) if not is_smart]
+    planned = {q: smart_queries(q) for q, is_smart in zip(chunk, smart) if is_smart}
+    terms = keyword + [
+        term for plan in planned.values() for term in plan[2] if term.strip()
+    ]
+    scanned = scan_l0_terms(terms, candidates)
+    keyword_results = iter(search_l0_batch(keyword, top_k, candidates, scanned))
+
+    for query, is_smart in zip(chunk, smart):
+        if is_smart:
+            results = smart_results(
+                query, top_k, candidates, scanned=scanned, planned=planned[query]
+            )[0][:top_k]
+        else:
+            results = next(keyword_results)
+        yield {
+            "query": query,
+            "mode": "smart" if is_smart else "keyword",
+            "results": [_summary(rec) for rec in results],
+        }
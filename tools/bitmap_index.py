@@ -0,0 +1,111 @@
+# -*- coding: utf-8 -*-
+"""位图索引：按 l0 行号的 Python 大整数位图，随索引保存
+
+第 i 位为 1 表示 l0 第 i 条记录属于该集合；交集/并集即整数的 & / |。
+磁盘上稠密集合存小端字节的 base64，稀疏集合（如单个 owner）直接存行号列表。
+
+- domains: 领域 → 位图（DOMAIN_SKILL_TERMS 分类）
+- owner / repo / tag: 小写取值 → 位图（search 的 --owner/--repo/--tag 过滤）
+"""
+
+import base64
+import re
+from typing import Any, Dict, Iterable, List, Union
+
+try:
+    from .query_expander import DOMAIN_SKILL_TERMS
+except ImportError:
+    from query_expander import DOMAIN_SKILL_TERMS
+
+_ONE_RE = re.compile("1")
+
+
+def to_bitmap(indices: Iterable[int]) -> int:
+    """行号集合 → 位图（先置位字节数组，再一次转换为整数）"""
+    indices = list(indices)
+    if not indices:
+        return 0
+    buf = bytearray(max(indices) // 8 + 1)
+    for idx in indices:
+        buf[idx >> 3] |= 1 << (idx & 7)
+    return int.from_bytes(buf, "little")
+
+
+def to_indices(bitmap: int) -> List[int]:
+    """位图 → 升序行号（bin 字符串在 C 层反转查找，不逐位移位）"""
+    return [m.start() for m in _ONE_RE.finditer(bin(bitmap)[:1:-1])]
+
+
+def encode(bitmap: int) -> Union[str, List[int]]:
+    """稠密位图 → base64 字符串；置位数少于字节数 / 4 时 → 行号列表"""
+    size = (bitmap.bit_length() + 7) // 8
+    if bin(bitmap).count("1") * 4 < size:
+        return to_indices(bitmap)
+    return base64.b64encode(bitmap.to_bytes(size, "little")).decode("ascii")
+
+
+def decode(data: Union[str, List[int]]) -> int:
+    if isinstance(data, list):
+        return to_bitmap(data)
+    return int.from_bytes(base64.b64decode(data), "little")
+
+
+def _domain_patterns() -> Dict[str, "re.Pattern"]:
+    # 整词匹配（ai 不应命中 email）；general 不是分类
+    return {
+        domain: re.compile(
+            r"(?<![a-z0-9])(?:%s)(?![a-z0-9])"
+            % "|".join(re.escape(t.lower()) for t in terms)
+        )
+        for domain, terms in DOMAIN_SKILL_TERMS.items()
+        if domain != "general"
+    }
+
+
+def classify_domains(rec: Dict[str, Any]) -> List[str]:
+    """skill 所属的领域（检索列中整词出现该领域的任一词）"""
+    text = rec.get("search_text", "")
+    return [d for d, pattern in _DOMAIN_PATTERNS.items() if pattern.search(text)]
+
+
+_DOMAIN_PATTERNS = _domain_patterns()
+
+
+FACETS = ("owner", "repo", "tag")
+
+
+def facet_values(rec: Dict[str, Any], facet: str) -> List[str]:
+    """记录在某一 facet 上的取值（小写）"""
+    if facet == "tag":
+        return [str(t).lower() for t in rec.get("tags") or []]
+    value = rec.get(facet) or ""
+    return [value.lower()] if value else []
+
+
+def build_bitmap_index(records: List[Dict[str, Any]], version: str) -> Dict[str, Any]:
+    """
+    构建位图索引（只收录有效记录）
+
+    Returns:
+        {"version", "count", "domains", "owner", "repo", "tag"}，位图已编码
+    """
+    members: Dict[str, Dict[str, List[int]]] = {
+        "domains": {d: [] for d in _DOMAIN_PATTERNS}
+    }
+    for facet in FACETS:
+        members[facet] = {}
+    for idx, rec in enumerate(records):
+        if not rec.get("valid", True):
+            continue
+        for domain in classify_domains(rec):
+            members["domains"][domain].append(idx)
+        for facet in FACETS:
+            for value in facet_values(rec, facet):
+                rows = members[facet].setdefault(value, [])
+                if not rows or rows[-1] != idx:
+                    rows.append(idx)
+
+    index: Dict[str, Any] = {"version": version, "count": len(records)}
+    for name, groups in members.items():
+        index[name] = {key: encode(to_bitmap(rows)) for key, rows in groups.items()}
+    return index
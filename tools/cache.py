@@ -4,17 +4,48 @@
 import hashlib
 import json
 import os
+import threading
 import time
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 try:
-    from .constants import CACHE_DIR, CACHE_TTL_DAYS
+    from .constants import CACHE_DIR, CACHE_TTL_DAYS, RRF_K
+    from .result_validator import validate_skill
+    from .semantic import build_semantic_index, semantic_search
+    from .term_expansion import build_expansion_table
+    from .prefix_index import build_prefix_index, complete, list_tree
+    from .bitmap_index import (
+        build_bitmap_index,
+        decode,
+        facet_values,
+        to_bitmap,
+        to_indices,
+    )
 except ImportError:
-    from constants import CACHE_DIR, CACHE_TTL_DAYS
+    from constants import CACHE_DIR, CACHE_TTL_DAYS, RRF_K
+    from result_validator import validate_skill
+    from semantic import build_semantic_index, semantic_search
+    from term_expansion import build_expansion_table
+    from prefix_index import build_prefix_index, complete, list_tree
+    from bitmap_index import (
+        build_bitmap_index,
+        decode,
+        facet_values,
+        to_bitmap,
+        to_indices,
+    )
 
 L0_FILENAME = "l0.jsonl"
 L1_DIRNAME = "l1"
+HITS_FILENAME = "hits.json"
+SEMANTIC_FILENAME = "l0.tfidf.npz"
+EXPANSION_FILENAME = "l0.expand.json"
+BITMAPS_FILENAME = "l0.bitmaps.json"
+PREFIX_FILENAME = "l0.prefix.json"
+
+# 进程内缓存：文件路径 → (l0 版本, 内容)，版本变化即失效
+_snapshots: Dict[str, Tuple[str, Any]] = {}
 
 
 def get_cache_dir() -> Path:
@@ -27,6 +58,26 @@ def get_l0_path() -> Path:
     return get_cache_dir() / L0_FILENAME
 
 
+def get_semantic_path() -> Path:
+    """获取语义索引文件路径"""
+    return get_cache_dir() / SEMANTIC_FILENAME
+
+
+def get_expansion_path() -> Path:
+    """获取扩展词表文件路径"""
+    return get_cache_dir() / EXPANSION_FILENAME
+
+
+def get_bitmaps_path() -> Path:
+    """获取位图索引文件路径"""
+    return get_cache_dir() / BITMAPS_FILENAME
+
+
+def get_prefix_path() -> Path:
+    """获取前缀补全索引文件路径"""
+    return get_cache_dir() / PREFIX_FILENAME
+
+
 def get_l1_dir() -> Path:
     """获取 l1 目录路径"""
     return get_cache_dir() / L1_DIRNAME
@@ -46,25 +97,159 @@ def ensure_cache_dir():
     get_l1_dir().mkdir(parents=True, exist_ok=True)
 
 
+def load_json_state(path: Path) -> Dict[str, Any]:
+    """读取 JSON 状态文件（缺失、损坏或不是对象时返回空字典）"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+    return data if isinstance(data, dict) else {}
+
+
+def save_json_atomic(path: Path, data: Any, indent: Optional[int] = None):
+    """
+    先写临时文件再原子替换
+
+    临时文件名含进程 id 与线程 id，多进程、多线程并发写同一文件时互不覆盖，
+    读取方不会看到半截文件。
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(data, f, ensure_ascii=False, indent=indent)
+    os.replace(tmp, path)
+
+
 # === l0 操作 ===
 
 
+def add_index_columns(rec: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    写入索引时预先计算的列，查询路径直接读取：
+
+    - 规范化检索列 search_text / slug_lc / id_lc（不再逐次拼接字符串）
+    - 校验结论 valid / validation_reason（无效记录不进入检索）
+    """
+    rec["search_text"] = " ".join(
+        [
+            rec.get("id", ""),
+            rec.get("slug", ""),
+            rec.get("owner", ""),
+            rec.get("repo", ""),
+            rec.get("description", ""),
+        ]
+    ).lower()
+    rec["slug_lc"] = rec.get("slug", "").lower()
+    rec["id_lc"] = rec.get("id", "").lower()
+    verdict = validate_skill(rec.get("id", ""), rec.get("url", ""))
+    rec["valid"] = verdict["is_valid"]
+    rec["validation_reason"] = verdict["reason"]
+    return rec
+
+
 def load_l0() -> List[Dict[str, Any]]:
-    """加载 l0 索引"""
+    """加载 l0 索引（旧版索引缺少预计算列时补算）"""
     path = get_l0_path()
     if not path.exists():
         return []
     with open(path, "r", encoding="utf-8") as f:
-        return [json.loads(line) for line in f if line.strip()]
+        records = [json.loads(line) for line in f if line.strip()]
+    for rec in records:
+        if "valid" not in rec:
+            add_index_columns(rec)
+    return records
+
+
+# 分批提交时复用的各行 JSON：(records, lines)
+_l0_lines: Optional[Tuple[List[Dict[str, Any]], List[str]]] = None
+
+
+def _l0_line(rec: Dict[str, Any]) -> str:
+    add_index_columns(rec)
+    return json.dumps(rec, ensure_ascii=False) + "\n"
+
 
+def save_l0(
+    records: List[Dict[str, Any]],
+    derived: bool = True,
+    changed: Optional[Set[int]] = None,
+):
+    """
+    保存 l0 索引（先写临时文件再原子替换，补全过程中的分批提交不影响读取）
 
-def save_l0(records: List[Dict[str, Any]]):
-    """保存 l0 索引"""
+    derived=True 时同时重建随索引保存的派生索引（语义、扩展词表、位图、前缀）；
+    中间提交传 False，旧的派生索引因版本不符而停用，查询回退到 l0 扫描。
+    changed 给出自上次保存同一 records 以来改动过的下标时，只为这些记录重算预计算列
+    并重新序列化，其余行复用上次的结果（分批提交不再每次处理整个目录）。
+    """
+    global _l0_lines
     ensure_cache_dir()
+    if (
+        changed is None
+        or _l0_lines is None
+        or _l0_lines[0] is not records
+        or len(_l0_lines[1]) != len(records)
+    ):
+        lines = [_l0_line(rec) for rec in records]
+    else:
+        lines = _l0_lines[1]
+        for i in changed:
+            lines[i] = _l0_line(records[i])
+    _l0_lines = (records, lines) if changed is not None and not derived else None
     path = get_l0_path()
-    with open(path, "w", encoding="utf-8") as f:
-        for rec in records:
-            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "w", encoding="utf-8") as f:
+        f.writelines(lines)
+    os.replace(tmp, path)
+    if derived:
+        # 派生索引记录对应的 l0 版本，版本不符时查询视为缺失
+        version = l0_version()
+        build_semantic_index(records, get_semantic_path(), version)
+        save_json_atomic(get_expansion_path(), build_expansion_table(records, version))
+        save_json_atomic(get_bitmaps_path(), build_bitmap_index(records, version))
+        save_json_atomic(get_prefix_path(), build_prefix_index(records, version))
+
+
+def load_l0_snapshot() -> List[Dict[str, Any]]:
+    """
+    只读的 l0（进程内按版本缓存，供查询路径共享一次加载）
+
+    调用方不得修改返回的记录；需要修改时用 load_l0。
+    """
+    path = str(get_l0_path())
+    version = l0_version()
+    cached = _snapshots.get(path)
+    if cached is None or cached[0] != version:
+        cached = (version, load_l0())
+        _snapshots[path] = cached
+    return cached[1]
+
+
+def _load_derived(path: Path) -> Optional[Dict[str, Any]]:
+    """加载派生索引；缺失或与当前 l0 版本不符时返回 None"""
+    version = l0_version()
+    cached = _snapshots.get(str(path))
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return None
+    if data.get("version") != version:
+        return None
+    _snapshots[str(path)] = (version, data)
+    return data
+
+
+def l0_version() -> str:
+    """l0 的内容版本（不存在时为空串）"""
+    try:
+        st = get_l0_path().stat()
+    except OSError:
+        return ""
+    return f"{st.st_mtime_ns}-{st.st_size}"
 
 
 def is_l0_expired() -> bool:
@@ -99,11 +284,9 @@ def load_l1(skill_id: str) -> Optional[Dict[str, Any]]:
 
 
 def save_l1(skill_id: str, data: Dict[str, Any]):
-    """保存 l1 详情"""
+    """保存 l1 详情（原子替换，并发写入不会产生半截文件）"""
     ensure_cache_dir()
-    path = get_l1_path(skill_id)
-    with open(path, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    save_json_atomic(get_l1_path(skill_id), data, indent=2)
 
 
 def l1_exists(skill_id: str) -> bool:
@@ -125,38 +308,255 @@ def list_all_l1_ids() -> List[str]:
     return ids
 
 
+# === 访问记录 ===
+
+
+def load_hits() -> Dict[str, int]:
+    """加载本地搜索/查看命中次数（补全优先级用）"""
+    return load_json_state(get_cache_dir() / HITS_FILENAME)
+
+
+def record_hits(skill_ids: List[str]):
+    """记录命中的 skill（尽力而为，写入失败忽略）"""
+    if not skill_ids:
+        return
+    hits = load_hits()
+    for skill_id in skill_ids:
+        hits[skill_id] = hits.get(skill_id, 0) + 1
+    try:
+        save_json_atomic(get_cache_dir() / HITS_FILENAME, hits)
+    except OSError:
+        pass
+
+
 # === 索引搜索 ===
 
 
-def search_l0(query: str, top_k: int = 5) -> List[Dict[str, Any]]:
-    """在 l0 中全文搜索"""
-    records = load_l0()
+def _match_score(rec: Dict[str, Any], query: str) -> int:
+    if query not in rec["search_text"]:
+        return 0
+    if rec["slug_lc"] == query:
+        return 100
+    if rec["id_lc"] == query:
+        return 80
+    return 10
+
+
+# 有效行缓存：(快照记录列表, 有效行位图, 有效行号)，随快照更换
+_valid_memo: Optional[Tuple[List[Dict[str, Any]], int, List[int]]] = None
+
+
+def _valid_rows(records: List[Dict[str, Any]]) -> Tuple[int, List[int]]:
+    """索引时校验为有效的行（位图, 行号），同一快照只计算一次"""
+    global _valid_memo
+    if _valid_memo is None or _valid_memo[0] is not records:
+        rows = [idx for idx, rec in enumerate(records) if rec["valid"]]
+        _valid_memo = (records, to_bitmap(rows), rows)
+    return _valid_memo[1], _valid_memo[2]
+
+
+def _candidate_rows(
+    records: List[Dict[str, Any]], candidates: Optional[int]
+) -> List[int]:
+    """参与检索的行号：候选位图内的有效记录（无效记录不进入任何检索）"""
+    valid, rows = _valid_rows(records)
+    if candidates is None:
+        return rows
+    # 取反的位图为负数，与有效行位图（非负）相与即得其在有效行内的补集
+    return to_indices(candidates & valid)
+
+
+def search_l0(
+    query: str, top_k: int = 5, candidates: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """在 l0 中全文搜索（candidates 同 search_l0_multi；无效记录不参与）"""
+    records = load_l0_snapshot()
     query = query.lower()
     scored = []
-    for rec in records:
-        score = 0
-        text = " ".join(
-            [
-                rec.get("id", ""),
-                rec.get("slug", ""),
-                rec.get("owner", ""),
-                rec.get("repo", ""),
-                rec.get("description", ""),
-            ]
-        ).lower()
-        if query in text:
-            if rec.get("slug", "").lower() == query:
-                score = 100
-            elif rec.get("id", "").lower() == query:
-                score = 80
-            else:
-                score = 10
-        scored.append((score, rec))
+    for idx in _candidate_rows(records, candidates):
+        rec = records[idx]
+        scored.append((_match_score(rec, query), rec))
 
     scored.sort(key=lambda x: -x[0])
     return [rec for sc, rec in scored if sc > 0][:top_k]
 
 
+def scan_l0_terms(
+    queries: List[str], candidates: Optional[int] = None
+) -> Dict[str, List[Tuple[int, int]]]:
+    """
+    一次扫描 l0 为多个查询词打分（批量模式中各查询共用这一次扫描）
+
+    Returns:
+        {小写查询词: [(-分数, 行号)]}，按分数降序、行号升序（即 search_l0 的顺序）；
+        行号指向 load_l0_snapshot()
+    """
+    terms = list(dict.fromkeys(q.lower() for q in queries))
+    records = load_l0_snapshot()
+    ranked: Dict[str, List[Tuple[int, int]]] = {term: [] for term in terms}
+    for idx in _candidate_rows(records, candidates):
+        rec = records[idx]
+        text = rec["search_text"]
+        for term, hits in ranked.items():
+            if term in text:
+                hits.append((-_match_score(rec, term), idx))
+    for hits in ranked.values():
+        hits.sort()
+    return ranked
+
+
+def search_l0_batch(
+    queries: List[str],
+    top_k: int = 5,
+    candidates: Optional[int] = None,
+    scanned: Optional[Dict[str, List[Tuple[int, int]]]] = None,
+) -> List[List[Dict[str, Any]]]:
+    """
+    多个独立查询共用一次 l0 扫描（批量模式）
+
+    每个查询的结果与 search_l0(query, top_k, candidates) 相同，按输入顺序返回。
+    scanned 为已包含这些查询的 scan_l0_terms 结果（同一 candidates）时不再扫描。
+    """
+    records = load_l0_snapshot()
+    if scanned is None:
+        scanned = scan_l0_terms(queries, candidates)
+    return [[records[idx] for _, idx in scanned[q.lower()][:top_k]] for q in queries]
+
+
+def search_l0_multi(
+    queries: List[str],
+    top_k: Optional[int] = None,
+    candidates: Optional[int] = None,
+    scanned: Optional[Dict[str, List[Tuple[int, int]]]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    多查询搜索：一次扫描 l0 为所有查询打分，再用 RRF 融合各查询的排名
+
+    每个查询内部的排名与 search_l0 相同；融合分数为 sum(1 / (RRF_K + rank))。
+    索引时校验为无效的记录不参与检索。
+    top_k 只在融合之后应用一次（None 表示返回全部命中）。
+    candidates 为行号位图时只为其中的记录打分（见 bitmap_index）；
+    取反的位图（~bitmap，负数）表示其补集。
+    scanned 为批量模式中整批共用的 scan_l0_terms 结果（须包含这些查询，扫描范围
+    覆盖 candidates）：不再扫描 l0，只保留 candidates 内的命中。
+    返回的记录来自 load_l0_snapshot，只读。
+    """
+    terms = list(dict.fromkeys(q.lower() for q in queries if q and q.strip()))
+    if not terms:
+        return []
+    records = load_l0_snapshot()
+    if scanned is None:
+        scanned = scan_l0_terms(terms, candidates)
+        ranked = [scanned[term] for term in terms]
+    else:
+        # 按行号取位（负数位图同样适用）：命中数远少于记录数，不展开整个位图
+        ranked = [
+            [
+                hit
+                for hit in scanned[term]
+                if candidates is None or (candidates >> hit[1]) & 1
+            ]
+            for term in terms
+        ]
+
+    fused: Dict[int, float] = {}
+    for hits in ranked:
+        for rank, (_, idx) in enumerate(hits, 1):
+            fused[idx] = fused.get(idx, 0.0) + 1.0 / (RRF_K + rank)
+
+    order = sorted(fused, key=lambda idx: (-fused[idx], idx))
+    return [records[idx] for idx in order[:top_k]]
+
+
+def search_l0_semantic(
+    query: str, top_k: int = 5, candidates: Optional[int] = None
+) -> List[Dict[str, Any]]:
+    """语义检索（TF-IDF 余弦相似度）；未安装 NumPy 或语义索引过期时返回空列表"""
+    records = load_l0_snapshot()
+    allowed = None
+    if candidates is not None:
+        allowed = {records[i].get("id") for i in _candidate_rows(records, candidates)}
+    hits = semantic_search(query, get_semantic_path(), l0_version(), top_k, allowed)
+    if not hits:
+        return []
+    by_id = {rec.get("id"): rec for rec in records}
+    return [by_id[skill_id] for skill_id, _ in hits if skill_id in by_id]
+
+
+def get_expansion_table() -> Optional[Dict[str, Any]]:
+    """当前 l0 的扩展词表（缺失或过期时返回 None）"""
+    return _load_derived(get_expansion_path())
+
+
+def get_domain_candidates(domain: str) -> Optional[int]:
+    """领域的候选位图（general、未知领域或位图索引缺失/过期时返回 None）"""
+    bitmaps = _load_derived(get_bitmaps_path())
+    if bitmaps is None or domain not in bitmaps["domains"]:
+        return None
+    return decode(bitmaps["domains"][domain])
+
+
+def get_facet_candidates(
+    owner: Optional[str] = None,
+    repo: Optional[str] = None,
+    tags: Optional[List[str]] = None,
+) -> Optional[int]:
+    """
+    owner / repo / tag 过滤的候选位图（各条件取交集，不区分大小写）
+
+    repo 也可写作 owner/repo。无过滤条件时返回 None；
+    位图索引缺失或过期时扫描 l0 计算同样的位图。
+    """
+    wanted = []
+    if repo and "/" in repo:
+        repo_owner, repo = repo.split("/", 1)
+        wanted.append(("owner", repo_owner))
+    if owner:
+        wanted.append(("owner", owner))
+    if repo:
+        wanted.append(("repo", repo))
+    wanted.extend(("tag", tag) for tag in tags or [])
+    if not wanted:
+        return None
+
+    bitmaps = _load_derived(get_bitmaps_path())
+    result = -1  # 全集
+    for facet, value in wanted:
+        value = value.lower()
+        if bitmaps is not None:
+            encoded = bitmaps[facet].get(value)
+            bitmap = decode(encoded) if encoded is not None else 0
+        else:
+            records = load_l0_snapshot()
+            bitmap = to_bitmap(
+                idx
+                for idx in _candidate_rows(records, None)
+                if value in facet_values(records[idx], facet)
+            )
+        result &= bitmap
+        if not result:
+            break
+    return result
+
+
+def _prefix_index() -> Dict[str, Any]:
+    # 前缀索引缺失、过期或是缺少 id_keys 的旧格式时由 l0 临时构建
+    index = _load_derived(get_prefix_path())
+    if index is None or "id_keys" not in index:
+        index = build_prefix_index(load_l0_snapshot(), l0_version())
+    return index
+
+
+def complete_prefix(prefix: str, limit: int) -> List[str]:
+    """id / slug 前缀补全"""
+    return complete(_prefix_index(), prefix, limit)
+
+
+def list_skill_tree(owner: str, repo: str = "") -> Dict[str, List[str]]:
+    """本地索引中 owner（及 repo）下的 skill：{"owner/repo": [id, ...]}"""
+    return list_tree(_prefix_index(), owner, repo)
+
+
 def get_l0_by_id(target_id: str) -> Optional[Dict[str, Any]]:
     """根据 ID 精确查找 l0"""
     records = load_l0()
@@ -0,0 +1,142 @@
+# -*- coding: utf-8 -*-
+"""请求合并（single-flight）：进程内与跨进程；共享状态文件的加锁读-改-写"""
+
+import copy
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator
+
+try:
+    from .constants import REQUEST_TIMEOUT, MAX_RETRIES, BACKOFF
+    from .cache import get_cache_dir, load_json_state, save_json_atomic
+except ImportError:
+    from constants import REQUEST_TIMEOUT, MAX_RETRIES, BACKOFF
+    from cache import get_cache_dir, load_json_state, save_json_atomic
+
+LOCKS_DIRNAME = "locks"
+
+# 持锁进程最长的一次完整抓取耗时，超过即视为锁已失效
+LOCK_STALE = REQUEST_TIMEOUT * (MAX_RETRIES + 1) + sum(BACKOFF) + 5
+LOCK_POLL = 0.05
+# 状态文件只在读-改-写期间持锁（毫秒级），等待超过该值即不加锁继续
+STATE_LOCK_TIMEOUT = 1.0
+
+_state_lock = threading.Lock()
+
+
+class _Call:
+    def __init__(self):
+        self.event = threading.Event()
+        self.result: Any = None
+        self.error: Any = None
+
+
+class SingleFlight:
+    """同一 key 的并发调用只执行一次，其余调用等待并共享结果"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+
+    def do(self, key: str, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self._calls[key] = call
+
+        if not leader:
+            call.event.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.event.set()
+        return call.result
+
+
+def get_lock_path(key: str):
+    """获取 key 对应的锁文件路径"""
+    digest = hashlib.sha1(key.encode()).hexdigest()
+    return get_cache_dir() / LOCKS_DIRNAME / f"{digest}.lock"
+
+
+@contextmanager
+def file_lock(key: str, timeout: float = LOCK_STALE) -> Iterator[bool]:
+    """跨进程锁（O_EXCL 锁文件，兼容 Windows）
+
+    Yields:
+        waited: 是否等待过其他进程释放锁（调用方应重新检查缓存）
+    """
+    path = get_lock_path(key)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    deadline = time.time() + timeout
+    waited = False
+    acquired = False
+
+    while True:
+        try:
+            fd = os.open(str(path), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            os.write(fd, str(os.getpid()).encode())
+            os.close(fd)
+            acquired = True
+            break
+        except FileExistsError:
+            waited = True
+            try:
+                age = time.time() - path.stat().st_mtime
+            except FileNotFoundError:
+                continue
+            if age > LOCK_STALE:
+                try:
+                    path.unlink()
+                except OSError:
+                    pass
+                continue
+            if time.time() > deadline:
+                break
+            time.sleep(LOCK_POLL)
+        except OSError:
+            # 缓存目录不可写：不加锁继续
+            break
+
+    try:
+        yield waited
+    finally:
+        if acquired:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+def update_json_state(path: Path, update: Callable[[Dict[str, Any]], Any]) -> Any:
+    """
+    在进程内锁与跨进程文件锁下读-改-写 JSON 状态文件
+
+    update(state) 原地修改状态并返回调用方需要的结果；状态未变化时不写盘。
+    并发的线程/进程不会因读-改-写交错而丢失彼此的更新。
+    """
+    with _state_lock, file_lock(f"state:{path}", timeout=STATE_LOCK_TIMEOUT):
+        state = load_json_state(path)
+        before = copy.deepcopy(state)
+        result = update(state)
+        if state != before:
+            try:
+                save_json_atomic(path, state)
+            except OSError:
+                pass
+        return result
@@ -0,0 +1,80 @@
+# -*- coding: utf-8 -*-
+"""网络连通性状态（离线模式）"""
+
+import os
+import time
+from typing import Any, Dict, Optional
+
+try:
+    from .constants import OFFLINE_THRESHOLD, OFFLINE_WINDOW
+    from .cache import get_cache_dir, load_json_state
+    from .coalesce import update_json_state
+except ImportError:
+    from constants import OFFLINE_THRESHOLD, OFFLINE_WINDOW
+    from cache import get_cache_dir, load_json_state
+    from coalesce import update_json_state
+
+OFFLINE_FILENAME = "offline.json"
+OFFLINE_ENV = "SKILLS_SH_OFFLINE"
+
+
+class ConnectivityTracker:
+    """记录最近的网络级失败，窗口期内 CLI 进入仅缓存模式
+
+    连续 threshold 次网络级失败才进入离线（单个 host 偶发的拒绝连接不会让所有请求离线）；
+    状态持久化到缓存目录，多次 CLI 调用共享；任意一次请求成功即恢复在线。
+    设置环境变量 SKILLS_SH_OFFLINE=1 可强制离线。
+    """
+
+    def __init__(
+        self, window: float = OFFLINE_WINDOW, threshold: int = OFFLINE_THRESHOLD
+    ):
+        self.window = window
+        self.threshold = threshold
+
+    def _path(self):
+        return get_cache_dir() / OFFLINE_FILENAME
+
+    def _load(self) -> Dict[str, Any]:
+        return load_json_state(self._path())
+
+    def offline_remaining(self) -> float:
+        """离线窗口剩余秒数，0 表示在线"""
+        if os.environ.get(OFFLINE_ENV) == "1":
+            return float("inf")
+        left = self._load().get("offline_until", 0) - time.time()
+        return left if left > 0 else 0.0
+
+    def is_offline(self) -> bool:
+        return self.offline_remaining() > 0
+
+    def reason(self) -> Optional[str]:
+        """最近一次导致离线的错误"""
+        if os.environ.get(OFFLINE_ENV) == "1":
+            return f"{OFFLINE_ENV}=1"
+        return self._load().get("reason")
+
+    def record_failure(self, reason: str):
+        """记录一次网络级失败，连续失败达到阈值时进入离线窗口"""
+
+        def fail(state: Dict[str, Any]):
+            state["failures"] = state.get("failures", 0) + 1
+            state["reason"] = reason
+            if state["failures"] >= self.threshold:
+                state["offline_until"] = time.time() + self.window
+
+        update_json_state(self._path(), fail)
+
+    def mark_online(self):
+        try:
+            self._path().unlink()
+        except OSError:
+            pass
+
+
+tracker = ConnectivityTracker()
+
+
+def is_offline() -> bool:
+    """当前是否处于离线（仅缓存）模式"""
+    return tracker.is_offline()
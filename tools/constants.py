@@ -6,6 +6,10 @@ TITLES = {
     "show": "📦 技能详情",
     "update_index": "🔄 索引更新",
     "update_id": "🔄 强制刷新",
+    "enrich": "🔄 索引补全",
+    "reparse": "🔄 离线重建",
+    "complete": "🔎 前缀补全",
+    "listing": "📂 技能列表",
     "not_found": "❓ 未找到",
     "warning": "⚠️ 警告",
     "error": "🚫 错误",
@@ -26,11 +30,17 @@ LABELS = {
 
 MESSAGES = {
     "no_results": "未找到相关技能",
+    "no_completions": "没有以该前缀开头的技能",
+    "missing_query": "请提供搜索关键词或 --batch 文件",
+    "missing_id": "请提供技能 ID 或 --from-file 文件",
     "fetching_details": "正在获取详情...",
     "index_updated": "索引已更新",
     "index_update_failed": "索引更新失败",
+    "index_enriched": "索引补全完成",
+    "cache_reparsed": "已从页面存档重建缓存",
     "cache_refreshed": "缓存已刷新",
     "offline_mode": "离线状态，使用已有缓存",
+    "offline_no_cache": "离线状态，本地没有该技能的缓存:",
     "id_not_found": "未找到标识符",
     "try_search": "您是否想搜索：",
     "index_expired": "索引已过期，正在后台刷新...",
@@ -40,7 +50,27 @@ MESSAGES = {
 CACHE_TTL_DAYS = 7
 CACHE_DIR = "~/.skills-sh"
 DEFAULT_TOP_K = 5
+DEFAULT_COMPLETE_LIMIT = 20  # complete 命令默认返回条数
+QUERY_CACHE_SIZE = 256  # 搜索结果缓存条目上限（LRU）
+RRF_K = 60  # 多查询融合（reciprocal rank fusion）的平滑常数
+SEMANTIC_HASH_BITS = 18  # 语义索引的特征哈希维度（2^18）
+SEMANTIC_MIN_SCORE = 0.1  # 语义回退结果的最低余弦相似度
+EXPANSION_MIN_COUNT = 2  # 扩展词表：词对最少共现次数
+EXPANSION_TOP_N = 5  # 扩展词表：每个词保留的相关词数
 MAX_WORKERS = None  # 自动计算
+PARSE_BATCH_SIZE = 64  # 补全时每批交给解析进程的页面数
+ENRICH_COMMIT_EVERY = 200  # 补全时每补齐多少条提交一次 l0
+REPO_FETCH_MIN = 2  # 同一 repo 待补全数达到该值时改为抓取 repo 页面
+SHOW_FETCH_WORKERS = 8  # show 多个 ID 时并发抓取未缓存详情的线程数上限
+BATCH_CHUNK_SIZE = (
+    256  # search --batch 共用一次索引扫描的最多查询数（只合并已到达的输入）
+)
 REQUEST_TIMEOUT = 10
 MAX_RETRIES = 1
 BACKOFF = [0.5, 1.5]
+NEGATIVE_CACHE_TTL = 300  # 失败 URL 负缓存有效期（秒）
+BREAKER_THRESHOLD = 3  # 同一 host 连续失败次数阈值
+BREAKER_COOLDOWN = 30  # 熔断后冷却时间（秒）
+OFFLINE_WINDOW = 60  # 网络失败后进入离线模式的时长（秒）
+OFFLINE_THRESHOLD = 2  # 连续网络级失败达到该次数才进入离线模式
+NEXT_DATA_MAX_BYTES = 256 * 1024  # __NEXT_DATA__ 中 skill 子树的解码上限
@@ -0,0 +1,109 @@
+# -*- coding: utf-8 -*-
+"""skill 详情获取：l1 缓存 → 抓取 → 解析 → 写回（合并并发请求）"""
+
+import os
+import time
+from typing import Any, Dict, Optional, Tuple
+
+try:
+    from .id_resolver import SkillID
+    from .cache import load_l1, save_l1, get_l1_path
+    from .fetcher import fetch_details
+    from .parser import parse_skill_details, project_detail
+    from .coalesce import SingleFlight, file_lock
+    from .page_archive import archive_page, content_hash
+except ImportError:
+    from id_resolver import SkillID
+    from cache import load_l1, save_l1, get_l1_path
+    from fetcher import fetch_details
+    from parser import parse_skill_details, project_detail
+    from coalesce import SingleFlight, file_lock
+    from page_archive import archive_page, content_hash
+
+# 2：只保留展示字段（parser.project_detail）
+L1_SCHEMA_VERSION = 2
+
+_flight = SingleFlight()
+
+
+def build_l1_record(cache_key: str, url: str, detail: Dict[str, Any]) -> Dict:
+    """构建 l1 记录（只保留展示字段）"""
+    return {
+        "schema_version": L1_SCHEMA_VERSION,
+        "fetched_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        "id": cache_key,
+        "url": url,
+        **project_detail(detail),
+    }
+
+
+def _l1_written_since(cache_key: str, since: float) -> Optional[Dict]:
+    """若 l1 在 since 之后被（其他进程/线程）写入则返回它"""
+    path = get_l1_path(cache_key)
+    try:
+        if path.stat().st_mtime < since:
+            return None
+    except FileNotFoundError:
+        return None
+    return load_l1(cache_key)
+
+
+def _fetch_and_save(
+    skill_id: SkillID, force: bool, started: float
+) -> Tuple[Optional[Dict], Optional[str]]:
+    cache_key = skill_id.to_cache_key()
+    with file_lock(cache_key) as waited:
+        if waited:
+            # 其他进程刚完成同一抓取，直接复用
+            data = (
+                _l1_written_since(cache_key, started) if force else load_l1(cache_key)
+            )
+            if data:
+                return data, None
+
+        url = skill_id.to_url()
+        raw_data, err = fetch_details(url, force=force, stream=True)
+        if err:
+            return None, err
+        raw = raw_data.get("raw", "") if isinstance(raw_data, dict) else raw_data
+        archive_page(cache_key, url, raw)
+        digest = content_hash(raw)
+        previous = load_l1(cache_key)
+        if (
+            previous
+            and previous.get("schema_version") == L1_SCHEMA_VERSION
+            and previous.get("content_sha256") == digest
+        ):
+            # 页面未变化：不重新解析也不重写，只更新 mtime 供等待方识别
+            os.utime(get_l1_path(cache_key))
+            return previous, None
+        data = build_l1_record(cache_key, url, parse_skill_details(raw))
+        data["content_sha256"] = digest
+        save_l1(cache_key, data)
+        return data, None
+
+
+def get_skill_detail(
+    skill_id: SkillID, force: bool = False
+) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    获取 skill 详情（优先 l1 缓存）
+
+    同一 skill 的并发请求只抓取一次：进程内由 single-flight 合并，
+    跨进程由锁文件串行化，等待方直接读取领先者写入的 l1。
+    force=True 时跳过 l1 直接刷新（仍与同时进行的刷新合并）。
+
+    Returns:
+        (l1_record, error_msg)
+    """
+    cache_key = skill_id.to_cache_key()
+    if not force:
+        data = load_l1(cache_key)
+        if data:
+            return data, None
+
+    started = time.time()
+    return _flight.do(
+        f"{cache_key}|{int(force)}",
+        lambda: _fetch_and_save(skill_id, force, started),
+    )
@@ -0,0 +1,378 @@
+# -*- coding: utf-8 -*-
+"""l0 索引补全：抓取详情页，补齐标题/描述/标签"""
+
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+try:
+    from .cache import add_index_columns, load_hits, load_l0, save_l0
+    from .constants import (
+        ENRICH_COMMIT_EVERY,
+        MAX_WORKERS,
+        PARSE_BATCH_SIZE,
+        REPO_FETCH_MIN,
+    )
+    from .connectivity import is_offline
+    from .fetcher import fetch_details
+    from .id_resolver import SkillID
+    from .page_archive import archive_page, content_hash
+    from .parser import build_l0_record, parse_repo_skills, parse_skill_details
+except ImportError:
+    from cache import add_index_columns, load_hits, load_l0, save_l0
+    from constants import (
+        ENRICH_COMMIT_EVERY,
+        MAX_WORKERS,
+        PARSE_BATCH_SIZE,
+        REPO_FETCH_MIN,
+    )
+    from connectivity import is_offline
+    from fetcher import fetch_details
+    from id_resolver import SkillID
+    from page_archive import archive_page, content_hash
+    from parser import build_l0_record, parse_repo_skills, parse_skill_details
+
+# 由详情页补全的字段（刷新索引时保留；保留页面哈希，页面未变化时 --force 仍可跳过解析）
+ENRICHED_FIELDS = (
+    "title",
+    "description",
+    "tags",
+    "author",
+    "installs",
+    "content_sha256",
+)
+
+
+def needs_enrichment(rec: Dict[str, Any]) -> bool:
+    """是否尚未补全"""
+    return not rec.get("description")
+
+
+def merge_enriched(record: Dict[str, Any], previous: Optional[Dict[str, Any]]):
+    """把旧记录中已补全的字段带入新记录"""
+    if not previous:
+        return record
+    for field in ENRICHED_FIELDS:
+        if previous.get(field) and not record.get(field):
+            record[field] = previous[field]
+    return record
+
+
+def build_index_records(urls: List[str], previous: List[Dict]) -> List[Dict]:
+    """由 sitemap URL 构建 l0 记录，保留已有的补全结果"""
+    by_id = {rec.get("id"): rec for rec in previous}
+    now = time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    records = []
+    for url in urls:
+        try:
+            record = build_l0_record(url)
+        except ValueError:
+            continue
+        record["updated_at"] = now
+        records.append(merge_enriched(record, by_id.get(record["id"])))
+    return records
+
+
+def fetch_page(rec: Dict[str, Any]) -> Tuple[Optional[str], Optional[str], str]:
+    """
+    抓取阶段（线程中执行）：流式读取详情页，head 中有描述即断开
+
+    Returns:
+        (raw, error_msg, sha256)
+    """
+    raw, err = fetch_details(rec["url"], stream=True, head_only=True)
+    if err:
+        return None, err, ""
+    archive_page(rec["id"], rec["url"], raw["raw"], complete=False)
+    return raw["raw"], None, content_hash(raw["raw"])
+
+
+def parse_batch(pages: List[str]) -> List[Dict[str, Any]]:
+    """解析阶段（可在子进程中执行）：批量解析页面"""
+    return [parse_skill_details(raw) for raw in pages]
+
+
+def apply_detail(rec: Dict[str, Any], detail: Dict[str, Any]) -> Dict[str, Any]:
+    """用解析出的详情补全 l0 记录"""
+    enriched = build_l0_record(rec["url"], detail)
+    enriched["updated_at"] = rec.get("updated_at", "")
+    return merge_enriched(enriched, rec)
+
+
+def fetch_repo(
+    owner: str, repo: str
+) -> Tuple[Optional[Dict[str, Dict]], Optional[str]]:
+    """
+    抓取阶段（线程中执行）：抓取 repo 页面并取出其列出的 skill 元数据
+
+    Returns:
+        (listing, error_msg)；页面正常但不带元数据时 listing 为 None，抓取失败时为 {}
+    """
+    url = SkillID(owner, repo).to_url()
+    raw, err = fetch_details(url, stream=True)
+    if err:
+        return {}, err
+    archive_page(f"{owner}/{repo}", url, raw["raw"], kind="repo")
+    return parse_repo_skills(raw["raw"], owner, repo), None
+
+
+def _priority_key(
+    records: List[Dict[str, Any]], hits: Dict[str, int]
+) -> Callable[[int], Tuple[int, int]]:
+    return lambda i: (
+        -hits.get(records[i].get("id", ""), 0),
+        -(records[i].get("installs") or 0),
+    )
+
+
+def prioritize(
+    records: List[Dict[str, Any]],
+    todo: List[int],
+    hits: Optional[Dict[str, int]] = None,
+) -> List[int]:
+    """
+    补全顺序：本地搜索/查看命中过的优先，其次按页面数据中的安装量，其余保持原序
+
+    安装量来自详情页或 repo 页面列表；首次全量抓取时 sitemap 不含安装量，
+    由 enrich_index 先抓 repo 页面取得，再对剩余的 skill 任务重新排序。
+    """
+    hits = load_hits() if hits is None else hits
+    return sorted(todo, key=_priority_key(records, hits))
+
+
+def plan_enrichment(records: List[Dict[str, Any]], todo: List[int]) -> List[Tuple]:
+    """
+    按 owner/repo 分组规划抓取任务
+
+    同一 repo 待补全数达到 REPO_FETCH_MIN 时先抓一次 repo 页面，再把元数据分发给
+    其下所有 skill；repo 页面没有列出的 skill 之后再单独抓取。
+    repo 任务排在所有 skill 任务之前（repo 页面列表带安装量，先取得再排 skill 任务），
+    彼此按组内最高优先级 skill 的顺序；组内成员与 skill 任务保持 todo 中的顺序。
+
+    Returns:
+        任务列表，元素为 ("repo", owner, repo, [记录下标]) 或 ("skill", 记录下标)
+    """
+    groups: Dict[Tuple[str, str], List[int]] = {}
+    for i in todo:
+        rec = records[i]
+        groups.setdefault((rec.get("owner", ""), rec.get("repo", "")), []).append(i)
+
+    repo_tasks: List[Tuple] = []
+    skill_tasks: List[Tuple] = []
+    for i in todo:
+        key = (records[i].get("owner", ""), records[i].get("repo", ""))
+        members = groups.get(key)
+        if members is None:
+            continue
+        if len(members) >= REPO_FETCH_MIN and all(key):
+            repo_tasks.append(("repo", key[0], key[1], members))
+            del groups[key]
+        else:
+            skill_tasks.append(("skill", i))
+    return repo_tasks + skill_tasks
+
+
+class _Writer:
+    """唯一的写入方：在主线程中把解析结果合并进 l0 记录"""
+
+    def __init__(self, records: List[Dict[str, Any]], stats: Dict[str, int]):
+        self.records = records
+        self.stats = stats
+        self.changed: Set[int] = set()
+
+    def apply(self, i: int, detail: Dict[str, Any], digest: Optional[str] = None):
+        enriched = apply_detail(self.records[i], detail)
+        if digest:
+            enriched["content_sha256"] = digest
+        if add_index_columns(enriched) == self.records[i]:
+            self.stats["unchanged"] += 1
+            return
+        self.records[i] = enriched
+        self.changed.add(i)
+        self.stats["enriched"] += 1
+
+    def take_changed(self) -> Set[int]:
+        """上次提交以来改动过的记录下标（取出后清空）"""
+        changed, self.changed = self.changed, set()
+        return changed
+
+    def commit(self, batch: List[Tuple[int, str]], details: List[Dict[str, Any]]):
+        for (i, digest), detail in zip(batch, details):
+            self.apply(i, detail, digest)
+
+
+def enrich_index(
+    limit: Optional[int] = None,
+    force: bool = False,
+    progress: Optional[Callable[[int, int], None]] = None,
+    fetch_workers: Optional[int] = None,
+    parse_workers: Optional[int] = None,
+) -> Dict[str, int]:
+    """
+    补全 l0 中缺少描述的记录（force=True 时全部重新抓取）
+
+    按 prioritize 的顺序处理，每补齐 ENRICH_COMMIT_EVERY 条提交一次 l0。
+    抓取 → 解析 → 写入流水线：线程池并发抓取（同 repo 的 skill 优先由一次 repo
+    页面抓取补全）；skill 页面按 PARSE_BATCH_SIZE 成批交给进程池解析
+    （parse_workers<=1 或待补全数不足一批时在当前进程解析）；结果由主线程统一
+    写回 l0。页面哈希未变化的记录不进入解析阶段。
+
+    Returns:
+        统计信息 {"total", "enriched", "unchanged", "failed", "pending", "requests"}
+    """
+    records = load_l0()
+    hits = load_hits()
+    todo = [i for i, rec in enumerate(records) if force or needs_enrichment(rec)]
+    todo = prioritize(records, todo, hits)
+    if limit:
+        todo = todo[:limit]
+
+    stats = {
+        "total": len(records),
+        "enriched": 0,
+        "unchanged": 0,
+        "failed": 0,
+        "pending": 0,
+        "requests": 0,
+    }
+    committed = 0
+    writer = _Writer(records, stats)
+    fetch_workers = fetch_workers or MAX_WORKERS or min(32, (os.cpu_count() or 1) * 4)
+    if parse_workers is None:
+        parse_workers = os.cpu_count() or 1
+    parse_pool = None
+    if parse_workers > 1 and len(todo) > PARSE_BATCH_SIZE:
+        parse_pool = ProcessPoolExecutor(max_workers=parse_workers)
+
+    parsing: List[Tuple[List[Tuple[int, str]], Future]] = []
+    batch: List[Tuple[int, str]] = []
+    pages: List[str] = []
+
+    def flush():
+        if not batch:
+            return
+        if parse_pool is None:
+            writer.commit(list(batch), parse_batch(pages))
+        else:
+            parsing.append((list(batch), parse_pool.submit(parse_batch, list(pages))))
+        batch.clear()
+        pages.clear()
+
+    def drain(wait_all: bool = False):
+        while parsing and (wait_all or parsing[0][1].done()):
+            done_batch, future = parsing.pop(0)
+            writer.commit(done_batch, future.result())
+
+    tasks = plan_enrichment(records, todo)
+    repo_queue = deque(task for task in tasks if task[0] == "repo")
+    skill_queue = deque(task[1] for task in tasks if task[0] == "skill")
+    by_priority = _priority_key(records, hits)
+    resort = False
+    repo_pages = True
+    done = 0
+    stopped = False
+    try:
+        with ThreadPoolExecutor(max_workers=fetch_workers) as fetch_pool:
+            inflight: Dict[Future, Tuple] = {}
+
+            def refill():
+                nonlocal resort
+                while (
+                    not stopped
+                    and (repo_queue or skill_queue)
+                    and len(inflight) < fetch_workers * 2
+                ):
+                    if repo_queue:
+                        task = repo_queue.popleft()
+                        future = fetch_pool.submit(fetch_repo, task[1], task[2])
+                    else:
+                        if resort:
+                            # repo 页面列表带来的安装量参与剩余 skill 任务的排序
+                            pending = sorted(skill_queue, key=by_priority)
+                            skill_queue.clear()
+                            skill_queue.extend(pending)
+                            resort = False
+                        task = ("skill", skill_queue.popleft())
+                        future = fetch_pool.submit(fetch_page, records[task[1]])
+                    inflight[future] = task
+                    stats["requests"] += 1
+
+            refill()
+            while inflight:
+                finished, _ = wait(inflight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    task = inflight.pop(future)
+                    if task[0] == "repo":
+                        listing, err = future.result()
+                        if err and is_offline():
+                            stopped = True
+                        if listing is None:
+                            # repo 页面正常返回却不带元数据：其余 repo 任务改为逐个抓取，
+                            # 不再为每个 repo 多花一次请求（抓取失败只影响本 repo）
+                            if repo_pages:
+                                repo_pages = False
+                                for queued in repo_queue:
+                                    skill_queue.extend(queued[3])
+                                repo_queue.clear()
+                            listing = {}
+                        for i in task[3]:
+                            detail = listing.get(records[i]["id"])
+                            if detail:
+                                writer.apply(i, detail)
+                                done += 1
+                            else:
+                                skill_queue.append(i)
+                        # 未列出的成员按 prioritize 的顺序插回
+                        resort = True
+                        continue
+
+                    i = task[1]
+                    raw, err, digest = future.result()
+                    done += 1
+                    if err:
+                        stats["failed"] += 1
+                        if is_offline():
+                            stopped = True
+                    elif records[i].get("content_sha256") == digest:
+                        stats["unchanged"] += 1
+                    else:
+                        batch.append((i, digest))
+                        pages.append(raw)
+                        if parse_pool is None or len(batch) >= PARSE_BATCH_SIZE:
+                            flush()
+                if progress:
+                    progress(done, len(todo))
+                drain()
+                if stats["enriched"] - committed >= ENRICH_COMMIT_EVERY:
+                    # 分批提交：长时间补全过程中搜索即可用上已补齐的记录
+                    # （派生索引只在最后一次提交时重建）
+                    save_l0(records, derived=False, changed=writer.take_changed())
+                    committed = stats["enriched"]
+                refill()
+        flush()
+        drain(wait_all=True)
+    finally:
+        if parse_pool is not None:
+            parse_pool.shutdown()
+
+    if stopped:
+        stats["pending"] = len(todo) - done
+    if stats["enriched"]:
+        # 最后一次提交同时重建派生索引（即使中间提交已写入全部记录）
+        save_l0(records, changed=writer.take_changed())
+    return stats
+
+
+def print_progress(done: int, total: int):
+    """stderr 进度输出"""
+    if done == total or done % 100 == 0:
+        print(f"enriched {done}/{total}", file=sys.stderr)
@@ -1,23 +1,49 @@
 # -*- coding: utf-8 -*-
 """网络请求与重试"""
 
+import codecs
+import errno
 import json
+import os
+import socket
 import time
+import urllib.error
 import urllib.request
-from typing import Any, Dict, List, Optional, Tuple
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
 
 try:
     from .constants import (
         REQUEST_TIMEOUT,
         MAX_RETRIES,
         BACKOFF,
+        NEGATIVE_CACHE_TTL,
+        BREAKER_THRESHOLD,
+        BREAKER_COOLDOWN,
+        MESSAGES,
     )
+    from .cache import get_cache_dir, load_json_state
+    from .coalesce import update_json_state
+    from .connectivity import tracker as connectivity
+    from .fixture_archive import get_recorder
+    from .id_resolver import BASE_URL, SkillID
+    from .parser import IncrementalExtractor
 except ImportError:
     from constants import (
         REQUEST_TIMEOUT,
         MAX_RETRIES,
         BACKOFF,
+        NEGATIVE_CACHE_TTL,
+        BREAKER_THRESHOLD,
+        BREAKER_COOLDOWN,
+        MESSAGES,
     )
+    from cache import get_cache_dir, load_json_state
+    from coalesce import update_json_state
+    from connectivity import tracker as connectivity
+    from fixture_archive import get_recorder
+    from id_resolver import BASE_URL, SkillID
+    from parser import IncrementalExtractor
 
 DEFAULT_HEADERS = {
     "User-Agent": (
@@ -27,6 +53,151 @@ DEFAULT_HEADERS = {
     ),
 }
 
+NEGATIVE_CACHE_FILENAME = "negative.json"
+BREAKER_FILENAME = "breaker.json"
+ORIGIN_ENV = "SKILLS_SH_ORIGIN"
+STREAM_CHUNK_SIZE = 16384
+
+
+def resolve_origin(url: str) -> str:
+    """设置 SKILLS_SH_ORIGIN 时把 skills.sh 地址改写到本地替身服务器"""
+    origin = os.environ.get(ORIGIN_ENV)
+    if origin and url.startswith(BASE_URL):
+        return origin.rstrip("/") + url[len(BASE_URL) :]
+    return url
+
+
+# === 熔断与负缓存 ===
+
+
+class CircuitBreaker:
+    """按 host 熔断：连续失败达到阈值后，冷却期内直接拒绝请求
+
+    状态持久化到缓存目录（与负缓存相邻），多次 CLI 调用共享：
+    host 持续 5xx 时，后续的 show 不必每次都重新走完重试与退避。
+    冷却结束后只放行一次试探（记录 probing 时间），试探返回前其他调用方继续被拒绝；
+    试探方崩溃未返回时，一个冷却期后再放行下一次试探。
+    """
+
+    def __init__(
+        self,
+        threshold: int = BREAKER_THRESHOLD,
+        cooldown: float = BREAKER_COOLDOWN,
+        filename: str = BREAKER_FILENAME,
+    ):
+        self.threshold = threshold
+        self.cooldown = cooldown
+        self.filename = filename
+
+    def _path(self):
+        return get_cache_dir() / self.filename
+
+    def remaining(self, host: str) -> float:
+        """熔断剩余秒数，0 表示放行（冷却结束后半开放行一次试探）"""
+        entry = load_json_state(self._path()).get(host, {})
+        if entry.get("opened_at") is None:
+            return 0.0
+
+        def check(state: Dict[str, Dict[str, float]]) -> float:
+            entry = state.get(host, {})
+            opened_at = entry.get("opened_at")
+            if opened_at is None:
+                return 0.0
+            now = time.time()
+            left = max(opened_at, entry.get("probing", 0)) + self.cooldown - now
+            if left > 0:
+                return left
+            # 半开：只放行本次调用，由其 record_success / record_failure 结束试探
+            entry["probing"] = now
+            return 0.0
+
+        return update_json_state(self._path(), check)
+
+    def record_success(self, host: str):
+        if host not in load_json_state(self._path()):
+            return
+        update_json_state(self._path(), lambda state: state.pop(host, None))
+
+    def record_failure(self, host: str):
+        def fail(state: Dict[str, Dict[str, float]]):
+            entry = state.get(host, {})
+            count = entry.get("failures", 0) + 1
+            if "probing" in entry:
+                # 试探失败：立即重新熔断
+                count = max(count, self.threshold)
+            state[host] = {"failures": count}
+            if count >= self.threshold:
+                state[host]["opened_at"] = time.time()
+
+        update_json_state(self._path(), fail)
+
+    def reset(self):
+        try:
+            self._path().unlink()
+        except OSError:
+            pass
+
+
+class NegativeCache:
+    """页面级失败（4xx）URL 的持久化负缓存（短 TTL），避免重复请求必然失败的页面"""
+
+    def __init__(self, ttl: float = NEGATIVE_CACHE_TTL):
+        self.ttl = ttl
+
+    def _path(self):
+        return get_cache_dir() / NEGATIVE_CACHE_FILENAME
+
+    def get(self, url: str) -> Optional[Tuple[str, float]]:
+        """命中且未过期时返回 (error_msg, 剩余秒数)"""
+        entry = load_json_state(self._path()).get(url)
+        if not entry:
+            return None
+        left = entry.get("expires_at", 0) - time.time()
+        if left <= 0:
+            return None
+        return entry.get("error", ""), left
+
+    def add(self, url: str, error: str):
+        def add_entry(entries: Dict[str, Dict[str, Any]]):
+            now = time.time()
+            for key in [k for k, v in entries.items() if v.get("expires_at", 0) <= now]:
+                del entries[key]
+            entries[url] = {"error": error, "expires_at": now + self.ttl}
+
+        update_json_state(self._path(), add_entry)
+
+    def discard(self, url: str):
+        if url not in load_json_state(self._path()):
+            return
+        update_json_state(self._path(), lambda entries: entries.pop(url, None))
+
+
+breaker = CircuitBreaker()
+negative_cache = NegativeCache()
+
+
+# 失败类型
+FAIL_NETWORK = "network"  # 连接级失败（DNS/拒绝连接/不可达/连接超时）：计入熔断，连续出现时触发离线模式
+FAIL_HOST = "host"  # host 返回 5xx、持续限流或读取超时：计入熔断
+FAIL_PAGE = "page"  # host 正常但页面失败（如 404）：仅负缓存
+
+# 视为本机断网的 errno（单个 host 慢或出错不应让整个 CLI 进入离线模式）
+_OFFLINE_ERRNOS = {errno.ENETUNREACH, errno.ENETDOWN, errno.EHOSTUNREACH}
+
+
+def _connection_failure(reason: Any) -> str:
+    """
+    URLError 的失败类型：DNS 失败、拒绝连接、网络不可达、连接超时为 FAIL_NETWORK，其余为 FAIL_HOST
+
+    urlopen 只把建立连接、发送请求阶段的异常包装为 URLError，因此 reason 为
+    socket.timeout 即连接超时（断网时的典型表现）；等待/读取响应超时直接抛出 socket.timeout。
+    """
+    if isinstance(reason, (socket.gaierror, ConnectionRefusedError, socket.timeout)):
+        return FAIL_NETWORK
+    if getattr(reason, "errno", None) in _OFFLINE_ERRNOS:
+        return FAIL_NETWORK
+    return FAIL_HOST
+
 
 def fetch_url(
     url: str,
@@ -34,37 +205,118 @@ def fetch_url(
     timeout: int = REQUEST_TIMEOUT,
     max_retries: int = MAX_RETRIES,
     backoff: List[float] = BACKOFF,
+    force: bool = False,
+    reader: Optional[Callable[[Any], str]] = None,
 ) -> Tuple[Optional[str], Optional[str]]:
     """
     获取 URL 内容
 
+    近期页面级失败（4xx）的 URL 直接返回缓存的错误；离线模式下不发起请求；
+    同一 host 连续失败后熔断（熔断状态跨进程持久化）。force=True 时忽略负缓存和离线状态（用于显式刷新）。
+    设置 SKILLS_SH_RECORD=<目录> 时把收到的响应录制到 fixture 存档。
+    reader(resp) 可替换默认的整体读取（如流式读取、提前断开）；录制时忽略 reader。
+
     Returns:
         (content, error_msg)
     """
+    url = resolve_origin(url)
+    host = urlsplit(url).netloc
+
+    if host:
+        if not force:
+            cached = negative_cache.get(url)
+            if cached:
+                err, left = cached
+                return None, f"{err}（近期失败，{int(left) + 1}s 内不再重试）"
+            left = connectivity.offline_remaining()
+            if left > 0:
+                return None, f"{MESSAGES['offline_mode']}（{connectivity.reason()}）"
+        left = breaker.remaining(host)
+        if left > 0:
+            return None, f"熔断中: {host} 连续请求失败，{int(left) + 1}s 后重试"
+
+    recorder = get_recorder()
+    if recorder is not None:
+        # 录制时完整读取响应：提前断开得到的前缀不能作为完整的 200 响应存档
+        reader = None
+
+    content, err, failure, status = _fetch_with_retry(
+        url, headers, timeout, max_retries, backoff, reader
+    )
+
+    if recorder is not None and status is not None:
+        recorder.save(url, status, content or "")
+
+    if host:
+        if err is None:
+            breaker.record_success(host)
+            connectivity.mark_online()
+            if force:
+                negative_cache.discard(url)
+        elif failure is not None:
+            if failure == FAIL_PAGE:
+                breaker.record_success(host)
+            else:
+                breaker.record_failure(host)
+            if failure == FAIL_NETWORK:
+                connectivity.record_failure(err)
+            elif failure == FAIL_PAGE:
+                # 只缓存页面级失败：网络与 host 故障由离线窗口和熔断处理，恢复后立即重试
+                negative_cache.add(url, err)
+
+    return content, err
+
+
+def _fetch_with_retry(
+    url: str,
+    headers: Optional[Dict[str, str]],
+    timeout: int,
+    max_retries: int,
+    backoff: List[float],
+    reader: Optional[Callable[[Any], str]] = None,
+) -> Tuple[Optional[str], Optional[str], Optional[str], Optional[int]]:
+    """
+    带重试的实际请求
+
+    Returns:
+        (content, error_msg, failure, http_status)
+        failure: FAIL_NETWORK / FAIL_HOST / FAIL_PAGE，None 表示成功或非网络类错误（不缓存）
+    """
     req_headers = {**DEFAULT_HEADERS, **(headers or {})}
 
     for attempt in range(max_retries + 1):
         try:
             req = urllib.request.Request(url, headers=req_headers)
             with urllib.request.urlopen(req, timeout=timeout) as resp:
-                content = resp.read().decode("utf-8")
-                return content, None
+                if reader is not None:
+                    content = reader(resp)
+                else:
+                    content = resp.read().decode("utf-8")
+                return content, None, None, resp.status
         except urllib.error.HTTPError as e:
             if e.code in (429, 503):
                 wait_time = backoff[min(attempt, len(backoff) - 1)]
                 time.sleep(wait_time)
                 continue
-            return None, f"HTTP {e.code}: {e.reason}"
+            failure = FAIL_HOST if e.code >= 500 else FAIL_PAGE
+            return None, f"HTTP {e.code}: {e.reason}", failure, e.code
         except urllib.error.URLError as e:
             if attempt < max_retries:
                 wait_time = backoff[min(attempt, len(backoff) - 1)]
                 time.sleep(wait_time)
                 continue
-            return None, f"网络错误: {e.reason}"
+            return None, f"网络错误: {e.reason}", _connection_failure(e.reason), None
+        except socket.timeout:
+            # 读取超时只说明该 host 慢，计入熔断而不是离线
+            if attempt < max_retries:
+                wait_time = backoff[min(attempt, len(backoff) - 1)]
+                time.sleep(wait_time)
+                continue
+            return None, "网络错误: 请求超时", FAIL_HOST, None
         except Exception as e:
-            return None, f"未知错误: {str(e)}"
+            return None, f"未知错误: {str(e)}", None, None
 
-    return None, "超出重试次数"
+    return None, "超出重试次数", FAIL_HOST, None
 
 
 def fetch_json(url: str) -> Tuple[Optional[Dict], Optional[str]]:
@@ -79,17 +331,16 @@ def fetch_json(url: str) -> Tuple[Optional[Dict], Optional[str]]:
         return None, f"JSON 解析错误: {e}"
 
 
-def fetch_sitemap() -> Tuple[Optional[str], Optional[str]]:
+def fetch_sitemap(force: bool = False) -> Tuple[Optional[str], Optional[str]]:
     """获取 sitemap（尝试多个候选地址）"""
-    try:
-        from .id_resolver import SkillID
-    except ImportError:
-        from id_resolver import SkillID
-
     urls = SkillID.guess_sitemap_urls()
+    last_err = None
     for url in urls:
-        content, err = fetch_url(url)
+        content, err = fetch_url(url, force=force)
         if err:
+            last_err = err
+            if connectivity.is_offline():
+                break
             continue
         if content and content.strip().startswith("<?xml"):
             return content, None
@@ -99,12 +350,40 @@ def fetch_sitemap() -> Tuple[Optional[str], Optional[str]]:
                 return json.dumps(data), None
         except json.JSONDecodeError:
             continue
+    if last_err and connectivity.is_offline():
+        return None, last_err
     return None, "无法获取 sitemap"
 
 
-def fetch_details(url: str) -> Tuple[Optional[Dict], Optional[str]]:
-    """获取 skill 详情页"""
-    content, err = fetch_url(url)
+def _streaming_reader(head_only: bool) -> Callable[[Any], str]:
+    """分块读取并喂给增量提取器，所需字段齐全即停止读取（退出 with 时关闭连接）"""
+
+    def read(resp) -> str:
+        extractor = IncrementalExtractor(head_only=head_only)
+        decoder = codecs.getincrementaldecoder("utf-8")()
+        while True:
+            chunk = resp.read(STREAM_CHUNK_SIZE)
+            if not chunk:
+                extractor.feed(decoder.decode(b"", final=True))
+                break
+            if extractor.feed(decoder.decode(chunk)):
+                break
+        return extractor.text
+
+    return read
+
+
+def fetch_details(
+    url: str, force: bool = False, stream: bool = False, head_only: bool = False
+) -> Tuple[Optional[Dict], Optional[str]]:
+    """
+    获取 skill 详情页
+
+    stream=True 时流式读取，解析所需内容到手即断开连接：
+    默认读到 __NEXT_DATA__ 结束；head_only=True 时 head 中已有描述即停止。
+    """
+    reader = _streaming_reader(head_only) if stream else None
+    content, err = fetch_url(url, force=force, reader=reader)
     if err:
         return None, err
     return {"raw": content}, None
@@ -0,0 +1,67 @@
+# -*- coding: utf-8 -*-
+"""HTTP 响应存档（录制/回放用）"""
+
+import gzip
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+from urllib.parse import urlsplit
+
+RECORD_ENV = "SKILLS_SH_RECORD"
+
+
+def url_to_key(url: str) -> str:
+    """存档 key：只取 path + query，录制的 skills.sh 响应可由任意 host 回放"""
+    parts = urlsplit(url)
+    path = parts.path or "/"
+    return f"{path}?{parts.query}" if parts.query else path
+
+
+class FixtureArchive:
+    """每个响应一个 <sha1(key)>.json.gz 文件：{key, url, status, body}"""
+
+    def __init__(self, root):
+        self.root = Path(os.path.expanduser(str(root)))
+
+    def _path(self, key: str) -> Path:
+        digest = hashlib.sha1(key.encode()).hexdigest()
+        return self.root / f"{digest}.json.gz"
+
+    def save(self, url: str, status: int, body: str):
+        """写入一条响应（同一 key 覆盖）"""
+        self.root.mkdir(parents=True, exist_ok=True)
+        key = url_to_key(url)
+        path = self._path(key)
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        entry = {"key": key, "url": url, "status": status, "body": body}
+        with gzip.open(tmp, "wt", encoding="utf-8") as f:
+            json.dump(entry, f, ensure_ascii=False)
+        os.replace(tmp, path)
+
+    def load(self, url_or_key: str) -> Optional[Dict[str, Any]]:
+        """按 URL 或 key 读取响应"""
+        path = self._path(url_to_key(url_or_key))
+        if not path.exists():
+            return None
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return json.load(f)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        if not self.root.exists():
+            return
+        for path in sorted(self.root.glob("*.json.gz")):
+            with gzip.open(path, "rt", encoding="utf-8") as f:
+                yield json.load(f)
+
+    def __len__(self) -> int:
+        if not self.root.exists():
+            return 0
+        return sum(1 for _ in self.root.glob("*.json.gz"))
+
+
+def get_recorder() -> Optional[FixtureArchive]:
+    """设置了 SKILLS_SH_RECORD=<目录> 时返回录制存档"""
+    root = os.environ.get(RECORD_ENV)
+    return FixtureArchive(root) if root else None
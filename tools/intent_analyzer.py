@@ -4,6 +4,11 @@
 import json
 from typing import Dict, List
 
+try:
+    from .keyword_automaton import register_keywords, scan
+except ImportError:
+    from keyword_automaton import register_keywords, scan
+
 
 INTENT_ANALYSIS_PROMPT = """You are analyzing user intent for skill search on skills.sh.
 
@@ -42,6 +47,19 @@ DOMAIN_KEYWORDS = {
     "mobile": ["mobile", "ios", "android", "react-native"],
 }
 
+KEYWORD_MAPPINGS = {
+    "frontend": ["frontend", "frontend-design", "frontend-best-practices"],
+    "backend": ["backend", "backend-best-practices", "api-design"],
+    "video": ["video", "video-player", "streaming"],
+    "ai": ["ai", "agent", "mcp"],
+    "fullstack": ["fullstack", "fullstack-best-practices"],
+}
+
+register_keywords(
+    [kw for keywords in DOMAIN_KEYWORDS.values() for kw in keywords]
+    + list(KEYWORD_MAPPINGS)
+)
+
 
 def analyze_intent(user_query: str) -> Dict:
     """
@@ -67,10 +85,10 @@ def analyze_intent(user_query: str) -> Dict:
 
 def _detect_domain_fallback(user_query: str) -> str:
     """Fallback domain detection based on keywords"""
-    query_lower = user_query.lower()
+    found = scan(user_query)
 
     for domain, keywords in DOMAIN_KEYWORDS.items():
-        if any(kw in query_lower for kw in keywords):
+        if found.has_any(keywords):
             return domain
 
     return "general"
@@ -78,21 +96,11 @@ def _detect_domain_fallback(user_query: str) -> str:
 
 def _extract_terms_fallback(user_query: str) -> List[str]:
     """Fallback term extraction"""
-    terms = []
-
-    keyword_mappings = {
-        "frontend": ["frontend", "frontend-design", "frontend-best-practices"],
-        "backend": ["backend", "backend-best-practices", "api-design"],
-        "video": ["video", "video-player", "streaming"],
-        "ai": ["ai", "agent", "mcp"],
-        "fullstack": ["fullstack", "fullstack-best-practices"],
-    }
-
-    query_lower = user_query.lower()
+    found = scan(user_query)
 
-    for base_term, expanded in keyword_mappings.items():
-        if base_term in query_lower:
-            return expanded
+    for base_term, expanded in KEYWORD_MAPPINGS.items():
+        if found.has(base_term):
+            return list(expanded)
 
     words = user_query.split()
     return words[:3] if words else [user_query]
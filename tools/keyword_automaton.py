@@ -0,0 +1,124 @@
+# -*- coding: utf-8 -*-
+"""Shared Aho-Corasick automaton for trigger, inquiry and domain keywords"""
+
+from collections import deque
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+class AhoCorasick:
+    """Multi-pattern substring matcher (patterns are matched case-sensitively)"""
+
+    def __init__(self, patterns: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._out: List[List[str]] = [[]]
+        for pattern in dict.fromkeys(p for p in patterns if p):
+            self._add(pattern)
+        self._link()
+
+    def _add(self, pattern: str):
+        state = 0
+        for ch in pattern:
+            nxt = self._goto[state].get(ch)
+            if nxt is None:
+                nxt = len(self._goto)
+                self._goto[state][ch] = nxt
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append([])
+            state = nxt
+        self._out[state].append(pattern)
+
+    def _link(self):
+        # BFS over the trie: compute failure links, then fold them into a full
+        # transition table (a DFA over the pattern alphabet) so matching never
+        # follows failure links at query time.
+        alphabet = {ch for edges in self._goto for ch in edges}
+        order = []
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            order.append(state)
+            for ch, nxt in self._goto[state].items():
+                queue.append(nxt)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                self._fail[nxt] = self._goto[fail].get(ch, 0)
+                self._out[nxt] = self._out[nxt] + self._out[self._fail[nxt]]
+
+        delta = [dict(edges) for edges in self._goto]
+        for state in order:
+            fail_row = delta[self._fail[state]]
+            row = delta[state]
+            for ch in alphabet:
+                if ch not in row:
+                    target = fail_row.get(ch, 0)
+                    if target:
+                        row[ch] = target
+        self._delta = delta
+
+    def finditer(self, text: str) -> Iterator[Tuple[int, str]]:
+        """Yield (start, pattern) for every occurrence, in order of end position"""
+        delta, out = self._delta, self._out
+        state = 0
+        for i, ch in enumerate(text):
+            state = delta[state].get(ch, 0)
+            if out[state]:
+                for pattern in out[state]:
+                    yield i - len(pattern) + 1, pattern
+
+
+class KeywordScan:
+    """Result of one pass over a lowercased input"""
+
+    def __init__(self, spans: Dict[str, Tuple[int, int]]):
+        # pattern -> (first start, last start)
+        self.spans = spans
+
+    def has(self, pattern: str) -> bool:
+        return pattern in self.spans
+
+    def has_any(self, patterns: Iterable[str]) -> bool:
+        return any(p in self.spans for p in patterns)
+
+    def has_ordered(self, first: str, second: str) -> bool:
+        """True if `second` occurs after an occurrence of `first` (like `first.*second`)"""
+        if first not in self.spans or second not in self.spans:
+            return False
+        return self.spans[first][0] + len(first) <= self.spans[second][1]
+
+
+_patterns: List[str] = []
+_automaton = None
+
+
+def register_keywords(patterns: Iterable[str]):
+    """Add patterns to the shared automaton (call at import time of a detector)"""
+    global _automaton
+    _patterns.extend(p.lower() for p in patterns)
+    _automaton = None
+    scan.cache_clear()
+
+
+def _get_automaton() -> AhoCorasick:
+    global _automaton
+    if _automaton is None:
+        _automaton = AhoCorasick(_patterns)
+    return _automaton
+
+
+@lru_cache(maxsize=256)
+def scan(text: str) -> KeywordScan:
+    """
+    Scan `text` (lowercased here) once for every registered keyword
+
+    Results are cached per input, so the trigger detector and the intent
+    analyzer share a single pass over the same query.
+    """
+    spans: Dict[str, Tuple[int, int]] = {}
+    for start, pattern in _get_automaton().finditer(text.lower()):
+        first = spans.get(pattern, (start, start))[0]
+        spans[pattern] = (first, start)
+    return KeywordScan(spans)
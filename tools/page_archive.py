@@ -0,0 +1,133 @@
+# -*- coding: utf-8 -*-
+"""原始详情页存档：内容寻址 + gzip 压缩，解析器升级后可离线重建 l1/l0
+
+布局（位于缓存目录下）：
+    pages/objects/<sha256[:2]>/<sha256>.html.gz   页面内容（相同内容只存一份）
+    pages/refs/<sha1(id)[0]>/<sha1(id)>.json      skill（或 owner/repo）→ 最近一次存档的页面
+
+设置 SKILLS_SH_ARCHIVE=1 启用；未启用时 archive_page 不做任何事。
+"""
+
+import gzip
+import hashlib
+import json
+import os
+import sys
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    from .cache import get_cache_dir
+except ImportError:
+    from cache import get_cache_dir
+
+ARCHIVE_ENV = "SKILLS_SH_ARCHIVE"
+PAGES_DIRNAME = "pages"
+
+
+def content_hash(raw: str) -> str:
+    """页面内容的 sha256"""
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def _atomic_write(path: Path, data: bytes):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+class PageArchive:
+    """内容寻址的页面存档"""
+
+    def __init__(self, root=None):
+        self.root = Path(root) if root else get_cache_dir() / PAGES_DIRNAME
+
+    def object_path(self, digest: str) -> Path:
+        return self.root / "objects" / digest[:2] / f"{digest}.html.gz"
+
+    def ref_path(self, skill_id: str) -> Path:
+        key = hashlib.sha1(skill_id.encode()).hexdigest()
+        return self.root / "refs" / key[0] / f"{key}.json"
+
+    def put(self, raw: str) -> str:
+        """写入页面内容，返回 sha256（已存在则不重复写）"""
+        digest = content_hash(raw)
+        path = self.object_path(digest)
+        if not path.exists():
+            _atomic_write(path, gzip.compress(raw.encode("utf-8")))
+        return digest
+
+    def get(self, digest: str) -> Optional[str]:
+        """按 sha256 读取页面内容"""
+        path = self.object_path(digest)
+        if not path.exists():
+            return None
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            return f.read()
+
+    def save(
+        self,
+        skill_id: str,
+        url: str,
+        raw: str,
+        complete: bool = True,
+        kind: str = "skill",
+    ) -> str:
+        """
+        存档 skill 页面并更新其引用
+
+        complete=False 表示只读到 head 的截断页面，不会覆盖已有的完整页面引用。
+        kind="repo" 表示 repo 页面（skill_id 为 owner/repo），重建时展开其列出的 skill。
+        """
+        digest = self.put(raw)
+        previous = self.load_ref(skill_id)
+        if previous and previous.get("complete") and not complete:
+            return digest
+        ref = {
+            "id": skill_id,
+            "url": url,
+            "sha256": digest,
+            "complete": complete,
+            "kind": kind,
+            "fetched_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
+        }
+        _atomic_write(self.ref_path(skill_id), json.dumps(ref).encode("utf-8"))
+        return digest
+
+    def load_ref(self, skill_id: str) -> Optional[Dict[str, Any]]:
+        """读取 skill 的存档引用"""
+        path = self.ref_path(skill_id)
+        if not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def iter_refs(self) -> Iterator[Dict[str, Any]]:
+        """遍历所有存档引用"""
+        refs_dir = self.root / "refs"
+        if not refs_dir.exists():
+            return
+        for path in sorted(refs_dir.glob("*/*.json")):
+            with open(path, "r", encoding="utf-8") as f:
+                yield json.load(f)
+
+
+def is_enabled() -> bool:
+    """是否启用页面存档"""
+    return os.environ.get(ARCHIVE_ENV, "") not in ("", "0")
+
+
+def archive_page(
+    skill_id: str, url: str, raw: str, complete: bool = True, kind: str = "skill"
+):
+    """启用时存档抓取到的页面（存档是附带功能：写入失败只提示，不影响抓取结果）"""
+    if not is_enabled():
+        return
+    try:
+        PageArchive().save(skill_id, url, raw, complete=complete, kind=kind)
+    except OSError as e:
+        print(f"页面存档失败（已跳过）: {skill_id}: {e}", file=sys.stderr)
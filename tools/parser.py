@@ -3,30 +3,99 @@
 
 import json
 import re
-from typing import Any, Dict, List, Optional
+from functools import lru_cache
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+try:
+    from .constants import NEXT_DATA_MAX_BYTES
+except ImportError:
+    from constants import NEXT_DATA_MAX_BYTES
+
+# 预编译模式
+_SITEMAP_LOC_RE = re.compile(r"<loc>([^<]+)</loc>")
+_NEXT_DATA_RE = re.compile(r'<script[^>]*id="__NEXT_DATA__"[^>]*>([^<]+)</script>')
+_TITLE_RE = re.compile(r"<title>([^<]+)</title>")
+# 单遍扫描 head 的记号：带 name/content 的 meta / 其他 meta / title / </head>
+_HEAD_TOKEN_RE = re.compile(
+    r'<meta[^>]*?(?:property|name)="([^"]*)"[^>]*?content="([^"]*)"[^>]*>'
+    r"|<meta[^>]*>"
+    r"|<title>([^<]+)</title>"
+    r"|</head>"
+)
+_NEXT_DATA_MARKER = 'id="__NEXT_DATA__"'
+_decoder = json.JSONDecoder()
+_scanstring = json.decoder.scanstring
+
+# pageProps 中承载 skill 信息的键（按优先级）
+SKILL_KEYS = ("skill", "data", "result", "skillInfo")
+# repo 页面 pageProps 中的 skill 列表键
+REPO_SKILL_KEYS = ("skills", "items")
+# l1 只保存展示所需字段
+DETAIL_FIELDS = ("title", "description", "author", "tags", "updated_at")
 
 
 def parse_sitemap(xml_content: str) -> List[str]:
     """解析 sitemap XML，提取所有 skill URL"""
     urls = []
-    pattern = r"<loc>([^<]+)</loc>"
-    for match in re.finditer(pattern, xml_content):
+    for match in _SITEMAP_LOC_RE.finditer(xml_content):
         url = match.group(1).strip()
         if "skills.sh" in url:
             urls.append(url)
     return urls
 
 
+def find_next_data(html: str) -> Optional[str]:
+    """
+    定位 __NEXT_DATA__ 脚本并返回其 JSON 文本
+
+    Next.js 把该脚本放在 body 末尾，从尾部做子串查找，
+    耗时只与脚本之后的内容有关，与正文大小无关。
+    """
+    pos = html.rfind(_NEXT_DATA_MARKER)
+    while pos >= 0:
+        start = html.rfind("<script", 0, pos)
+        match = _NEXT_DATA_RE.match(html, start) if start >= 0 else None
+        if match:
+            return match.group(1)
+        pos = html.rfind(_NEXT_DATA_MARKER, 0, pos)
+    return None
+
+
+def extract_head_fields(html: str) -> Dict[str, Any]:
+    """
+    单遍提取 head 中的 meta 与 title，扫描到 </head> 即停止
+
+    Returns:
+        {"meta": {name: content}, "title": str | None}
+    """
+    meta: Dict[str, str] = {}
+    title = None
+
+    for match in _HEAD_TOKEN_RE.finditer(html):
+        name, content, title_text = match.group(1, 2, 3)
+        if name is not None:
+            meta.setdefault(name, content)
+        elif title_text is not None:
+            if title is None:
+                title = title_text.strip()
+        elif match.group(0) == "</head>":
+            break
+
+    return {"meta": meta, "title": title}
+
+
+def _loads_next_data(text: Optional[str]) -> Optional[Dict]:
+    if not text:
+        return None
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        return None
+
+
 def parse_next_data(html: str) -> Optional[Dict]:
     """尝试解析 __NEXT_DATA__ JSON"""
-    pattern = r'<script[^>]*id="__NEXT_DATA__"[^>]*>([^<]+)</script>'
-    match = re.search(pattern, html)
-    if match:
-        try:
-            return json.loads(match.group(1))
-        except json.JSONDecodeError:
-            return None
-    return None
+    return _loads_next_data(find_next_data(html))
 
 
 def extract_from_next_data(data: Dict) -> Optional[Dict]:
@@ -34,7 +103,7 @@ def extract_from_next_data(data: Dict) -> Optional[Dict]:
     try:
         props = data.get("props", {})
         page_props = props.get("pageProps", {})
-        for key in ("skill", "data", "result", "skillInfo"):
+        for key in SKILL_KEYS:
             if key in page_props:
                 return page_props[key]
         return None
@@ -42,10 +111,155 @@ def extract_from_next_data(data: Dict) -> Optional[Dict]:
         return None
 
 
+def _skip_ws(text: str, pos: int) -> int:
+    while pos < len(text) and text[pos] in " \t\r\n":
+        pos += 1
+    return pos
+
+
+def _object_members(text: str, start: int) -> Iterator[Tuple[str, int]]:
+    """
+    逐个产出 start 处 JSON 对象的直接子键 (key, 值起始位置)
+
+    调用方 send(值结束位置) 可跳过已处理的值；未 send 时用 C 解码器跳过该值。
+    """
+    pos = _skip_ws(text, start + 1)
+    if text.startswith("}", pos):
+        return
+    while text.startswith('"', pos):
+        key, pos = _scanstring(text, pos + 1)
+        pos = _skip_ws(text, pos)
+        if not text.startswith(":", pos):
+            return
+        value_start = _skip_ws(text, pos + 1)
+        value_end = yield key, value_start
+        if value_end is None:
+            _, value_end = _decoder.raw_decode(text, value_start)
+        pos = _skip_ws(text, value_end)
+        if not text.startswith(",", pos):
+            return
+        pos = _skip_ws(text, pos + 1)
+
+
+def _child_object(text: str, start: int, key: str) -> int:
+    """对象中 key 对应子对象的起始位置（不解码该子对象），不存在返回 -1"""
+    for name, pos in _object_members(text, start):
+        if name == key:
+            return pos if text.startswith("{", pos) else -1
+    return -1
+
+
+_OVERSIZED = object()
+
+
+def _decode_bounded(text: str, pos: int, max_bytes: int) -> Tuple[Any, int]:
+    """
+    解码 pos 处的 JSON 值，最多读取 max_bytes 个字符
+
+    只把 max_bytes + 1 个字符的切片交给解码器，超长的值在读到上限时即失败，
+    CPU 与内存都不超过上限。多取的一个字符用于确认数字等值恰好在上限处结束。
+
+    Returns:
+        (值, 原文长度)；超过上限时值为 _OVERSIZED
+    """
+    window = text[pos : pos + max_bytes + 1]
+    try:
+        value, size = _decoder.raw_decode(window)
+    except ValueError:
+        if len(window) <= max_bytes:
+            raise
+        return _OVERSIZED, 0
+    if size > max_bytes:
+        return _OVERSIZED, 0
+    return value, size
+
+
+def select_next_data(
+    text: Optional[str],
+    max_bytes: int = NEXT_DATA_MAX_BYTES,
+    keys: Tuple[str, ...] = SKILL_KEYS,
+) -> Optional[Any]:
+    """
+    只解码 props.pageProps 下的 skill 子树（keys 按优先级）
+
+    沿 props → pageProps 路径下行而不解码路径上的对象；pageProps 中排在目标键之前的
+    兄弟值由 C 解码器跳过后立即丢弃，之后的兄弟值完全不解析。
+    子树原文超过 max_bytes 时放弃（由 meta 兜底），解码在读到上限时即停止。
+    """
+    if not text:
+        return None
+    try:
+        root = _skip_ws(text, 0)
+        if not text.startswith("{", root):
+            return None
+        props = _child_object(text, root, "props")
+        if props < 0:
+            return None
+        page_props = _child_object(text, props, "pageProps")
+        if page_props < 0:
+            return None
+
+        found: Dict[str, Any] = {}
+        members = _object_members(text, page_props)
+        value_end = None
+        while True:
+            try:
+                name, pos = members.send(value_end)
+            except StopIteration:
+                break
+            value_end = None
+            if name in keys and name not in found:
+                value, size = _decode_bounded(text, pos, max_bytes)
+                if value is _OVERSIZED:
+                    # 超过上限即停止解析（由 meta 兜底），不解码其余部分
+                    found[name] = None
+                    break
+                found[name] = value
+                value_end = pos + size
+                if name == keys[0]:
+                    break
+    except (ValueError, IndexError):
+        return None
+
+    for key in keys:
+        if key in found:
+            return found[key]
+    return None
+
+
+def _display_name(value: Any) -> Any:
+    if isinstance(value, dict):
+        return value.get("name") or value.get("login") or value.get("username")
+    return value
+
+
+def project_detail(detail: Dict[str, Any]) -> Dict[str, Any]:
+    """只保留展示字段（l1 不再存页面顺带嵌入的其他数据）"""
+    if "updated_at" not in detail and "updatedAt" in detail:
+        detail = {**detail, "updated_at": detail["updatedAt"]}
+    result = {}
+    for field in DETAIL_FIELDS:
+        value = detail.get(field)
+        if value in (None, "", []):
+            continue
+        if field == "author":
+            value = _display_name(value)
+        elif field == "tags" and isinstance(value, list):
+            value = [_display_name(t) for t in value if _display_name(t)]
+        result[field] = value
+    return result
+
+
+@lru_cache(maxsize=32)
+def _meta_pattern(property: str):
+    return re.compile(
+        rf'<meta[^>]*(?:property|name)="{re.escape(property)}"[^>]*content="([^"]*)"'
+    )
+
+
 def extract_meta_content(html: str, property: str) -> Optional[str]:
     """从 meta 标签提取内容"""
-    pattern = rf'<meta[^>]*(?:property|name)="{property}"[^>]*content="([^"]*)"'
-    match = re.search(pattern, html)
+    match = _meta_pattern(property).search(html)
     if match:
         return match.group(1)
     return None
@@ -53,48 +267,117 @@ def extract_meta_content(html: str, property: str) -> Optional[str]:
 
 def extract_title(html: str) -> Optional[str]:
     """从 title 标签提取内容"""
-    pattern = r"<title>([^<]+)</title>"
-    match = re.search(pattern, html)
+    match = _TITLE_RE.search(html)
     if match:
         return match.group(1).strip()
     return None
 
 
-def parse_skill_from_html(html: str) -> Dict[str, Any]:
-    """兜底解析：从 HTML 中提取 skill 信息"""
+def _skill_from_head_fields(fields: Dict[str, Any]) -> Dict[str, Any]:
+    meta = fields["meta"]
     result = {
-        "title": None,
-        "description": None,
+        "title": meta.get("og:title") or fields["title"],
+        "description": meta.get("og:description") or meta.get("description"),
         "author": None,
         "tags": [],
     }
 
-    title = extract_meta_content(html, "og:title")
-    if not title:
-        title = extract_title(html)
-    result["title"] = title
-
-    desc = extract_meta_content(html, "og:description")
-    if not desc:
-        desc = extract_meta_content(html, "description")
-    result["description"] = desc
-
-    keywords = extract_meta_content(html, "keywords")
+    keywords = meta.get("keywords")
     if keywords:
         result["tags"] = [t.strip() for t in keywords.split(",") if t.strip()]
 
     return result
 
 
+def parse_skill_from_html(html: str) -> Dict[str, Any]:
+    """兜底解析：从 HTML 中提取 skill 信息"""
+    return _skill_from_head_fields(extract_head_fields(html))
+
+
 def parse_skill_details(raw: str) -> Dict[str, Any]:
-    """综合解析 skill 详情"""
-    next_data = parse_next_data(raw)
-    if next_data:
-        data = extract_from_next_data(next_data)
-        if data:
-            return data
+    """综合解析 skill 详情（__NEXT_DATA__ 优先，meta 兜底，均不做全文正则扫描）"""
+    data = select_next_data(find_next_data(raw))
+    if data and isinstance(data, dict):
+        return data
+
+    return _skill_from_head_fields(extract_head_fields(raw))
+
+
+class IncrementalExtractor:
+    """
+    流式提取器：逐块喂入 HTML，所需字段齐全时 feed() 返回 True，调用方即可断开连接
+
+    - 默认：读到 __NEXT_DATA__ 脚本结束为止
+    - head_only=True：读到 </head> 且 meta 已含描述即停止（l0 补全只需这些字段），
+      否则继续读到 __NEXT_DATA__ 结束
+    """
 
-    return parse_skill_from_html(raw)
+    def __init__(self, head_only: bool = False):
+        self.head_only = head_only
+        self.done = False
+        self._text = ""
+        self._head_checked = False
+        self._marker_pos = -1
+
+    def feed(self, chunk: str) -> bool:
+        if self.done:
+            return True
+        # 从上一块末尾回退一小段，避免标记跨块被截断
+        scan_from = max(0, len(self._text) - len(_NEXT_DATA_MARKER))
+        self._text += chunk
+
+        if self.head_only and not self._head_checked:
+            head_end = self._text.find("</head>", max(0, scan_from - 7))
+            if head_end >= 0:
+                self._head_checked = True
+                meta = extract_head_fields(self._text[: head_end + 7])["meta"]
+                if meta.get("og:description") or meta.get("description"):
+                    self.done = True
+                    return True
+
+        if self._marker_pos < 0:
+            self._marker_pos = self._text.find(_NEXT_DATA_MARKER, scan_from)
+        if self._marker_pos >= 0:
+            close = self._text.find("</script>", max(self._marker_pos, scan_from))
+            if close >= 0:
+                self.done = True
+        return self.done
+
+    @property
+    def text(self) -> str:
+        """已接收的 HTML 前缀"""
+        return self._text
+
+
+def parse_repo_skills(
+    raw: str, owner: str, repo: str
+) -> Optional[Dict[str, Dict[str, Any]]]:
+    """
+    解析 repo 页面列出的 skill 元数据
+
+    Returns:
+        {skill 缓存 key: 详情}，只包含带描述的条目；
+        页面没有 pageProps.skills 列表（不带元数据）时为 None
+    """
+    listing = select_next_data(
+        find_next_data(raw), NEXT_DATA_MAX_BYTES * 4, REPO_SKILL_KEYS
+    )
+    if not isinstance(listing, list):
+        return None
+    result = {}
+    for item in listing:
+        if not isinstance(item, dict) or not item.get("description"):
+            continue
+        slug = item.get("slug") or item.get("name") or ""
+        full_id = item.get("id") or ""
+        if full_id.count("/") == 2:
+            key = full_id
+        elif slug:
+            key = f"{owner}/{repo}/{slug}"
+        else:
+            continue
+        result[key] = item
+    return result
 
 
 def build_l0_record(url: str, detail: Optional[Dict] = None) -> Dict:
@@ -117,9 +400,11 @@ def build_l0_record(url: str, detail: Optional[Dict] = None) -> Dict:
     }
 
     if detail:
-        record["title"] = detail.get("title", "")
-        record["description"] = detail.get("description", "")
-        record["tags"] = detail.get("tags", [])
-        record["author"] = detail.get("author", "")
+        record["title"] = detail.get("title") or ""
+        record["description"] = detail.get("description") or ""
+        record["tags"] = detail.get("tags") or []
+        record["author"] = detail.get("author") or ""
+        if isinstance(detail.get("installs"), int):
+            record["installs"] = detail["installs"]
 
     return record
@@ -0,0 +1,94 @@
+# -*- coding: utf-8 -*-
+"""前缀补全索引：按小写排序的 id / slug 数组，bisect 定位前缀区间
+
+表结构（JSON，随 l0 保存）：
+
+- ids: 有效记录的 id，按小写排序
+- id_keys: 与 ids 对应的小写 id（bisect 的键，构建时生成，查询不再逐条转小写）
+- slugs: 小写 slug，已排序
+- slug_ids: 与 slugs 对应的 ids 下标
+- tree: owner → repo → ids 中的 [起, 止) 区间（均小写；同一前缀在有序数组中连续）
+
+查询为 O(log n + 结果数)；owner / repo 列表为字典查找 + 切片。
+"""
+
+from bisect import bisect_left
+from typing import Any, Dict, List
+
+
+def build_prefix_index(records: List[Dict[str, Any]], version: str) -> Dict[str, Any]:
+    """构建前缀补全索引（只收录有效记录）"""
+    ids = sorted(
+        {rec["id"] for rec in records if rec.get("valid", True) and rec.get("id")},
+        key=str.lower,
+    )
+    position = {skill_id: i for i, skill_id in enumerate(ids)}
+    slugs = sorted(
+        (rec.get("slug", "").lower(), position[rec["id"]])
+        for rec in records
+        if rec.get("id") in position and rec.get("slug")
+    )
+    tree: Dict[str, Dict[str, List[int]]] = {}
+    for i, skill_id in enumerate(ids):
+        parts = skill_id.lower().split("/")
+        if len(parts) != 3:
+            continue
+        span = tree.setdefault(parts[0], {}).setdefault(parts[1], [i, i])
+        span[1] = i + 1
+    return {
+        "version": version,
+        "ids": ids,
+        "id_keys": [skill_id.lower() for skill_id in ids],
+        "slugs": [slug for slug, _ in slugs],
+        "slug_ids": [i for _, i in slugs],
+        "tree": tree,
+    }
+
+
+def _prefix_range(keys: List[str], prefix: str):
+    start = bisect_left(keys, prefix)
+    # 以 prefix + 最大码位作为上界：所有以 prefix 开头的键都小于它
+    end = bisect_left(keys, prefix + "\U0010ffff", start)
+    return start, end
+
+
+def complete(index: Dict[str, Any], prefix: str, limit: int) -> List[str]:
+    """
+    返回 id 或 slug 以 prefix 开头（不区分大小写）的 skill id
+
+    id 前缀匹配在前（按 id 排序），其后是仅 slug 匹配的结果（按 slug 排序）。
+    """
+    prefix = prefix.lower()
+    ids = index["ids"]
+    start, end = _prefix_range(index["id_keys"], prefix)
+    found = list(range(start, min(end, start + limit)))
+    if len(found) < limit:
+        seen = set(found)
+        start, end = _prefix_range(index["slugs"], prefix)
+        for pos in index["slug_ids"][start:end]:
+            if pos not in seen:
+                seen.add(pos)
+                found.append(pos)
+                if len(found) >= limit:
+                    break
+    return [ids[pos] for pos in found]
+
+
+def list_tree(
+    index: Dict[str, Any], owner: str, repo: str = ""
+) -> Dict[str, List[str]]:
+    """
+    owner（及 repo）下的 skill，按 repo 分组（不区分大小写）
+
+    Returns:
+        {"owner/repo": [skill id, ...]}，按 repo 排序；未收录时为空字典
+    """
+    repos = index["tree"].get(owner.lower(), {})
+    if repo:
+        repos = {repo.lower(): repos[repo.lower()]} if repo.lower() in repos else {}
+    ids = index["ids"]
+    listing = {}
+    for start, end in repos.values():
+        first = ids[start]
+        listing[first[: first.rindex("/")]] = ids[start:end]
+    return listing
@@ -0,0 +1,88 @@
+# -*- coding: utf-8 -*-
+"""搜索结果缓存：磁盘 LRU，按规范化查询 + top_k + l0 版本 + 过滤条件寻址
+
+l0 每次写入都会改变版本（mtime_ns + 大小），旧条目不再命中，由 LRU 淘汰。
+命中时只读取一个文件。
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+try:
+    from .cache import get_cache_dir, l0_version, save_json_atomic
+    from .constants import QUERY_CACHE_SIZE
+except ImportError:
+    from cache import get_cache_dir, l0_version, save_json_atomic
+    from constants import QUERY_CACHE_SIZE
+
+QUERY_CACHE_DIRNAME = "queries"
+# 搜索流程（扩展/排序/输出格式）变化时递增，使旧结果失效
+QUERY_CACHE_FORMAT = 9
+
+
+def normalize_query(query: str) -> str:
+    """小写并合并空白"""
+    return " ".join(query.lower().split())
+
+
+class QueryCache:
+    """每条结果一个 <sha1(key)>.json 文件，文件 mtime 即最近使用时间"""
+
+    def __init__(self, capacity: int = QUERY_CACHE_SIZE):
+        self.capacity = capacity
+
+    def _dir(self) -> Path:
+        return get_cache_dir() / QUERY_CACHE_DIRNAME
+
+    def key(
+        self,
+        query: str,
+        top_k: int,
+        version: Optional[str] = None,
+        filters: Optional[Dict] = None,
+    ) -> str:
+        if version is None:
+            version = l0_version()
+        scope = json.dumps(filters or {}, sort_keys=True)
+        return (
+            f"{QUERY_CACHE_FORMAT}|{normalize_query(query)}|{top_k}|{version}|{scope}"
+        )
+
+    def _path(self, key: str) -> Path:
+        return self._dir() / f"{hashlib.sha1(key.encode()).hexdigest()}.json"
+
+    def get(self, key: str) -> Optional[Any]:
+        """命中返回缓存的结果（任意 JSON 值）并刷新其最近使用时间"""
+        path = self._path(key)
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                entry = json.load(f)
+            os.utime(path)
+        except (OSError, json.JSONDecodeError):
+            return None
+        return entry.get("output") if entry.get("key") == key else None
+
+    def put(self, key: str, output: Any):
+        """写入结果，超出容量时淘汰最久未使用的条目"""
+        try:
+            save_json_atomic(self._path(key), {"key": key, "output": output})
+            self._evict()
+        except OSError:
+            pass
+
+    def _evict(self):
+        entries: List[Path] = list(self._dir().glob("*.json"))
+        if len(entries) <= self.capacity:
+            return
+        entries.sort(key=lambda p: p.stat().st_mtime_ns)
+        for path in entries[: len(entries) - self.capacity]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+
+query_cache = QueryCache()
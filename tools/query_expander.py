@@ -1,8 +1,7 @@
 # -*- coding: utf-8 -*-
 """Query expander for skill search"""
 
-from typing import Dict, List
-
+from typing import Dict, List, Optional
 
 DOMAIN_SKILL_TERMS = {
     "frontend": [
@@ -114,7 +113,7 @@ DOMAIN_SKILL_TERMS = {
 
 
 def expand_search_terms(
-    search_terms: List[str], domain: str = "general"
+    search_terms: List[str], domain: str = "general", table: Optional[Dict] = None
 ) -> Dict[str, object]:
     """
     Expand search terms based on domain
@@ -122,12 +121,58 @@ def expand_search_terms(
     Args:
         search_terms: Original search terms from intent analysis
         domain: Detected technical domain
+        table: Corpus-derived expansion table stored with the index
+            (see term_expansion); falls back to DOMAIN_SKILL_TERMS if None
 
     Returns:
         Dict with core_terms and extended_terms
     """
     core_terms = list(set(search_terms))
 
+    if table is not None:
+        extended_terms = _expand_from_table(core_terms, domain, table)
+    else:
+        extended_terms = _expand_from_domains(core_terms, domain)
+
+    unique_terms = []
+    seen = set()
+    for term in extended_terms:
+        term_lower = term.lower()
+        if term_lower not in seen:
+            seen.add(term_lower)
+            unique_terms.append(term)
+
+    return {
+        "core_terms": core_terms,
+        "extended_terms": unique_terms[:10],
+        "domain": domain,
+    }
+
+
+def _expand_from_table(core_terms: List[str], domain: str, table: Dict) -> List[str]:
+    """Dictionary lookups only; every proposed term occurs in the index"""
+    related = table["related"]
+    domains = table["domains"]
+
+    extended_terms = list(core_terms)
+
+    for term in core_terms:
+        term_lower = term.lower()
+
+        if term_lower in domains:
+            extended_terms.extend(domains[term_lower])
+        elif term_lower in related:
+            extended_terms.extend(related[term_lower])
+        else:
+            for token in term_lower.replace("-", " ").split():
+                extended_terms.extend(related.get(token, []))
+
+    extended_terms.extend(domains.get(domain, domains["general"])[:3])
+    return extended_terms
+
+
+def _expand_from_domains(core_terms: List[str], domain: str) -> List[str]:
+    """Static expansion from DOMAIN_SKILL_TERMS (no index table yet)"""
     extended_terms = list(core_terms)
 
     domain_terms = DOMAIN_SKILL_TERMS.get(domain, DOMAIN_SKILL_TERMS["general"])
@@ -148,20 +193,7 @@ def expand_search_terms(
                 extended_terms.extend(general_terms)
 
     extended_terms.extend(domain_terms[:3])
-
-    unique_terms = []
-    seen = set()
-    for term in extended_terms:
-        term_lower = term.lower()
-        if term_lower not in seen:
-            seen.add(term_lower)
-            unique_terms.append(term)
-
-    return {
-        "core_terms": core_terms,
-        "extended_terms": unique_terms[:10],
-        "domain": domain,
-    }
+    return extended_terms
 
 
 def create_search_queries(terms: Dict[str, List[str]]) -> List[str]:
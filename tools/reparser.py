@@ -0,0 +1,99 @@
+# -*- coding: utf-8 -*-
+"""离线重建：用页面存档重新解析，重写 l1 与 l0 补全字段（不访问网络）"""
+
+import gzip
+import os
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional
+
+try:
+    from .cache import load_l0, save_l0, save_l1
+    from .detail_loader import build_l1_record
+    from .enricher import apply_detail
+    from .page_archive import PageArchive
+    from .parser import parse_repo_skills, parse_skill_details
+except ImportError:
+    from cache import load_l0, save_l0, save_l1
+    from detail_loader import build_l1_record
+    from enricher import apply_detail
+    from page_archive import PageArchive
+    from parser import parse_repo_skills, parse_skill_details
+
+
+def _parse_archived(path: str, repo_id: str = "") -> Optional[Dict[str, Any]]:
+    """
+    子进程：读取并解析一个存档页面
+
+    repo_id（owner/repo）非空时按 repo 页面解析，返回 {skill id: 详情}。
+    存档对象缺失、截断或损坏时返回 None（计为失败，不中断整个重建）。
+    """
+    try:
+        with gzip.open(path, "rt", encoding="utf-8") as f:
+            raw = f.read()
+    except (OSError, EOFError, zlib.error, UnicodeDecodeError):
+        # gzip.BadGzipFile 是 OSError 的子类
+        return None
+    if repo_id:
+        owner, repo = repo_id.split("/", 1)
+        return parse_repo_skills(raw, owner, repo) or {}
+    return parse_skill_details(raw)
+
+
+def _parse_all(
+    paths: List[str], repo_ids: List[str], workers: int
+) -> List[Optional[Dict[str, Any]]]:
+    if workers <= 1 or len(paths) <= 1:
+        return [_parse_archived(p, r) for p, r in zip(paths, repo_ids)]
+    chunksize = max(1, len(paths) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_parse_archived, paths, repo_ids, chunksize=chunksize))
+
+
+def reparse_archive(
+    workers: Optional[int] = None, archive: Optional[PageArchive] = None
+) -> Dict[str, int]:
+    """
+    从页面存档重建 l1 与 l0 补全字段
+
+    解析在多进程中并行执行，l1/l0 的写入由当前进程完成。
+    只有完整页面会重建 l1；只读到 head 的页面仅用于补全 l0。
+    repo 页面列出的元数据展开到其下各 skill，只用于补全 l0（skill 自身的页面优先）。
+
+    Returns:
+        统计信息 {"pages", "l1", "l0", "failed"}
+    """
+    archive = archive or PageArchive()
+    workers = workers or os.cpu_count() or 1
+    refs = list(archive.iter_refs())
+    paths = [str(archive.object_path(ref["sha256"])) for ref in refs]
+    repo_ids = [ref["id"] if ref.get("kind") == "repo" else "" for ref in refs]
+    details = _parse_all(paths, repo_ids, workers)
+
+    stats = {"pages": len(refs), "l1": 0, "l0": 0, "failed": 0}
+    parsed: Dict[str, Dict[str, Any]] = {}
+    listed: Dict[str, Dict[str, Any]] = {}
+    for ref, repo_id, detail in zip(refs, repo_ids, details):
+        if detail is None:
+            stats["failed"] += 1
+            continue
+        if repo_id:
+            listed.update(detail)
+            continue
+        parsed[ref["id"]] = detail
+        if ref.get("complete"):
+            record = build_l1_record(ref["id"], ref["url"], detail)
+            record["fetched_at"] = ref["fetched_at"]
+            record["content_sha256"] = ref["sha256"]
+            save_l1(ref["id"], record)
+            stats["l1"] += 1
+
+    records = load_l0()
+    for i, rec in enumerate(records):
+        detail = parsed.get(rec.get("id")) or listed.get(rec.get("id"))
+        if detail:
+            records[i] = apply_detail(rec, detail)
+            stats["l0"] += 1
+    if stats["l0"]:
+        save_l0(records)
+    return stats
@@ -10,22 +10,23 @@ class SkillValidator:
 
     VALID_SKILL_PATTERN = re.compile(r"^[\w-]+/[\w-]+/[\w-]+$")
 
-    INVALID_PATTERNS = [
-        r"^facebook/react$",
-        r"^vuejs/vue$",
-        r"^angular/angular$",
-        r"^nodejs/node$",
-        r"^docker/docker$",
-        r"^kubernetes/kubernetes$",
-        r"^ffmpeg$",
-        r"^ffmpeg/ffmpeg$",
-        r"^axios$",
-        r"^lodash$",
-        r"^express$",
-        r"^expressjs/express$",
-    ]
-
-    INVALID_PATTERN_COMPILED = [re.compile(p) for p in INVALID_PATTERNS]
+    # Known non-skills.sh ids (exact match, O(1) lookup)
+    INVALID_IDS = frozenset(
+        [
+            "facebook/react",
+            "vuejs/vue",
+            "angular/angular",
+            "nodejs/node",
+            "docker/docker",
+            "kubernetes/kubernetes",
+            "ffmpeg",
+            "ffmpeg/ffmpeg",
+            "axios",
+            "lodash",
+            "express",
+            "expressjs/express",
+        ]
+    )
 
     SKILLS_SH_BASE_URL = "https://skills.sh"
 
@@ -76,11 +77,8 @@ class SkillValidator:
         return "skills.sh" in url and url.startswith(self.SKILLS_SH_BASE_URL)
 
     def _is_known_invalid(self, skill_id: str) -> bool:
-        """Check if skill ID is a known invalid pattern"""
-        for pattern in self.INVALID_PATTERN_COMPILED:
-            if pattern.match(skill_id):
-                return True
-        return False
+        """Check if skill ID is a known invalid id"""
+        return skill_id in self.INVALID_IDS
 
     def validate_results(self, results: List[Dict]) -> Tuple[List[Dict], List[Dict]]:
         """
@@ -113,6 +111,9 @@ class SkillValidator:
         return valid_results, invalid_results
 
 
+_validator = SkillValidator()
+
+
 def validate_skill(skill_id: str, skill_url: str) -> Dict:
     """
     Convenience function to validate a skill
@@ -124,8 +125,7 @@ def validate_skill(skill_id: str, skill_url: str) -> Dict:
     Returns:
         Validation result dict
     """
-    validator = SkillValidator()
-    return validator.validate(skill_id, skill_url)
+    return _validator.validate(skill_id, skill_url)
 
 
 def validate_results(results: List[Dict]) -> List[Dict]:
@@ -138,6 +138,5 @@ def validate_results(results: List[Dict]) -> List[Dict]:
     Returns:
         List of valid results
     """
-    validator = SkillValidator()
-    valid_results, _ = validator.validate_results(results)
+    valid_results, _ = _validator.validate_results(results)
     return valid_results
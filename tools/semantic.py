@@ -0,0 +1,204 @@
+# -*- coding: utf-8 -*-
+"""可选的语义检索：slug + 描述的哈希 n-gram TF-IDF，NumPy 向量化余弦相似度
+
+未安装 NumPy 时所有入口直接返回（is_available() 为 False），不影响词法检索。
+NumPy 只在构建/检索时导入，只走词法检索的命令不承担其导入开销。
+索引以 npz（int32 下标 + float16 权重）保存在 l0 旁，按列（特征 → 文档）存储，查询只触及查询词对应的列。
+"""
+
+import hashlib
+import importlib.util
+import os
+import re
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+try:
+    from .constants import SEMANTIC_HASH_BITS, SEMANTIC_MIN_SCORE
+except ImportError:
+    from constants import SEMANTIC_HASH_BITS, SEMANTIC_MIN_SCORE
+
+HASH_DIM = 1 << SEMANTIC_HASH_BITS
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+# 进程内缓存：(路径, 版本) → 已加载的索引
+_loaded: Dict[Tuple[str, str], Dict[str, Any]] = {}
+
+
+def is_available() -> bool:
+    """是否安装了 NumPy（不导入）"""
+    return importlib.util.find_spec("numpy") is not None
+
+
+def _numpy():
+    """按需导入 NumPy（可选依赖），未安装时返回 None"""
+    try:
+        import numpy
+    except ImportError:
+        return None
+    return numpy
+
+
+def _ngrams(word: str) -> List[str]:
+    padded = f"<{word}>"
+    return [padded[i : i + 4] for i in range(len(padded) - 3)]
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    小写单词 + 相邻词二元组 + 词内字符 4-gram
+
+    字符 n-gram（带 < > 词界）使词形变化也能相似，如 streaming / stream。
+    """
+    words = _WORD_RE.findall(text.lower())
+    tokens = words + [f"{a} {b}" for a, b in zip(words, words[1:])]
+    for word in words:
+        tokens.extend(_ngrams(word))
+    return tokens
+
+
+def feature_id(token: str) -> int:
+    """稳定的特征哈希（不受 PYTHONHASHSEED 影响）"""
+    digest = hashlib.blake2b(token.encode("utf-8"), digest_size=4).digest()
+    return int.from_bytes(digest, "little") % HASH_DIM
+
+
+@lru_cache(maxsize=1 << 16)
+def _word_features(word: str) -> Tuple[int, ...]:
+    # 单词及其字符 n-gram 的特征；词表高度重复，按词缓存
+    return tuple(feature_id(t) for t in [word] + _ngrams(word))
+
+
+def text_features(text: str) -> List[int]:
+    """与 tokenize(text) 逐项对应的特征 id"""
+    words = _WORD_RE.findall(text.lower())
+    features = [feature_id(f"{a} {b}") for a, b in zip(words, words[1:])]
+    for word in words:
+        features.extend(_word_features(word))
+    return features
+
+
+def _doc_text(rec: Dict[str, Any]) -> str:
+    return f"{rec.get('slug', '').replace('-', ' ')} {rec.get('description', '')}"
+
+
+def build_semantic_index(
+    records: List[Dict[str, Any]], path: Path, version: str
+) -> bool:
+    """
+    构建并保存 TF-IDF 矩阵（CSC：indptr/indices/data，行已 L2 归一化）
+
+    Returns:
+        是否已构建（未安装 NumPy 时为 False）
+    """
+    np = _numpy()
+    if np is None:
+        return False
+    ids = [rec.get("id", "") for rec in records if rec.get("valid", True)]
+    docs = [rec for rec in records if rec.get("valid", True)]
+    n_docs = max(len(docs), 1)
+
+    rows: List[int] = []
+    cols: List[int] = []
+    for doc, rec in enumerate(docs):
+        features = text_features(_doc_text(rec))
+        rows.extend([doc] * len(features))
+        cols.extend(features)
+
+    # (特征, 文档) 去重计数即词频；np.unique 的结果按特征、文档排序，正好是 CSC 顺序
+    keys = np.asarray(cols, dtype=np.int64) * n_docs + np.asarray(rows, np.int64)
+    keys, tf = np.unique(keys, return_counts=True)
+    col_of = (keys // n_docs).astype(np.int32)
+    row_of = (keys % n_docs).astype(np.int32)
+
+    df = np.bincount(col_of, minlength=HASH_DIM)
+    idf = (np.log((1.0 + n_docs) / (1.0 + df)) + 1.0).astype(np.float32)
+    weights = (1.0 + np.log(tf)) * idf[col_of]
+    norms = np.sqrt(np.bincount(row_of, weights=weights**2, minlength=n_docs))
+    weights = weights / np.maximum(norms[row_of], 1e-12)
+
+    indptr = np.zeros(HASH_DIM + 1, dtype=np.int32)
+    np.cumsum(df, out=indptr[1:])
+
+    path.parent.mkdir(parents=True, exist_ok=True)
+    # 临时文件名含进程 id 与线程 id（并发保存互不覆盖）；须以 .npz 结尾，否则 savez 会追加后缀
+    tmp = path.with_name(f"{path.stem}.{os.getpid()}.{threading.get_ident()}.tmp.npz")
+    np.savez(
+        tmp,
+        version=np.array(version),
+        ids=np.array(ids),
+        indptr=indptr,
+        indices=row_of,
+        data=weights.astype(np.float16),
+        idf=idf,
+    )
+    os.replace(tmp, path)
+    return True
+
+
+def _load(np, path: Path, version: str) -> Optional[Dict[str, Any]]:
+    key = (str(path), version)
+    if key in _loaded:
+        return _loaded[key]
+    try:
+        with np.load(path) as npz:
+            if str(npz["version"]) != version:
+                return None
+            index = {name: npz[name] for name in npz.files}
+    except (OSError, KeyError, ValueError):
+        return None
+    _loaded.clear()
+    _loaded[key] = index
+    return index
+
+
+def semantic_search(
+    query: str,
+    path: Path,
+    version: str,
+    top_k: int,
+    allowed: Optional[Set[str]] = None,
+    min_score: float = SEMANTIC_MIN_SCORE,
+) -> Optional[List[Tuple[str, float]]]:
+    """
+    余弦相似度检索（allowed 给定时只返回其中的 skill id）
+
+    Returns:
+        [(skill id, 相似度)]，按相似度降序；索引缺失或版本不符时返回 None
+    """
+    np = _numpy()
+    if np is None:
+        return None
+    index = _load(np, path, version)
+    if index is None:
+        return None
+
+    features, counts = np.unique(
+        np.array(text_features(query), dtype=np.int64),
+        return_counts=True,
+    )
+    if not len(features):
+        return []
+    weights = (1.0 + np.log(counts)) * index["idf"][features]
+    weights = weights / max(float(np.sqrt((weights**2).sum())), 1e-12)
+
+    indptr, indices, data = index["indptr"], index["indices"], index["data"]
+    scores = np.zeros(len(index["ids"]), dtype=np.float32)
+    for feature, weight in zip(features, weights):
+        start, end = indptr[feature], indptr[feature + 1]
+        # 同一列内文档下标唯一，可直接向量化累加
+        scores[indices[start:end]] += weight * data[start:end].astype(np.float32)
+
+    if allowed is not None:
+        scores[~np.isin(index["ids"], list(allowed))] = 0
+
+    k = min(top_k, len(scores))
+    if k <= 0:
+        return []
+    top = np.argpartition(-scores, k - 1)[:k]
+    top = top[np.argsort(-scores[top], kind="stable")]
+    return [
+        (str(index["ids"][i]), float(scores[i])) for i in top if scores[i] >= min_score
+    ]
@@ -4,6 +4,11 @@
 import re
 from typing import Tuple, List
 
+try:
+    from .keyword_automaton import register_keywords, scan
+except ImportError:
+    from keyword_automaton import register_keywords, scan
+
 
 class SkillTriggerDetector:
     """Detects if user is explicitly asking about skills"""
@@ -35,12 +40,26 @@ class SkillTriggerDetector:
         "有什么好的 skill",
     ]
 
-    INQUIRY_PATTERNS = [
-        r"什么|哪些|有没有|能否|可以.*吗",
-        r"推荐|查找|搜索|找|需要.*skill",
-        r"有没有|是否存在|能.*么",
+    # Inquiry cues: plain words, plus ordered pairs matched like "A.*B"
+    INQUIRY_WORDS = [
+        "什么",
+        "哪些",
+        "有没有",
+        "能否",
+        "推荐",
+        "查找",
+        "搜索",
+        "找",
+        "是否存在",
+    ]
+    INQUIRY_PAIRS = [
+        ("可以", "吗"),
+        ("需要", "skill"),
+        ("能", "么"),
     ]
 
+    _TRIGGERS_LOWER = tuple(kw.lower() for kw in SKILL_TRIGGERS)
+
     def is_skill_query(self, user_input: str) -> Tuple[bool, List[str]]:
         """
         Detect if user is explicitly asking about skills
@@ -51,11 +70,13 @@ class SkillTriggerDetector:
         Returns:
             Tuple of (is_skill_query, extracted_keywords)
         """
-        input_lower = user_input.lower()
+        found = scan(user_input)
 
-        has_skill_keyword = any(kw.lower() in input_lower for kw in self.SKILL_TRIGGERS)
+        has_skill_keyword = found.has_any(self._TRIGGERS_LOWER)
 
-        is_inquiry = any(re.search(p, input_lower) for p in self.INQUIRY_PATTERNS)
+        is_inquiry = found.has_any(self.INQUIRY_WORDS) or any(
+            found.has_ordered(first, second) for first, second in self.INQUIRY_PAIRS
+        )
 
         is_triggered = has_skill_keyword and is_inquiry
 
@@ -98,6 +119,14 @@ class SkillTriggerDetector:
         return keywords
 
 
+_detector = SkillTriggerDetector()
+register_keywords(
+    SkillTriggerDetector.SKILL_TRIGGERS
+    + SkillTriggerDetector.INQUIRY_WORDS
+    + [w for pair in SkillTriggerDetector.INQUIRY_PAIRS for w in pair]
+)
+
+
 def is_skill_query(user_input: str) -> Tuple[bool, List[str]]:
     """
     Convenience function to detect skill query
@@ -108,5 +137,4 @@ def is_skill_query(user_input: str) -> Tuple[bool, List[str]]:
     Returns:
         Tuple of (is_skill_query, extracted_keywords)
     """
-    detector = SkillTriggerDetector()
-    return detector.is_skill_query(user_input)
+    return _detector.is_skill_query(user_input)
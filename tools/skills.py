@@ -2,9 +2,11 @@
 """CLI 入口"""
 
 import argparse
+import json
 import sys
 import time
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List
 
 try:
     from .constants import (
@@ -12,6 +14,8 @@ try:
         LABELS,
         MESSAGES,
         DEFAULT_TOP_K,
+        DEFAULT_COMPLETE_LIMIT,
+        SHOW_FETCH_WORKERS,
     )
     from .id_resolver import SkillID
     from .cache import (
@@ -19,20 +23,30 @@ try:
         save_l0,
         is_l0_expired,
         load_l1,
-        save_l1,
         search_l0,
         get_l0_by_id,
+        get_facet_candidates,
+        complete_prefix,
+        list_skill_tree,
+        record_hits,
     )
-    from .fetcher import fetch_sitemap, fetch_details
-    from .parser import parse_sitemap, parse_skill_details
+    from .fetcher import fetch_sitemap
+    from .detail_loader import get_skill_detail
+    from .enricher import build_index_records, enrich_index, print_progress
+    from .connectivity import is_offline
+    from .reparser import reparse_archive
+    from .parser import parse_sitemap
     from .skill_detector import is_skill_query
     from .smart_search import smart_search
+    from .batch_search import read_queries, run_batch
 except ImportError:
     from constants import (
         TITLES,
         LABELS,
         MESSAGES,
         DEFAULT_TOP_K,
+        DEFAULT_COMPLETE_LIMIT,
+        SHOW_FETCH_WORKERS,
     )
     from id_resolver import SkillID
     from cache import (
@@ -40,14 +54,22 @@ except ImportError:
         save_l0,
         is_l0_expired,
         load_l1,
-        save_l1,
         search_l0,
         get_l0_by_id,
+        get_facet_candidates,
+        complete_prefix,
+        list_skill_tree,
+        record_hits,
     )
-    from fetcher import fetch_sitemap, fetch_details
-    from parser import parse_sitemap, parse_skill_details
+    from fetcher import fetch_sitemap
+    from detail_loader import get_skill_detail
+    from enricher import build_index_records, enrich_index, print_progress
+    from connectivity import is_offline
+    from reparser import reparse_archive
+    from parser import parse_sitemap
     from skill_detector import is_skill_query
     from smart_search import smart_search
+    from batch_search import read_queries, run_batch
 
 
 def format_search_results(query: str, results: List[dict]) -> str:
@@ -129,63 +151,173 @@ def format_show_result(rec: dict) -> str:
     return "\n".join(lines)
 
 
+def search_filters(args) -> dict:
+    """--owner / --repo / --tag 过滤条件（未指定的不出现）"""
+    filters = {
+        "owner": getattr(args, "owner", None),
+        "repo": getattr(args, "repo", None),
+        "tags": getattr(args, "tag", None),
+    }
+    return {k: v for k, v in filters.items() if v}
+
+
+def format_listing(key: str, listing: Dict[str, List[str]]) -> str:
+    """Format skills grouped by repo"""
+    total = sum(len(ids) for ids in listing.values())
+    lines = [f"## {TITLES['listing']}: {key}", ""]
+    lines.append(f"{len(listing)} repos, {total} skills:")
+    for repo_key, ids in listing.items():
+        lines.append("")
+        lines.append(f"### {repo_key} ({len(ids)})")
+        for skill_id in ids:
+            lines.append(f"- `{skill_id}`")
+    return "\n".join(lines)
+
+
 def cmd_search(args):
     """search command with smart detection"""
     query = args.query
     top_k = getattr(args, "top_k", DEFAULT_TOP_K)
+    filters = search_filters(args)
+
+    if getattr(args, "batch", None):
+        cmd_search_batch(args.batch, top_k, filters)
+        return
 
     is_triggered, keywords = is_skill_query(query)
 
     if is_triggered:
-        output = smart_search(query, top_k=top_k)
+        output = smart_search(query, top_k=top_k, filters=filters)
         print(output)
     else:
-        if is_l0_expired():
+        if is_offline():
+            print(MESSAGES["offline_mode"], file=sys.stderr)
+        elif is_l0_expired():
             print(MESSAGES["index_expired"], file=sys.stderr)
 
-        results = search_l0(query, top_k=top_k)
+        # 过滤条件先求位图交集，只为候选记录打分
+        candidates = get_facet_candidates(**filters) if filters else None
+        results = search_l0(query, top_k=top_k, candidates=candidates)
+        record_hits([rec.get("id", "") for rec in results])
         output = format_search_results(query, results)
         print(output)
 
 
-def cmd_show(args):
-    """show 命令"""
-    raw_id = args.id
+def cmd_search_batch(path: str, top_k: int, filters: dict):
+    """search --batch：一次加载索引，逐条输出 NDJSON"""
+    if is_offline():
+        print(MESSAGES["offline_mode"], file=sys.stderr)
+    elif is_l0_expired():
+        print(MESSAGES["index_expired"], file=sys.stderr)
+
+    for result in run_batch(read_queries(path), top_k, filters):
+        print(json.dumps(result, ensure_ascii=False), flush=True)
+
+
+def read_ids(path: str) -> List[str]:
+    """每行一个 ID（忽略空行与 # 注释）；- 表示标准输入"""
+    if path == "-":
+        lines = sys.stdin.read().splitlines()
+    else:
+        with open(path, "r", encoding="utf-8") as f:
+            lines = f.read().splitlines()
+    stripped = (line.strip() for line in lines)
+    return [line for line in stripped if line and not line.startswith("#")]
+
+
+def _show_local(raw_id: str):
+    """
+    不经网络能得到的 show 输出
+
+    Returns:
+        (输出, 需抓取的 SkillID, 命中的缓存 key)：三者只有一个非 None
+    """
     try:
         skill_id = SkillID.parse(raw_id)
         cache_key = skill_id.to_cache_key()
     except ValueError as e:
-        print(f"## {TITLES['error']}: {e}")
-        return
+        return f"## {TITLES['error']}: {e}", None, None
+
+    if not skill_id.is_full_id():
+        # owner / owner/repo：本地索引已含全部 owner/repo/skill，直接列出
+        listing = list_skill_tree(skill_id.owner, skill_id.repo)
+        if listing:
+            return format_listing(cache_key, listing), None, None
 
     data = load_l1(cache_key)
+    if not data and is_offline():
+        print(MESSAGES["offline_mode"], file=sys.stderr)
+        data = get_l0_by_id(cache_key)
+        if not data:
+            error = f"## {TITLES['error']}: {MESSAGES['offline_no_cache']} {cache_key}"
+            return error, None, None
     if not data:
+        return None, skill_id, None
+    return format_show_result(data), None, cache_key
+
+
+def cmd_show(args):
+    """
+    show 命令：可一次查看多个 ID
+
+    l1 命中（及本地列表）立即输出；未命中的由有界线程池并发抓取，
+    结果仍按请求顺序输出。
+    """
+    raw_ids = list(args.ids or [])
+    if args.from_file:
+        raw_ids.extend(read_ids(args.from_file))
+
+    resolved = [_show_local(raw_id) for raw_id in raw_ids]
+    misses = sum(1 for _, skill_id, _ in resolved if skill_id is not None)
+    if misses:
         print(MESSAGES["fetching_details"], file=sys.stderr)
-        url = skill_id.to_url()
-        raw_data, err = fetch_details(url)
-        if err:
-            print(f"## {TITLES['error']}: {err}")
-            return
-        raw = raw_data.get("raw", "") if isinstance(raw_data, dict) else raw_data
-        detail = parse_skill_details(raw)
-        data = {
-            "schema_version": 1,
-            "fetched_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-            "id": cache_key,
-            "url": url,
-            **detail,
-        }
-        save_l1(cache_key, data)
 
-    output = format_show_result(data)
-    print(output)
+    hits: List[str] = []
+    with ThreadPoolExecutor(
+        max_workers=max(1, min(SHOW_FETCH_WORKERS, misses))
+    ) as pool:
+        pending = [
+            pool.submit(get_skill_detail, skill_id) if skill_id else None
+            for _, skill_id, _ in resolved
+        ]
+        for i, (item, future) in enumerate(zip(resolved, pending)):
+            output, skill_id, cache_key = item
+            if future is not None:
+                try:
+                    data, err = future.result()
+                except Exception as e:
+                    # 单个 ID 抓取出错不影响其余 ID 的输出
+                    data, err = None, f"{type(e).__name__}: {e}"
+                if err:
+                    output = f"## {TITLES['error']}: {err}"
+                else:
+                    output = format_show_result(data)
+                    cache_key = skill_id.to_cache_key()
+            if cache_key:
+                hits.append(cache_key)
+            if i:
+                print()
+            print(output, flush=True)
+
+    record_hits(hits)
+
+
+def cmd_complete(args):
+    """complete 命令：按 id / slug 前缀列出 skill"""
+    ids = complete_prefix(args.prefix, args.limit)
+    print(f'## {TITLES["complete"]}: "{args.prefix}"\n')
+    if not ids:
+        print(MESSAGES["no_completions"])
+        return
+    for skill_id in ids:
+        print(f"- `{skill_id}`")
 
 
 def cmd_update(args):
     """update command"""
     if args.index:
         print(MESSAGES["index_updated"], file=sys.stderr)
-        xml, err = fetch_sitemap()
+        xml, err = fetch_sitemap(force=True)
         if err:
             print(
                 f"## {TITLES['warning']}: {MESSAGES['index_update_failed']}",
@@ -195,15 +327,7 @@ def cmd_update(args):
             return
 
         urls = parse_sitemap(xml)
-        records = []
-        for url in urls:
-            record = {
-                "id": SkillID.from_url(url).to_cache_key(),
-                "url": url,
-                "description": "",
-                "updated_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-            }
-            records.append(record)
+        records = build_index_records(urls, load_l0())
 
         save_l0(records)
         print(f"## {TITLES['update_index']}")
@@ -219,24 +343,43 @@ def cmd_update(args):
             print(f"## {TITLES['error']}: {e}")
             return
 
-        url = skill_id.to_url()
-        raw, err = fetch_details(url)
+        data, err = get_skill_detail(skill_id, force=True)
         if err:
             print(f"## {TITLES['error']}: {err}")
             return
 
-        detail = parse_skill_details(raw)
-        data = {
-            "schema_version": 1,
-            "fetched_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
-            "id": cache_key,
-            "url": url,
-            **detail,
-        }
-        save_l1(cache_key, data)
         print(f"## {TITLES['update_id']}")
         print(f"\n{MESSAGES['cache_refreshed']} {cache_key}.")
 
+    elif args.enrich:
+        stats = enrich_index(
+            limit=args.limit,
+            force=args.force,
+            progress=print_progress,
+            fetch_workers=args.fetch_workers,
+            parse_workers=args.parse_workers,
+        )
+        print(f"## {TITLES['enrich']}")
+        print(
+            f"\n{MESSAGES['index_enriched']}: {stats['enriched']} enriched, "
+            f"{stats['unchanged']} unchanged, "
+            f"{stats['failed']} failed, {stats['total']} skills in index."
+        )
+        if stats["pending"]:
+            print(f"\n{MESSAGES['offline_mode']}, {stats['pending']} pending.")
+
+
+def cmd_cache(args):
+    """cache command"""
+    if args.cache_command == "reparse":
+        stats = reparse_archive(workers=args.workers)
+        print(f"## {TITLES['reparse']}")
+        print(
+            f"\n{MESSAGES['cache_reparsed']}: {stats['l1']} details, "
+            f"{stats['l0']} index records from {stats['pages']} archived pages "
+            f"({stats['failed']} failed)."
+        )
+
 
 def main():
     """CLI entry point"""
@@ -259,24 +402,89 @@ def main():
     subparsers = parser.add_subparsers(dest="command", required=True)
 
     parser_search = subparsers.add_parser("search", help="Search for skills")
-    parser_search.add_argument("query", help="Search keyword")
+    parser_search.add_argument("query", nargs="?", help="Search keyword")
+    parser_search.add_argument(
+        "--batch",
+        metavar="FILE",
+        help="Run one query per line of FILE (- for stdin), print NDJSON",
+    )
     parser_search.add_argument(
         "--top-k",
         type=int,
         default=DEFAULT_TOP_K,
         help=f"Number of results (default: {DEFAULT_TOP_K})",
     )
+    parser_search.add_argument("--owner", help="Only skills of this owner")
+    parser_search.add_argument(
+        "--repo", help="Only skills of this repo (repo or owner/repo)"
+    )
+    parser_search.add_argument(
+        "--tag",
+        action="append",
+        help="Only skills with this tag (repeat to require several)",
+    )
 
     parser_show = subparsers.add_parser("show", help="Show skill details")
-    parser_show.add_argument("id", help="Skill ID (owner/repo/skill)")
+    parser_show.add_argument(
+        "ids", nargs="*", metavar="ID", help="Skill ID (owner/repo/skill)"
+    )
+    parser_show.add_argument(
+        "--from-file",
+        metavar="FILE",
+        help="Also show the IDs listed in FILE, one per line (- for stdin)",
+    )
+
+    parser_complete = subparsers.add_parser(
+        "complete", help="List skills whose id or slug starts with a prefix"
+    )
+    parser_complete.add_argument("prefix", help="Prefix of owner/repo/skill or slug")
+    parser_complete.add_argument(
+        "--limit",
+        type=int,
+        default=DEFAULT_COMPLETE_LIMIT,
+        help=f"Max results (default: {DEFAULT_COMPLETE_LIMIT})",
+    )
 
     parser_update = subparsers.add_parser("update", help="Update cache")
     group = parser_update.add_mutually_exclusive_group(required=True)
     group.add_argument("--index", action="store_true", help="Refresh index")
     group.add_argument("--id", metavar="ID", help="Force refresh a skill detail")
+    group.add_argument(
+        "--enrich",
+        action="store_true",
+        help="Fetch detail pages to fill in index descriptions",
+    )
+    parser_update.add_argument(
+        "--limit", type=int, default=None, help="Max skills to enrich (--enrich)"
+    )
+    parser_update.add_argument(
+        "--force", action="store_true", help="Re-enrich skills already enriched"
+    )
+    parser_update.add_argument(
+        "--fetch-workers", type=int, default=None, help="Fetch threads (--enrich)"
+    )
+    parser_update.add_argument(
+        "--parse-workers",
+        type=int,
+        default=None,
+        help="Parser processes (--enrich, default: CPUs)",
+    )
+
+    parser_cache = subparsers.add_parser("cache", help="Manage local cache")
+    cache_sub = parser_cache.add_subparsers(dest="cache_command", required=True)
+    parser_reparse = cache_sub.add_parser(
+        "reparse", help="Rebuild details and index from archived pages (offline)"
+    )
+    parser_reparse.add_argument(
+        "--workers", type=int, default=None, help="Parser processes (default: CPUs)"
+    )
 
     try:
         args = parser.parse_args()
+        if args.command == "search" and not (args.query or args.batch):
+            parser_search.error(MESSAGES["missing_query"])
+        if args.command == "show" and not (args.ids or args.from_file):
+            parser_show.error(MESSAGES["missing_id"])
     except SystemExit:
         sys.exit(1)
 
@@ -285,8 +493,12 @@ def main():
             cmd_search(args)
         elif args.command == "show":
             cmd_show(args)
+        elif args.command == "complete":
+            cmd_complete(args)
         elif args.command == "update":
             cmd_update(args)
+        elif args.command == "cache":
+            cmd_cache(args)
         else:
             parser.print_help()
     except Exception as e:
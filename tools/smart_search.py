@@ -3,76 +3,182 @@
 
 import json
 import sys
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 try:
-    from .cache import search_l0, is_l0_expired
+    from .cache import (
+        get_domain_candidates,
+        get_facet_candidates,
+        get_expansion_table,
+        is_l0_expired,
+        record_hits,
+        search_l0_multi,
+        search_l0_semantic,
+    )
+    from .connectivity import is_offline
     from .skill_detector import is_skill_query
     from .intent_analyzer import analyze_intent
     from .query_expander import expand_search_terms, create_search_queries
-    from .result_validator import validate_results
+    from .query_cache import normalize_query, query_cache
     from .constants import TITLES, LABELS, MESSAGES, DEFAULT_TOP_K
 except ImportError:
-    from cache import search_l0, is_l0_expired
+    from cache import (
+        get_domain_candidates,
+        get_facet_candidates,
+        get_expansion_table,
+        is_l0_expired,
+        record_hits,
+        search_l0_multi,
+        search_l0_semantic,
+    )
+    from connectivity import is_offline
     from skill_detector import is_skill_query
     from intent_analyzer import analyze_intent
     from query_expander import expand_search_terms, create_search_queries
-    from result_validator import validate_results
+    from query_cache import normalize_query, query_cache
     from constants import TITLES, LABELS, MESSAGES, DEFAULT_TOP_K
 
 
-def smart_search(user_query: str, top_k: int = 5) -> str:
+def smart_search(
+    user_query: str, top_k: int = 5, filters: Optional[Dict] = None
+) -> str:
     """
     Main smart search orchestration
 
+    Repeat queries against the same index version are answered from the
+    on-disk query cache without re-running the pipeline. The cache holds the
+    body and the shown skill IDs; the body is built from the normalized query
+    (the cache key), so every case / whitespace variant gets the same text.
+    The header is rendered from this query's own text, and hits are recorded
+    on every call, cached or not.
+
     Args:
         user_query: The user's input query
         top_k: Maximum number of results to return
+        filters: Optional owner / repo / tags facet filters
+            (see cache.get_facet_candidates)
 
     Returns:
         Formatted Markdown output (English, for agent translation)
     """
-    lines = []
+    if is_offline():
+        print(MESSAGES["offline_mode"], file=sys.stderr)
+    elif is_l0_expired():
+        print(MESSAGES["index_expired"], file=sys.stderr)
+
+    key = query_cache.key(user_query, top_k, filters=filters)
+    entry = query_cache.get(key)
+    if entry is None:
+        candidates = get_facet_candidates(**filters) if filters else None
+        body, shown = _format_results(normalize_query(user_query), top_k, candidates)
+        entry = {"body": body, "ids": shown}
+        query_cache.put(key, entry)
+    record_hits(entry["ids"])
+    return _header(user_query) + entry["body"]
 
-    lines.append(f'## {TITLES["search"]}: "{user_query}"')
-    lines.append("")
 
+def smart_queries(user_query: str) -> Tuple[Dict, Dict, List[str]]:
+    """
+    Intent analysis and expansion, before any search
+
+    Returns:
+        (intent, expanded terms, search queries)
+    """
     intent = analyze_intent(user_query)
 
+    # Expansion is a lookup in the table mined from the index (PMI over slug
+    # tokens); without one, the static domain lists are used.
     expanded = expand_search_terms(
-        intent.get("search_terms", [user_query]), intent.get("domain", "general")
+        intent.get("search_terms", [user_query]),
+        intent.get("domain", "general"),
+        get_expansion_table(),
     )
 
-    queries = create_search_queries(expanded)
-
-    if is_l0_expired():
-        print(MESSAGES["index_expired"], file=sys.stderr)
+    return intent, expanded, create_search_queries(expanded)
 
-    all_results = []
-    results_count = {}
 
-    for query in queries[:5]:
-        results = search_l0(query, top_k=top_k)
-        results_count[query] = len(results)
-        all_results.extend(results)
+def smart_results(
+    user_query: str,
+    top_k: int,
+    candidates: Optional[int] = None,
+    scanned: Optional[Dict[str, List[Tuple[int, int]]]] = None,
+    planned: Optional[Tuple[Dict, Dict, List[str]]] = None,
+) -> Tuple[List[Dict], Dict, Dict]:
+    """
+    Run intent analysis, expansion, search, validation and ranking
 
-    valid_results, invalid_results = validate_results(all_results)
+    `candidates` is a row bitmap from the facet filters; every stage,
+    including the semantic fallback, stays inside it. Batch mode passes
+    `planned` (from smart_queries) and `scanned` (one cache.scan_l0_terms
+    pass over `candidates` for the whole batch) so no query scans the index
+    on its own.
 
-    unique_results = _deduplicate_by_id(valid_results)
+    Returns:
+        (ranked records, intent, expanded terms); records are read-only
+    """
+    intent, expanded, queries = planned or smart_queries(user_query)
+
+    # One pass over the index for all queries, fused by reciprocal rank;
+    # top_k is applied once, after validation and ranking. A detected domain
+    # restricts scoring to its precomputed candidate bitmap; the rest of the
+    # index is scored only if that falls short.
+    domain_rows = get_domain_candidates(intent.get("domain", "general"))
+    if domain_rows is None:
+        all_results = search_l0_multi(queries, candidates=candidates, scanned=scanned)
+    else:
+        scope = domain_rows if candidates is None else candidates & domain_rows
+        rest = ~domain_rows if candidates is None else candidates & ~domain_rows
+        all_results = search_l0_multi(queries, candidates=scope, scanned=scanned)
+        if len(all_results) < top_k:
+            all_results += search_l0_multi(queries, candidates=rest, scanned=scanned)
+
+    # Validation happens when the index is written; invalid records are
+    # never returned by the search.
+    unique_results = _deduplicate_by_id(all_results)
 
     ranked_results = _rank_results(unique_results, intent)
 
+    # Low lexical recall: fall back to TF-IDF similarity over the raw query
+    # (word and character n-grams catch variants no expanded term matches).
+    # Semantic hits rank after lexical ones.
+    if len(ranked_results) < top_k:
+        ranked_results += _semantic_fallback(
+            user_query, ranked_results, top_k, candidates
+        )
+
+    return ranked_results, intent, expanded
+
+
+def _header(user_query: str) -> str:
+    return f'## {TITLES["search"]}: "{user_query}"\n\n'
+
+
+def _format_results(
+    user_query: str, top_k: int, candidates: Optional[int] = None
+) -> Tuple[str, List[str]]:
+    """
+    Markdown body below the header, and the IDs of the skills shown
+
+    smart_search passes the normalized query, so the body (including the
+    no-results suggestion) is the same for every variant sharing a cache key.
+    """
+    lines = []
+
+    ranked_results, intent, expanded = smart_results(user_query, top_k, candidates)
+
     if not ranked_results:
         lines.append(MESSAGES["no_results"])
         lines.append("")
         lines.append(
             f"**Suggestion**: Try searching with different keywords like: {', '.join(expanded.get('core_terms', []))}"
         )
-        return "\n".join(lines)
+        return "\n".join(lines), []
 
-    lines.append(f"Found {len(ranked_results)} related skills:\n")
+    # Fused results can far exceed top_k; report what is actually shown
+    shown = ranked_results[:top_k]
+    lines.append(f"Found {len(shown)} related skills:\n")
 
-    for i, rec in enumerate(ranked_results[:top_k], 1):
+    for i, rec in enumerate(shown, 1):
         title = rec.get("slug") or rec.get("title") or rec.get("id")
         lines.append(f"### {i}. {title}")
         lines.append(f"- **{LABELS['id']}**: `{rec.get('id', '')}`")
@@ -92,14 +198,14 @@ def smart_search(user_query: str, top_k: int = 5) -> str:
         lines.append("")
 
     lines.append(
-        f"\n**{LABELS['count']} {len(ranked_results)} {LABELS['results']}**，已显示全部。"
+        f"\n**{LABELS['count']} {len(shown)} {LABELS['results']}**，已显示全部。"
     )
 
     if intent.get("reasoning"):
         lines.append("")
         lines.append(f"**Note**: {intent['reasoning']}")
 
-    return "\n".join(lines)
+    return "\n".join(lines), [rec.get("id", "") for rec in shown]
 
 
 def _deduplicate_by_id(results: List[Dict]) -> List[Dict]:
@@ -114,6 +220,16 @@ def _deduplicate_by_id(results: List[Dict]) -> List[Dict]:
     return unique
 
 
+def _semantic_fallback(
+    query: str, found: List[Dict], top_k: int, candidates: Optional[int] = None
+) -> List[Dict]:
+    """Semantic hits not already found lexically, up to top_k in total"""
+    seen = {rec.get("id") for rec in found}
+    hits = search_l0_semantic(query, top_k, candidates)
+    extra = [rec for rec in hits if rec.get("id") not in seen]
+    return extra[: top_k - len(found)]
+
+
 def _rank_results(results: List[Dict], intent: Dict) -> List[Dict]:
     """Rank results based on intent and priority"""
     priority_terms = set(t.lower() for t in intent.get("priority_terms", []))
@@ -122,18 +238,13 @@ def _rank_results(results: List[Dict], intent: Dict) -> List[Dict]:
     scored = []
     for rec in results:
         score = 0
-        text = " ".join(
-            [
-                rec.get("id", ""),
-                rec.get("slug", ""),
-                rec.get("description", ""),
-            ]
-        ).lower()
+        # Normalized columns are precomputed when the index is written
+        text = rec["search_text"]
 
         for term in priority_terms:
             if term in text:
                 score += 10
-                if term in rec.get("slug", "").lower():
+                if term in rec["slug_lc"]:
                     score += 5
 
         for term in core_terms:
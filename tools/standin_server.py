@@ -0,0 +1,347 @@
+# -*- coding: utf-8 -*-
+"""本地 skills.sh 替身服务器：回放 fixture 存档或生成合成站点
+
+用法：
+    python -m tools.standin_server --synthetic 2000 --latency 0.05 --error-rate 0.02
+    python -m tools.standin_server --fixtures ./fixtures
+
+配合 SKILLS_SH_ORIGIN=http://127.0.0.1:8765 运行 CLI，所有 skills.sh 请求
+都会发往替身服务器，可离线、可复现地测量抓取吞吐。
+"""
+
+import argparse
+import json
+import random
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+
+try:
+    from .id_resolver import BASE_URL
+    from .fixture_archive import FixtureArchive, url_to_key
+except ImportError:
+    from id_resolver import BASE_URL
+    from fixture_archive import FixtureArchive, url_to_key
+
+DEFAULT_PORT = 8765
+
+_WORDS = [
+    "react",
+    "frontend",
+    "design",
+    "video",
+    "player",
+    "streaming",
+    "api",
+    "backend",
+    "testing",
+    "e2e",
+    "security",
+    "auth",
+    "docker",
+    "kubernetes",
+    "database",
+    "postgres",
+    "agent",
+    "mcp",
+    "llm",
+    "git",
+    "worktrees",
+    "python",
+    "typescript",
+    "mobile",
+    "best-practices",
+    "patterns",
+    "guidelines",
+    "debugging",
+]
+
+
+# === 合成站点 ===
+
+
+def synthetic_skill_ids(
+    count: int, skills_per_repo: int = 5, repos_per_owner: int = 3, seed: int = 0
+) -> List[str]:
+    """生成确定性的 owner/repo/skill 列表"""
+    rng = random.Random(seed)
+    ids = []
+    for i in range(count):
+        repo_no = i // skills_per_repo
+        owner = f"owner{repo_no // repos_per_owner}"
+        repo = f"repo{repo_no}"
+        slug = "-".join(rng.sample(_WORDS, 2)) + f"-{i}"
+        ids.append(f"{owner}/{repo}/{slug}")
+    return ids
+
+
+def render_sitemap(skill_ids: List[str]) -> str:
+    """渲染 sitemap（使用 skills.sh 规范地址）"""
+    lines = ['<?xml version="1.0" encoding="UTF-8"?>']
+    lines.append('<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">')
+    for skill_id in skill_ids:
+        lines.append(f"  <url><loc>{BASE_URL}/{skill_id}</loc></url>")
+    lines.append("</urlset>")
+    return "\n".join(lines)
+
+
+def skill_data(skill_id: str) -> Dict[str, object]:
+    """合成 skill 的页面数据（详情页与 repo 页面共用）"""
+    owner, repo, slug = skill_id.split("/")
+    words = slug.split("-")
+    topics = " and ".join(words[:-1])
+    return {
+        "id": skill_id,
+        "title": " ".join(w.capitalize() for w in words),
+        "description": f"Skill for {topics} workflows in {owner}/{repo}.",
+        "author": owner,
+        "tags": words[:-1],
+        "installs": (sum(map(ord, skill_id)) * 7919) % 10000,
+        "url": f"{BASE_URL}/{skill_id}",
+    }
+
+
+def _next_data_script(page_props: Dict[str, object], page: str) -> str:
+    next_data = {"props": {"pageProps": page_props}, "page": page}
+    return (
+        '<script id="__NEXT_DATA__" type="application/json">'
+        f"{json.dumps(next_data)}</script>\n"
+    )
+
+
+def render_skill_page(skill_id: str, body_kb: int = 0, props_kb: int = 0) -> str:
+    """渲染 skill 详情页：head meta + 正文填充 + 页尾 __NEXT_DATA__（同 Next.js 布局）
+
+    props_kb 在 pageProps 中 skill 之后附加相关推荐等数据，模拟体积较大的页面数据。
+    """
+    owner, repo, slug = skill_id.split("/")
+    words = slug.split("-")
+    skill = skill_data(skill_id)
+    title = skill["title"]
+    description = skill["description"]
+    related = [
+        {"id": f"{owner}/{repo}/related-{i}", "description": " ".join(_WORDS)}
+        for i in range(props_kb * 1024 // 300)
+    ]
+    filler = "".join(
+        f'<p class="doc">{title} paragraph {i}: ' + "lorem ipsum " * 6 + "</p>\n"
+        for i in range(body_kb * 1024 // 110)
+    )
+    return (
+        '<!DOCTYPE html>\n<html lang="en">\n<head>\n'
+        '<meta charset="UTF-8">\n'
+        '<meta name="viewport" content="width=device-width, initial-scale=1.0">\n'
+        f"<title>{title} - skills.sh</title>\n"
+        f'<meta property="og:title" content="{title}">\n'
+        f'<meta property="og:description" content="{description}">\n'
+        f'<meta name="description" content="{description}">\n'
+        f'<meta name="keywords" content="{", ".join(words[:-1])}">\n'
+        '</head>\n<body>\n<div id="__next">\n'
+        f"{filler}</div>\n"
+        + _next_data_script(
+            {"skill": skill, "related": related, "layout": {"nav": _WORDS}},
+            "/[owner]/[repo]/[skill]",
+        )
+        + "</body>\n</html>\n"
+    )
+
+
+def render_repo_page(owner: str, repo: str, skill_ids: List[str]) -> str:
+    """渲染 repo 页面：pageProps.skills 列出该 repo 下所有 skill 的元数据"""
+    title = f"{owner}/{repo}"
+    return (
+        '<!DOCTYPE html>\n<html lang="en">\n<head>\n'
+        f"<title>{title} - skills.sh</title>\n"
+        '</head>\n<body>\n<div id="__next"></div>\n'
+        + _next_data_script(
+            {
+                "repo": {"owner": owner, "name": repo},
+                "skills": [skill_data(i) for i in skill_ids],
+            },
+            "/[owner]/[repo]",
+        )
+        + "</body>\n</html>\n"
+    )
+
+
+class SyntheticSite:
+    """按需生成页面的合成 skills.sh"""
+
+    def __init__(
+        self, count: int, body_kb: int = 0, seed: int = 0, repo_pages: bool = True
+    ):
+        self.skill_ids = synthetic_skill_ids(count, seed=seed)
+        self._known = set(self.skill_ids)
+        self._repos: Dict[str, List[str]] = {}
+        if repo_pages:
+            for skill_id in self.skill_ids:
+                self._repos.setdefault(skill_id.rsplit("/", 1)[0], []).append(skill_id)
+        self.body_kb = body_kb
+
+    def get(self, key: str) -> Optional[Tuple[int, str]]:
+        path = key.split("?", 1)[0].strip("/")
+        if path in ("sitemap.xml", "sitemap_index.xml"):
+            return 200, render_sitemap(self.skill_ids)
+        if path in self._known:
+            return 200, render_skill_page(path, self.body_kb)
+        if path in self._repos:
+            owner, repo = path.split("/")
+            return 200, render_repo_page(owner, repo, self._repos[path])
+        return None
+
+
+class ReplaySite:
+    """回放 fixture 存档"""
+
+    def __init__(self, archive: FixtureArchive):
+        self.archive = archive
+
+    def get(self, key: str) -> Optional[Tuple[int, str]]:
+        entry = self.archive.load(key)
+        if entry is None:
+            return None
+        return entry.get("status", 200), entry.get("body", "")
+
+
+# === HTTP 服务 ===
+
+
+class StandinServer(ThreadingHTTPServer):
+    """带延迟与错误注入的替身服务器"""
+
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        site,
+        latency: float = 0.0,
+        jitter: float = 0.0,
+        error_rate: float = 0.0,
+        seed: int = 0,
+    ):
+        super().__init__(address, _Handler)
+        self.site = site
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.stats: Dict[str, int] = {"requests": 0, "errors": 0, "bytes": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    @property
+    def origin(self) -> str:
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _draw(self) -> Tuple[float, bool]:
+        with self._lock:
+            self.stats["requests"] += 1
+            delay = self.latency + self._rng.uniform(0, self.jitter)
+            failed = self._rng.random() < self.error_rate
+            if failed:
+                self.stats["errors"] += 1
+            return delay, failed
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: StandinServer
+
+    def do_GET(self):
+        delay, failed = self.server._draw()
+        if delay > 0:
+            time.sleep(delay)
+        if failed:
+            self._send(500, "injected error")
+            return
+        found = self.server.site.get(url_to_key(self.path))
+        if found is None:
+            self._send(404, "not found")
+            return
+        status, body = found
+        self._send(status, body)
+
+    def _send(self, status: int, body: str):
+        data = body.encode("utf-8")
+        with self.server._lock:
+            self.server.stats["bytes"] += len(data)
+        content_type = "application/xml" if body.startswith("<?xml") else "text/html"
+        self.send_response(status)
+        self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        try:
+            self.wfile.write(data)
+        except (BrokenPipeError, ConnectionResetError):
+            # 客户端提前断开（如流式读取提前结束）
+            pass
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_server(
+    site,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    **options,
+) -> StandinServer:
+    """在后台线程启动服务器（port=0 自动分配），用于测试与基准"""
+    server = StandinServer((host, port), site, **options)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Local skills.sh stand-in server")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--fixtures", metavar="DIR", help="Replay a fixture archive")
+    source.add_argument(
+        "--synthetic", type=int, metavar="N", help="Generate N synthetic skills"
+    )
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument(
+        "--latency", type=float, default=0.0, help="Base latency (seconds)"
+    )
+    parser.add_argument(
+        "--jitter", type=float, default=0.0, help="Extra random latency (seconds)"
+    )
+    parser.add_argument(
+        "--error-rate", type=float, default=0.0, help="Fraction of HTTP 500 responses"
+    )
+    parser.add_argument(
+        "--body-kb", type=int, default=0, help="Synthetic page body padding (KB)"
+    )
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.fixtures:
+        site = ReplaySite(FixtureArchive(args.fixtures))
+    else:
+        site = SyntheticSite(args.synthetic, body_kb=args.body_kb, seed=args.seed)
+
+    server = StandinServer(
+        (args.host, args.port),
+        site,
+        latency=args.latency,
+        jitter=args.jitter,
+        error_rate=args.error_rate,
+        seed=args.seed,
+    )
+    print(f"Serving on {server.origin}", file=sys.stderr)
+    print(f"export SKILLS_SH_ORIGIN={server.origin}", file=sys.stderr)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(json.dumps(server.stats), file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+"""语料驱动的扩展词表：从 l0 的 slug 词共现（PMI）挖掘相关词，随索引保存
+
+表结构（JSON，记录对应的 l0 版本，版本不符时视为缺失）：
+
+- related: slug 词 → 按 PMI 降序的共现词
+- domains: 领域 → DOMAIN_SKILL_TERMS 中确实能检索到 skill 的词（保持原顺序）
+
+查询时扩展只是字典查找，且只会提出能命中 skill 的词。
+"""
+
+import math
+import re
+from collections import Counter
+from itertools import combinations
+from typing import Any, Dict, List, Tuple
+
+try:
+    from .constants import EXPANSION_MIN_COUNT, EXPANSION_TOP_N
+    from .query_expander import DOMAIN_SKILL_TERMS
+except ImportError:
+    from constants import EXPANSION_MIN_COUNT, EXPANSION_TOP_N
+    from query_expander import DOMAIN_SKILL_TERMS
+
+_TOKEN_RE = re.compile(r"[a-z][a-z0-9]+")
+
+
+def slug_tokens(slug: str) -> List[str]:
+    """slug 按 - 切分后的词（去重，忽略单字符与纯数字）"""
+    return sorted(set(_TOKEN_RE.findall(slug.lower())))
+
+
+def build_expansion_table(
+    records: List[Dict[str, Any]], version: str
+) -> Dict[str, Any]:
+    """
+    统计有效记录的 slug 词共现，PMI(a, b) = log(n(a,b) * N / (n(a) * n(b)))
+
+    共现次数低于 EXPANSION_MIN_COUNT 或 PMI <= 0 的词对不保留；
+    每个词最多保留 EXPANSION_TOP_N 个相关词。
+    """
+    valid = [rec for rec in records if rec.get("valid", True)]
+    unigrams: Counter = Counter()
+    pairs: Counter = Counter()
+    for rec in valid:
+        tokens = slug_tokens(rec.get("slug", ""))
+        unigrams.update(tokens)
+        pairs.update(combinations(tokens, 2))
+
+    n_docs = max(len(valid), 1)
+    candidates: Dict[str, List[Tuple[float, int, str]]] = {}
+    for (a, b), count in pairs.items():
+        if count < EXPANSION_MIN_COUNT:
+            continue
+        pmi = math.log(count * n_docs / (unigrams[a] * unigrams[b]))
+        if pmi <= 0:
+            continue
+        candidates.setdefault(a, []).append((-pmi, -count, b))
+        candidates.setdefault(b, []).append((-pmi, -count, a))
+
+    related = {
+        token: [t for _, _, t in sorted(scored)[:EXPANSION_TOP_N]]
+        for token, scored in sorted(candidates.items())
+    }
+
+    # 只保留确实出现在检索列中的领域词（一次拼接，逐词 C 层子串查找）
+    blob = "\n".join(rec.get("search_text", "") for rec in valid)
+    domains = {
+        domain: [t for t in terms if t.lower() in blob]
+        for domain, terms in DOMAIN_SKILL_TERMS.items()
+    }
+    return {"version": version, "related": related, "domains": domains}